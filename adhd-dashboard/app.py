@@ -12,22 +12,30 @@ Dark Mode + Glassmorphism + Gamification
 
 import os
 import json
+import hashlib
 import logging
-from datetime import datetime
+from datetime import datetime, date
 from functools import wraps
 
 from flask import (
     Flask, render_template, request, jsonify, 
-    redirect, url_for, flash
+    redirect, url_for, flash, make_response
 )
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
 
 from config import get_config, Config
 from utils.notion_api import NotionAPI
 from utils.sheets_api import create_sheets_api
+from utils.parallel import ParallelLoader
+from utils.task_snapshot import TaskSnapshot
+from utils.records import Record
 from services.sheet_service import create_sheet_service
 from services.db_service import create_database_service
+from services.notion_cache import create_notion_cache
+from services.sync_worker import create_sync_worker, load_sync_status
+from services.outbox import create_outbox
 
 # بارگذاری متغیرهای محیطی
 load_dotenv()
@@ -39,8 +47,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class RecordJSONProvider(DefaultJSONProvider):
+    """JSON پیش‌فرض Flask + TaskRecord / HabitRecord (با همون کلیدهای قبلی)"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, Record):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
 # ایجاد اپلیکیشن Flask
 app = Flask(__name__)
+app.json = RecordJSONProvider(app)
 app.config.from_object(get_config())
 app.secret_key = Config.SECRET_KEY
 
@@ -51,31 +71,61 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 1 * 1024 * 1024  # 1MB
 
+# حداکثر limit در /api/tasks
+MAX_TASKS_LIMIT = 100
+
 # آبجکت‌های API
 notion_api = None
 sheets_api = None
 sheet_service = None
 db_service = None
+sync_worker = None
+outbox = None
 
 
 def init_apis():
     """اولیه‌سازی API ها و سرویس‌ها"""
-    global notion_api, sheets_api, sheet_service, db_service
+    global notion_api, sheets_api, sheet_service, db_service, sync_worker, outbox
     
     # Database Service (SQLite)
-    db_service = create_database_service(Config.DATABASE_PATH)
+    db_service = create_database_service(Config.DATABASE_PATH, pool_size=Config.DATABASE_POOL_SIZE)
     logger.info("Database Service آماده است")
     
     # Notion API
     if Config.is_notion_configured():
-        notion_api = NotionAPI(Config.NOTION_API_KEY)
+        notion_api = NotionAPI(
+            Config.NOTION_API_KEY,
+            rate_limit=Config.NOTION_RATE_LIMIT,
+            import_concurrency=Config.NOTION_IMPORT_CONCURRENCY,
+            rate_limit_db=Config.NOTION_RATE_LIMIT_DB
+        )
         logger.info("Notion API آماده است")
+        
+        # کش محلی Task ها در SQLite (Sync Worker هم همین کش رو پر میکنه)
+        if Config.NOTION_CACHE_ENABLED or Config.is_sync_worker_running():
+            cache_ttl = Config.NOTION_CACHE_TTL
+            if Config.is_sync_worker_running():
+                # Worker کش رو تازه نگه میداره؛ Request ها فقط اگه Worker عقب بیفته Sync میکنن
+                cache_ttl = max(cache_ttl, Config.SYNC_NOTION_INTERVAL * 2)
+            notion_api.cache = create_notion_cache(
+                notion_api, db_service,
+                ttl=cache_ttl,
+                full_sync_interval=Config.NOTION_FULL_SYNC_INTERVAL
+            )
+            logger.info(f"Notion Cache فعال است (TTL: {cache_ttl}s)")
     else:
         logger.warning("Notion API تنظیم نشده")
     
     # Google Sheets API
     if Config.is_sheets_configured():
-        sheets_api = create_sheets_api(Config.GOOGLE_SHEETS_CREDENTIALS)
+        # با Sync Worker آمار از daily_logs در SQLite خونده میشه (نه از هر Process جدا)
+        local_store = db_service if Config.is_sync_worker_running() else None
+        sheets_api = create_sheets_api(
+            Config.GOOGLE_SHEETS_CREDENTIALS,
+            cache_ttl=Config.SHEETS_CACHE_TTL,
+            cache_size=Config.SHEETS_CACHE_SIZE,
+            local_store=local_store
+        )
         if sheets_api:
             logger.info("Google Sheets API آماده است")
     else:
@@ -85,6 +135,29 @@ def init_apis():
     sheet_service = create_sheet_service(Config.GOOGLE_SHEETS_CREDENTIALS)
     if sheet_service:
         logger.info("Sheet Service آماده است")
+    
+    # Sync پس‌زمینه Notion و Sheets
+    if Config.SYNC_WORKER_ENABLED:
+        sync_worker = create_sync_worker(
+            db_service, notion_api, sheets_api,
+            tasks_db_id=Config.NOTION_TASKS_DB_ID,
+            habits_db_id=Config.NOTION_HABITS_DB_ID,
+            sheet_id=Config.DAILY_LOG_SHEET_ID,
+            sheet_name=Config.DAILY_LOG_SHEET_NAME,
+            notion_interval=Config.SYNC_NOTION_INTERVAL,
+            sheets_interval=Config.SYNC_SHEETS_INTERVAL,
+            full_sync_interval=Config.NOTION_FULL_SYNC_INTERVAL
+        )
+        sync_worker.start()
+    
+    # صف Write-behind تغییرات
+    if Config.OUTBOX_ENABLED:
+        outbox = create_outbox(
+            db_service, notion_api, sheets_api,
+            max_attempts=Config.OUTBOX_MAX_ATTEMPTS
+        )
+        outbox.start(Config.OUTBOX_FLUSH_INTERVAL)
+        logger.info("Outbox فعال است")
 
 
 def api_required(f):
@@ -97,6 +170,63 @@ def api_required(f):
     return decorated_function
 
 
+def conditional_get(version):
+    """
+    دکوراتور ETag برای API های GET
+    
+    ETag از نسخه داده‌ها (version) + آدرس کامل درخواست + تاریخ امروز ساخته میشه؛
+    اگه با If-None-Match مرورگر یکی باشه، 304 بدون اجرای View برمیگرده
+    
+    Args:
+        version: تابعی که نسخه فعلی داده‌ها رو برمیگردونه (None یعنی بدون ETag)
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            current = version()
+            if current is None:
+                return f(*args, **kwargs)
+            
+            # تاریخ: done_today و بازه days به امروز بستگی دارن
+            etag = hashlib.sha1(
+                f"{request.full_path}|{date.today().isoformat()}|{current}".encode('utf-8')
+            ).hexdigest()
+            
+            if request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+
+def tasks_version():
+    """نسخه Task های Notion (برای conditional_get)"""
+    if not Config.NOTION_TASKS_DB_ID:
+        return None
+    return notion_api.get_data_version(Config.NOTION_TASKS_DB_ID, 'tasks')
+
+
+def habits_version():
+    """نسخه Habit های Notion (برای conditional_get)"""
+    if not Config.NOTION_HABITS_DB_ID:
+        return None
+    return notion_api.get_data_version(Config.NOTION_HABITS_DB_ID, 'habits')
+
+
+def daily_logs_version():
+    """نسخه Daily Log های Google Sheets (برای conditional_get)"""
+    if not sheets_api or not Config.DAILY_LOG_SHEET_ID:
+        return None
+    return sheets_api.get_logs_version(Config.DAILY_LOG_SHEET_ID, Config.DAILY_LOG_SHEET_NAME)
+
+
 def allowed_file(filename):
     """بررسی پسوند فایل"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -109,56 +239,43 @@ def allowed_file(filename):
 @app.route('/')
 def dashboard():
     """صفحه اصلی داشبورد"""
-    tasks = []
-    stats = {}
-    habit_stats = {}
-    sheets_summary = {}
+    # درخواست‌های مستقل Notion و Sheets همزمان اجرا میشن
+    loader = ParallelLoader()
     
+    # یک‌بار دریافت کل Database تسک‌ها؛ لیست‌ها و آمار همه از همین Snapshot
     if notion_api and Config.NOTION_TASKS_DB_ID:
-        tasks = notion_api.fetch_tasks(Config.NOTION_TASKS_DB_ID)
-        stats = notion_api.get_task_stats(Config.NOTION_TASKS_DB_ID)
+        loader.add(
+            'snapshot', notion_api.get_task_snapshot,
+            Config.NOTION_TASKS_DB_ID, default=TaskSnapshot([])
+        )
     
     if notion_api and Config.NOTION_HABITS_DB_ID:
-        habit_stats = notion_api.get_habit_stats(Config.NOTION_HABITS_DB_ID)
+        loader.add('habit_stats', notion_api.get_habit_stats, Config.NOTION_HABITS_DB_ID, default={})
     
     if sheets_api and Config.DAILY_LOG_SHEET_ID:
-        sheets_summary = sheets_api.get_analytics_summary(
-            Config.DAILY_LOG_SHEET_ID,
-            Config.DAILY_LOG_SHEET_NAME
+        loader.add(
+            'sheets_summary', sheets_api.get_analytics_summary,
+            Config.DAILY_LOG_SHEET_ID, Config.DAILY_LOG_SHEET_NAME, default={}
         )
     
-    # گروه‌بندی Tasks بر اساس کوادرانت
-    quadrants = {1: [], 2: [], 3: [], 4: []}
-    for task in tasks:
-        q = task.get("quadrant", 4)
-        if len(quadrants[q]) < 5:
-            quadrants[q].append(task)
-    
-    # Quick Wins
-    quick_wins = [t for t in tasks if t.get("quick_win") and "Done" not in t.get("status", "")][:3]
-    
-    # Low Energy Tasks
-    low_energy = [t for t in tasks if "Low" in t.get("energy", "") and "Done" not in t.get("status", "")][:3]
-    
-    # High Focus Tasks
-    high_focus = [t for t in tasks if "High" in t.get("energy", "") and "Done" not in t.get("status", "")][:3]
-    
-    # Urgent reminders
-    reminders = [t for t in tasks if "Urgent" in t.get("urgency", "") or "🚨" in t.get("urgency", "")][:5]
+    results = loader.run()
+    snapshot = results.get('snapshot') or TaskSnapshot([])
+    habit_stats = results.get('habit_stats', {})
+    sheets_summary = results.get('sheets_summary', {})
     
     return render_template(
         'dashboard.html',
         user_name=Config.USER_NAME,
         today=datetime.now().strftime("%Y/%m/%d"),
         today_weekday=get_persian_weekday(),
-        stats=stats,
+        stats=snapshot.stats,
         habit_stats=habit_stats,
         sheets_summary=sheets_summary,
-        reminders=reminders,
-        quadrants=quadrants,
-        quick_wins=quick_wins,
-        low_energy=low_energy,
-        high_focus=high_focus,
+        reminders=snapshot.reminders(),
+        quadrants=snapshot.quadrants(),
+        quick_wins=snapshot.quick_wins(),
+        low_energy=snapshot.low_energy(),
+        high_focus=snapshot.high_focus(),
         notion_configured=Config.is_notion_configured(),
         sheets_configured=Config.is_sheets_configured()
     )
@@ -167,40 +284,64 @@ def dashboard():
 @app.route('/tasks')
 def tasks_page():
     """صفحه لیست Tasks"""
-    tasks = []
-    
-    if notion_api and Config.NOTION_TASKS_DB_ID:
-        tasks = notion_api.fetch_tasks(Config.NOTION_TASKS_DB_ID)
-    
     # فیلترها
     status_filter = request.args.get('status', '')
     context_filter = request.args.get('context', '')
     energy_filter = request.args.get('energy', '')
     search_query = request.args.get('q', '')
     
-    filtered_tasks = tasks
-    
-    if status_filter:
-        filtered_tasks = [t for t in filtered_tasks if status_filter in t.get("status", "")]
+    # Pagination (با cursor: فقط Task های صفحه فعلی خونده میشن)
+    page = request.args.get('page', 1, type=int)
+    per_page = Config.ITEMS_PER_PAGE
+    cursor = request.args.get('cursor', '')
+    # cursor صفحه‌های 2 تا page-1 (برای لینک «قبلی» بدون history مرورگر)
+    trail = [c for c in request.args.get('prev', '').split(',') if c]
+    if not cursor:
+        page, trail = 1, []
     
-    if context_filter:
-        filtered_tasks = [t for t in filtered_tasks if context_filter in str(t.get("context", []))]
+    total = 0
+    paginated_tasks = []
+    next_cursor = None
     
-    if energy_filter:
-        filtered_tasks = [t for t in filtered_tasks if energy_filter in t.get("energy", "")]
+    if notion_api and Config.NOTION_TASKS_DB_ID:
+        # با کش فعال از SQLite، وگرنه فیلتر و مرتب‌سازی سمت Notion
+        result = notion_api.query_tasks_page(
+            Config.NOTION_TASKS_DB_ID,
+            page_size=per_page,
+            start_cursor=cursor or None,
+            status=status_filter,
+            context=context_filter,
+            energy=energy_filter,
+            search=search_query
+        )
+        paginated_tasks = result["tasks"]
+        next_cursor = result["next_cursor"]
+        total = result["total"]
+    
+    filter_args = {
+        name: value for name, value in (
+            ('status', status_filter), ('context', context_filter),
+            ('energy', energy_filter), ('q', search_query)
+        ) if value
+    }
     
-    if search_query:
-        search_lower = search_query.lower()
-        filtered_tasks = [t for t in filtered_tasks 
-                         if search_lower in t.get("title", "").lower() 
-                         or search_lower in t.get("notes", "").lower()]
+    prev_url = None
+    if page == 2:
+        prev_url = url_for('tasks_page', **filter_args)
+    elif page > 2 and len(trail) == page - 2:
+        # آدرس مستقیم/Bookmark بدون trail کامل: لینک قبلی نشون داده نمیشه
+        prev_url = url_for(
+            'tasks_page', page=page - 1, cursor=trail[-1],
+            prev=','.join(trail[:-1]) or None, **filter_args
+        )
     
-    # Pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = Config.ITEMS_PER_PAGE
-    total = len(filtered_tasks)
-    start = (page - 1) * per_page
-    paginated_tasks = filtered_tasks[start:start + per_page]
+    next_url = None
+    if next_cursor:
+        next_trail = trail + [cursor] if cursor else []
+        next_url = url_for(
+            'tasks_page', page=page + 1, cursor=next_cursor,
+            prev=','.join(next_trail) or None, **filter_args
+        )
     
     return render_template(
         'tasks.html',
@@ -208,7 +349,9 @@ def tasks_page():
         total_tasks=total,
         page=page,
         per_page=per_page,
-        total_pages=(total + per_page - 1) // per_page,
+        cursor=cursor,
+        prev_url=prev_url,
+        next_url=next_url,
         filters={'status': status_filter, 'context': context_filter, 'energy': energy_filter, 'q': search_query},
         status_values=notion_api.task_status_options if notion_api else [],
         context_values=notion_api.context_options if notion_api else [],
@@ -258,43 +401,31 @@ def import_page():
 @app.route('/analytics')
 def analytics_page():
     """صفحه آمار و نمودارها"""
-    mood_data = {}
-    summary = {}
-    task_stats = {}
-    habit_stats = {}
-    bad_habits_freq = []
-    good_habits_streak = []
-    techniques_usage = []
+    # درخواست‌های مستقل Notion و Sheets همزمان اجرا میشن
+    loader = ParallelLoader()
     
     if sheets_api and Config.DAILY_LOG_SHEET_ID:
-        mood_data = sheets_api.get_mood_trend(
-            Config.DAILY_LOG_SHEET_ID,
-            Config.DAILY_LOG_SHEET_NAME,
-            days=14
-        )
-        summary = sheets_api.get_analytics_summary(
-            Config.DAILY_LOG_SHEET_ID,
-            Config.DAILY_LOG_SHEET_NAME,
-            days=30
-        )
-        bad_habits_freq = sheets_api.get_bad_habits_frequency(
-            Config.DAILY_LOG_SHEET_ID,
-            Config.DAILY_LOG_SHEET_NAME
-        )
-        good_habits_streak = sheets_api.get_good_habits_streak(
-            Config.DAILY_LOG_SHEET_ID,
-            Config.DAILY_LOG_SHEET_NAME
-        )
-        techniques_usage = sheets_api.get_techniques_usage(
-            Config.DAILY_LOG_SHEET_ID,
-            Config.DAILY_LOG_SHEET_NAME
-        )
+        sheet = (Config.DAILY_LOG_SHEET_ID, Config.DAILY_LOG_SHEET_NAME)
+        loader.add('mood_data', sheets_api.get_mood_trend, *sheet, days=14, default={})
+        loader.add('summary', sheets_api.get_analytics_summary, *sheet, days=30, default={})
+        loader.add('bad_habits_freq', sheets_api.get_bad_habits_frequency, *sheet, default=[])
+        loader.add('good_habits_streak', sheets_api.get_good_habits_streak, *sheet, default=[])
+        loader.add('techniques_usage', sheets_api.get_techniques_usage, *sheet, default=[])
     
     if notion_api and Config.NOTION_TASKS_DB_ID:
-        task_stats = notion_api.get_task_stats(Config.NOTION_TASKS_DB_ID)
+        loader.add('task_stats', notion_api.get_task_stats, Config.NOTION_TASKS_DB_ID, default={})
     
     if notion_api and Config.NOTION_HABITS_DB_ID:
-        habit_stats = notion_api.get_habit_stats(Config.NOTION_HABITS_DB_ID)
+        loader.add('habit_stats', notion_api.get_habit_stats, Config.NOTION_HABITS_DB_ID, default={})
+    
+    results = loader.run()
+    mood_data = results.get('mood_data', {})
+    summary = results.get('summary', {})
+    task_stats = results.get('task_stats', {})
+    habit_stats = results.get('habit_stats', {})
+    bad_habits_freq = results.get('bad_habits_freq', [])
+    good_habits_streak = results.get('good_habits_streak', [])
+    techniques_usage = results.get('techniques_usage', [])
     
     return render_template(
         'analytics.html',
@@ -335,12 +466,38 @@ def settings_page():
 
 @app.route('/api/tasks', methods=['GET'])
 @api_required
+@conditional_get(tasks_version)
 def api_get_tasks():
-    """دریافت لیست Tasks"""
+    """
+    دریافت لیست Tasks
+    
+    با هر کدوم از limit/status/urgency/energy/quadrant فقط limit «بهترین کار بعدی»
+    برمیگرده (مثلاً Focus Mode: ?status=Next%20Action&limit=1)، وگرنه کل لیست
+    """
     if not Config.NOTION_TASKS_DB_ID:
         return jsonify({"error": "Tasks Database تنظیم نشده"}), 400
     
-    tasks = notion_api.fetch_tasks(Config.NOTION_TASKS_DB_ID)
+    filters = {
+        name: request.args.get(name, '').strip()
+        for name in ('status', 'urgency', 'energy', 'context')
+    }
+    quadrant = request.args.get('quadrant', type=int)
+    limit = request.args.get('limit', type=int)
+    
+    if limit is None and quadrant is None and not any(filters.values()):
+        tasks = notion_api.fetch_tasks(Config.NOTION_TASKS_DB_ID)
+        return jsonify({"tasks": tasks, "count": len(tasks)})
+    
+    if quadrant is not None and quadrant not in (1, 2, 3, 4):
+        return jsonify({"error": "quadrant باید بین 1 تا 4 باشه"}), 400
+    
+    limit = min(max(limit or Config.ITEMS_PER_PAGE, 1), MAX_TASKS_LIMIT)
+    tasks = notion_api.select_tasks(
+        Config.NOTION_TASKS_DB_ID,
+        limit=limit,
+        quadrant=quadrant,
+        **{name: value or None for name, value in filters.items()}
+    )
     return jsonify({"tasks": tasks, "count": len(tasks)})
 
 
@@ -355,6 +512,10 @@ def api_create_task():
     if not data or not data.get('title'):
         return jsonify({"error": "عنوان الزامی است"}), 400
     
+    if outbox:
+        task = outbox.create_task(Config.NOTION_TASKS_DB_ID, data, get_idempotency_key())
+        return jsonify({"success": True, "task": task, "queued": True}), 202
+    
     task = notion_api.create_task(Config.NOTION_TASKS_DB_ID, data)
     
     if task:
@@ -370,6 +531,10 @@ def api_update_task(task_id):
     if not data:
         return jsonify({"error": "داده‌ای ارسال نشده"}), 400
     
+    if outbox:
+        task = outbox.update_task(task_id, data, get_idempotency_key())
+        return jsonify({"success": True, "task": task, "queued": True}), 202
+    
     task = notion_api.update_task(task_id, data)
     
     if task:
@@ -381,6 +546,11 @@ def api_update_task(task_id):
 @api_required
 def api_delete_task(task_id):
     """حذف Task"""
+    if outbox:
+        # بعد از تغییرات در انتظار همین Task آرشیو میشه (Task موقت فقط از صف حذف میشه)
+        queued = outbox.delete_task(task_id, get_idempotency_key())
+        return jsonify({"success": True, "queued": queued}), 202 if queued else 200
+    
     success = notion_api.delete_task(task_id)
     
     if success:
@@ -392,6 +562,10 @@ def api_delete_task(task_id):
 @api_required
 def api_mark_done(task_id):
     """تغییر وضعیت به Done"""
+    if outbox:
+        task = outbox.mark_done(task_id, get_idempotency_key())
+        return jsonify({"success": True, "task": task, "queued": True}), 202
+    
     task = notion_api.mark_done(task_id)
     
     if task:
@@ -422,6 +596,7 @@ def api_import_tasks():
 
 @app.route('/api/stats')
 @api_required
+@conditional_get(tasks_version)
 def api_get_stats():
     """دریافت آمار"""
     if not Config.NOTION_TASKS_DB_ID:
@@ -431,12 +606,35 @@ def api_get_stats():
     return jsonify(stats)
 
 
+@app.route('/api/notion/status')
+@api_required
+def api_notion_status():
+    """شمارنده‌های محدودیت نرخ و retry درخواست‌های Notion"""
+    return jsonify(notion_api.get_api_status())
+
+
+@app.route('/api/sync/status')
+def api_sync_status():
+    """وضعیت آخرین اجرای Sync Worker (همین Process یا sync_worker.py) و صف Outbox"""
+    if sync_worker:
+        status = sync_worker.get_status()
+    elif db_service:
+        status = load_sync_status(db_service)
+    else:
+        return jsonify({"error": "Database تنظیم نشده"}), 503
+    
+    if outbox:
+        status["outbox"] = outbox.get_status()
+    return jsonify(status)
+
+
 # ============================================
 # API Routes - Habits
 # ============================================
 
 @app.route('/api/habits', methods=['GET'])
 @api_required
+@conditional_get(habits_version)
 def api_get_habits():
     """دریافت لیست Habits"""
     if not Config.NOTION_HABITS_DB_ID:
@@ -487,6 +685,10 @@ def api_increment_habit(habit_id):
     if not Config.NOTION_HABITS_DB_ID:
         return jsonify({"error": "Habits Database تنظیم نشده"}), 400
     
+    if outbox:
+        habit = outbox.increment_habit(habit_id, get_idempotency_key())
+        return jsonify({"success": True, "habit": habit, "queued": True}), 202
+    
     habit = notion_api.increment_habit(Config.NOTION_HABITS_DB_ID, habit_id)
     
     if habit:
@@ -496,6 +698,7 @@ def api_increment_habit(habit_id):
 
 @app.route('/api/habits/stats')
 @api_required
+@conditional_get(habits_version)
 def api_habit_stats():
     """دریافت آمار Habits"""
     if not Config.NOTION_HABITS_DB_ID:
@@ -617,6 +820,7 @@ def api_sheet_status():
 # ============================================
 
 @app.route('/api/mood-data')
+@conditional_get(daily_logs_version)
 def api_mood_data():
     """دریافت داده‌های Mood"""
     if not sheets_api or not Config.DAILY_LOG_SHEET_ID:
@@ -639,6 +843,15 @@ def api_log_mood():
     
     data = request.get_json()
     
+    if outbox:
+        outbox.append_daily_log(
+            Config.DAILY_LOG_SHEET_ID,
+            Config.DAILY_LOG_SHEET_NAME,
+            data,
+            get_idempotency_key()
+        )
+        return jsonify({"success": True, "queued": True}), 202
+    
     success = sheets_api.append_daily_log(
         Config.DAILY_LOG_SHEET_ID,
         Config.DAILY_LOG_SHEET_NAME,
@@ -651,6 +864,7 @@ def api_log_mood():
 
 
 @app.route('/api/analytics/bad-habits')
+@conditional_get(daily_logs_version)
 def api_bad_habits():
     """دریافت فراوانی عادت‌های بد"""
     if not sheets_api or not Config.DAILY_LOG_SHEET_ID:
@@ -664,6 +878,7 @@ def api_bad_habits():
 
 
 @app.route('/api/analytics/good-habits')
+@conditional_get(daily_logs_version)
 def api_good_habits():
     """دریافت روند عادت‌های خوب"""
     if not sheets_api or not Config.DAILY_LOG_SHEET_ID:
@@ -677,6 +892,7 @@ def api_good_habits():
 
 
 @app.route('/api/analytics/techniques')
+@conditional_get(daily_logs_version)
 def api_techniques():
     """دریافت استفاده از تکنیک‌ها"""
     if not sheets_api or not Config.DAILY_LOG_SHEET_ID:
@@ -689,6 +905,30 @@ def api_techniques():
     return jsonify(data)
 
 
+# ============================================
+# API Routes - Search
+# ============================================
+
+@app.route('/api/search')
+def api_search():
+    """جستجوی تمام‌متن در Task ها و Daily Log ها"""
+    if not db_service or not db_service.fts_enabled:
+        return jsonify({"error": "جستجوی تمام‌متن در دسترس نیست"}), 503
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "متن جستجو خالی است"}), 400
+    
+    scope = request.args.get('type', 'all')
+    if scope not in ('all', 'tasks', 'logs'):
+        return jsonify({"error": "نوع جستجو نامعتبر است"}), 400
+    
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    
+    results = db_service.search(query, scope=scope, limit=limit)
+    return jsonify({"query": query, **results})
+
+
 # ============================================
 # Helper Functions
 # ============================================
@@ -707,6 +947,11 @@ def get_persian_weekday() -> str:
     return days.get(datetime.now().weekday(), "")
 
 
+def get_idempotency_key():
+    """کلید یکتای درخواست از هدر Idempotency-Key (برای Outbox)"""
+    return request.headers.get('Idempotency-Key') or None
+
+
 @app.context_processor
 def utility_processor():
     """توابع کمکی برای Templates"""
@@ -38,6 +38,8 @@ class Config:
     GOOGLE_SHEETS_CREDENTIALS = os.getenv('GOOGLE_SHEETS_CREDENTIALS', './credentials.json')
     DAILY_LOG_SHEET_ID = os.getenv('DAILY_LOG_SHEET_ID', '')
     DAILY_LOG_SHEET_NAME = os.getenv('DAILY_LOG_SHEET_NAME', 'Sheet1')
+    SHEETS_CACHE_TTL = int(os.getenv('SHEETS_CACHE_TTL', 60))  # ثانیه
+    SHEETS_CACHE_SIZE = int(os.getenv('SHEETS_CACHE_SIZE', 16))
     
     # Telegram (اختیاری)
     TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
@@ -45,6 +47,30 @@ class Config:
     
     # Database
     DATABASE_PATH = os.getenv('DATABASE_PATH', './database/local.db')
+    DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', 8))  # اتصال همزمان
+    
+    # Notion Cache (کپی محلی Task ها در SQLite)
+    NOTION_CACHE_ENABLED = os.getenv('NOTION_CACHE_ENABLED', 'False').lower() == 'true'
+    NOTION_CACHE_TTL = int(os.getenv('NOTION_CACHE_TTL', 60))  # ثانیه
+    NOTION_FULL_SYNC_INTERVAL = int(os.getenv('NOTION_FULL_SYNC_INTERVAL', 3600))  # ثانیه
+    
+    # Sync Worker پس‌زمینه (Request ها فقط از وضعیت محلی میخونن)
+    SYNC_WORKER_ENABLED = os.getenv('SYNC_WORKER_ENABLED', 'False').lower() == 'true'
+    # sync_worker.py جدا اجرا میشه (همون SQLite)؛ صفحات فقط از وضعیت محلی میخونن
+    SYNC_WORKER_EXTERNAL = os.getenv('SYNC_WORKER_EXTERNAL', 'False').lower() == 'true'
+    SYNC_NOTION_INTERVAL = int(os.getenv('SYNC_NOTION_INTERVAL', 60))  # ثانیه
+    SYNC_SHEETS_INTERVAL = int(os.getenv('SYNC_SHEETS_INTERVAL', 300))  # ثانیه
+    
+    # Outbox: تغییرات اول محلی ثبت و در پس‌زمینه به Notion/Sheets فرستاده میشن
+    OUTBOX_ENABLED = os.getenv('OUTBOX_ENABLED', 'False').lower() == 'true'
+    OUTBOX_FLUSH_INTERVAL = int(os.getenv('OUTBOX_FLUSH_INTERVAL', 5))  # ثانیه
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 8))
+    
+    # محدودیت نرخ Notion (حدود 3 درخواست در ثانیه)
+    NOTION_RATE_LIMIT = float(os.getenv('NOTION_RATE_LIMIT', 3))  # درخواست در ثانیه
+    NOTION_IMPORT_CONCURRENCY = int(os.getenv('NOTION_IMPORT_CONCURRENCY', 3))
+    # فایل SQLite مشترک بین Worker ها برای محدودیت نرخ (خالی = فقط محلی)
+    NOTION_RATE_LIMIT_DB = os.getenv('NOTION_RATE_LIMIT_DB', './database/rate_limit.db')
     
     # App Settings
     USER_NAME = os.getenv('USER_NAME', 'کاربر')
@@ -91,6 +117,11 @@ class Config:
         creds_path = Path(cls.GOOGLE_SHEETS_CREDENTIALS)
         return creds_path.exists() and bool(cls.DAILY_LOG_SHEET_ID)
     
+    @classmethod
+    def is_sync_worker_running(cls) -> bool:
+        """بررسی اینکه آیا Sync Worker (داخل Process یا sync_worker.py) SQLite رو پر میکنه"""
+        return cls.SYNC_WORKER_ENABLED or cls.SYNC_WORKER_EXTERNAL
+    
     @classmethod
     def is_telegram_configured(cls) -> bool:
         """بررسی اینکه آیا Telegram تنظیم شده"""
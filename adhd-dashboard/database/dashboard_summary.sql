@@ -0,0 +1,95 @@
+-- ============================================
+-- 📋 Dashboard Summary
+-- آمار Task های Notion (همون خروجی TaskSnapshot.stats) به صورت شمارنده‌های
+-- آماده؛ با هر تغییر جدول tasks (Sync یا DatabaseService) بروز میشن
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS dashboard_summary (
+    counter TEXT NOT NULL,
+    -- Values: total, done, urgent, quick_wins_pending,
+    --         quadrant (key: 1-4), energy (key: high/medium/low),
+    --         context (key: مقدار Context), done_day (key: YYYY-MM-DD)
+    key TEXT NOT NULL DEFAULT '',
+    value INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (counter, key)
+) WITHOUT ROWID;
+
+-- سهم هر Task در شمارنده‌ها (تعریف واحد برای Trigger ها و rebuild)
+-- شرط‌ها هم‌خوان با TaskSnapshot.stats هستن؛ View هر بار دوباره ساخته میشه تا
+-- دیتابیس‌های قدیمی هم تعریف جدید رو بگیرن (اگه عوض شده باشه شمارنده‌ها rebuild میشن)
+DROP VIEW IF EXISTS dashboard_summary_rows;
+CREATE VIEW dashboard_summary_rows AS
+    SELECT id AS task_id, 'total' AS counter, '' AS key
+    FROM tasks WHERE notion_id IS NOT NULL
+UNION ALL
+    SELECT id, 'done', ''
+    FROM tasks
+    WHERE notion_id IS NOT NULL AND (instr(status, 'Done') OR instr(status, '✅'))
+UNION ALL
+    SELECT id, 'done_day', substr(notion_edited_at, 1, 10)
+    FROM tasks
+    WHERE notion_id IS NOT NULL AND (instr(status, 'Done') OR instr(status, '✅'))
+      AND notion_edited_at IS NOT NULL
+UNION ALL
+    SELECT id, 'urgent', ''
+    FROM tasks
+    WHERE notion_id IS NOT NULL AND (instr(urgency, 'Urgent') OR instr(urgency, '🚨'))
+UNION ALL
+    SELECT id, 'quadrant', COALESCE(quadrant, 4)
+    FROM tasks WHERE notion_id IS NOT NULL
+UNION ALL
+    SELECT id, 'energy', bucket
+    FROM (
+        SELECT id, notion_id, CASE
+            WHEN instr(energy_level, 'High') OR instr(energy_level, '🔥') THEN 'high'
+            WHEN instr(energy_level, 'Medium') OR instr(energy_level, '⚡') THEN 'medium'
+            WHEN instr(energy_level, 'Low') OR instr(energy_level, '🪶') THEN 'low'
+        END AS bucket
+        FROM tasks
+    )
+    WHERE notion_id IS NOT NULL AND bucket IS NOT NULL
+UNION ALL
+    SELECT tasks.id, 'context', ctx.value
+    FROM tasks, json_each(CASE WHEN json_valid(tasks.context) THEN tasks.context ELSE '[]' END) AS ctx
+    WHERE tasks.notion_id IS NOT NULL
+UNION ALL
+    SELECT id, 'quick_wins_pending', ''
+    FROM tasks
+    WHERE notion_id IS NOT NULL AND quick_win
+      AND NOT (instr(COALESCE(status, ''), 'Done') OR instr(COALESCE(status, ''), '✅'));
+
+-- سهم قبلی ردیف قبل از تغییر کم و سهم جدید بعد از تغییر اضافه میشه
+-- (حذف و بروزرسانی باید BEFORE باشن چون View ردیف رو از خود جدول میخونه)
+CREATE TRIGGER IF NOT EXISTS dashboard_summary_insert
+AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO dashboard_summary (counter, key, value)
+    SELECT counter, key, 1 FROM dashboard_summary_rows WHERE task_id = NEW.id
+    ON CONFLICT(counter, key) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS dashboard_summary_delete
+BEFORE DELETE ON tasks
+BEGIN
+    INSERT INTO dashboard_summary (counter, key, value)
+    SELECT counter, key, -1 FROM dashboard_summary_rows WHERE task_id = OLD.id
+    ON CONFLICT(counter, key) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS dashboard_summary_update_old
+BEFORE UPDATE OF status, urgency, quadrant, energy_level, context, quick_win,
+                 notion_edited_at, notion_id ON tasks
+BEGIN
+    INSERT INTO dashboard_summary (counter, key, value)
+    SELECT counter, key, -1 FROM dashboard_summary_rows WHERE task_id = OLD.id
+    ON CONFLICT(counter, key) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS dashboard_summary_update_new
+AFTER UPDATE OF status, urgency, quadrant, energy_level, context, quick_win,
+                notion_edited_at, notion_id ON tasks
+BEGIN
+    INSERT INTO dashboard_summary (counter, key, value)
+    SELECT counter, key, 1 FROM dashboard_summary_rows WHERE task_id = NEW.id
+    ON CONFLICT(counter, key) DO UPDATE SET value = value + excluded.value;
+END;
@@ -0,0 +1,69 @@
+-- ============================================
+-- 🔖 Data Revisions
+-- یک شمارنده برای هر جدول که با هر INSERT/UPDATE/DELETE زیاد میشه؛
+-- ETag پاسخ‌های API از همین ساخته میشه (بدون خواندن خود داده‌ها)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS data_revisions (
+    name TEXT PRIMARY KEY,
+    -- Values: tasks, habits, daily_logs, epoch
+    revision INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+-- epoch: عدد تصادفی هر فایل دیتابیس، تا ETag های دیتابیس قبلی (بعد از
+-- حذف/ساخت دوباره فایل) با شمارنده‌های از نو شروع‌شده یکی نشن
+INSERT OR IGNORE INTO data_revisions (name, revision) VALUES ('epoch', abs(random()));
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_tasks_insert AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('tasks', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_tasks_update AFTER UPDATE ON tasks
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('tasks', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_tasks_delete AFTER DELETE ON tasks
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('tasks', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_habits_insert AFTER INSERT ON habits
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('habits', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_habits_update AFTER UPDATE ON habits
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('habits', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_habits_delete AFTER DELETE ON habits
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('habits', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_daily_logs_insert AFTER INSERT ON daily_logs
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('daily_logs', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_daily_logs_update AFTER UPDATE ON daily_logs
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('daily_logs', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_revision_daily_logs_delete AFTER DELETE ON daily_logs
+BEGIN
+    INSERT INTO data_revisions (name, revision) VALUES ('daily_logs', 1)
+    ON CONFLICT(name) DO UPDATE SET revision = revision + 1;
+END;
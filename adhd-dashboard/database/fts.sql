@@ -0,0 +1,67 @@
+-- ============================================
+-- 🔍 Full-Text Search (SQLite FTS5)
+-- جدا از schema.sql چون بعضی نسخه‌های SQLite بدون FTS5 کامپایل شدن
+-- ============================================
+
+-- ایندکس متن Task ها (محتوا از خود جدول tasks خونده میشه)
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    title,
+    notes,
+    content='tasks',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+-- ایندکس متن Daily Log ها
+CREATE VIRTUAL TABLE IF NOT EXISTS daily_logs_fts USING fts5(
+    top_win,
+    main_obstacle,
+    reflection,
+    daily_report,
+    content='daily_logs',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+-- Trigger ها برای همگام نگه داشتن ایندکس با جدول‌ها
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert
+AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO tasks_fts (rowid, title, notes) VALUES (NEW.id, NEW.title, NEW.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete
+AFTER DELETE ON tasks
+BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, notes) VALUES ('delete', OLD.id, OLD.title, OLD.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update
+AFTER UPDATE OF title, notes ON tasks
+BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, notes) VALUES ('delete', OLD.id, OLD.title, OLD.notes);
+    INSERT INTO tasks_fts (rowid, title, notes) VALUES (NEW.id, NEW.title, NEW.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_logs_fts_insert
+AFTER INSERT ON daily_logs
+BEGIN
+    INSERT INTO daily_logs_fts (rowid, top_win, main_obstacle, reflection, daily_report)
+    VALUES (NEW.id, NEW.top_win, NEW.main_obstacle, NEW.reflection, NEW.daily_report);
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_logs_fts_delete
+AFTER DELETE ON daily_logs
+BEGIN
+    INSERT INTO daily_logs_fts (daily_logs_fts, rowid, top_win, main_obstacle, reflection, daily_report)
+    VALUES ('delete', OLD.id, OLD.top_win, OLD.main_obstacle, OLD.reflection, OLD.daily_report);
+END;
+
+CREATE TRIGGER IF NOT EXISTS daily_logs_fts_update
+AFTER UPDATE OF top_win, main_obstacle, reflection, daily_report ON daily_logs
+BEGIN
+    INSERT INTO daily_logs_fts (daily_logs_fts, rowid, top_win, main_obstacle, reflection, daily_report)
+    VALUES ('delete', OLD.id, OLD.top_win, OLD.main_obstacle, OLD.reflection, OLD.daily_report);
+    INSERT INTO daily_logs_fts (rowid, top_win, main_obstacle, reflection, daily_report)
+    VALUES (NEW.id, NEW.top_win, NEW.main_obstacle, NEW.reflection, NEW.daily_report);
+END;
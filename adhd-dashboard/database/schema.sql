@@ -48,6 +48,15 @@ CREATE TABLE IF NOT EXISTS tasks (
     -- یادداشت
     notes TEXT,
     
+    -- فیلدهای کپی محلی Notion (Read-through Cache)
+    context TEXT DEFAULT '[]',
+    -- Format: ["📞 تماس", "💻 پشت سیستم"]
+    time_label TEXT,
+    quadrant INTEGER DEFAULT 4,
+    notion_url TEXT,
+    notion_created_at DATETIME,
+    notion_edited_at DATETIME,
+    
     -- شناسه‌های خارجی
     notion_id TEXT UNIQUE,
     google_event_id TEXT,
@@ -107,6 +116,10 @@ CREATE TABLE IF NOT EXISTS habits (
     replacement TEXT,
     why_important TEXT,
     
+    -- فیلدهای کپی محلی Notion
+    notion_url TEXT,
+    notion_edited_at DATETIME,
+    
     notion_id TEXT UNIQUE,
     
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -169,17 +182,71 @@ CREATE TABLE IF NOT EXISTS sync_logs (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- صف Outbox (Write-behind): تغییرات اول محلی اعمال و بعد به Notion/Sheets فرستاده میشن
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    
+    target TEXT NOT NULL,
+    -- Values: notion, sheets
+    
+    operation TEXT NOT NULL,
+    -- Values: create_task, update_task, archive_task, increment_habit, append_daily_log
+    
+    entity_id TEXT,
+    -- شناسه Page در Notion (یا local:... تا وقتی create_task فرستاده نشده)
+    -- ردیف create_task شناسه local:... رو نگه میداره؛ شناسه Notion در payload.notion_id
+    
+    payload TEXT DEFAULT '{}',
+    
+    status TEXT DEFAULT 'pending',
+    -- Values: pending, processing, done, failed
+    
+    attempts INTEGER DEFAULT 0,
+    next_attempt_at REAL DEFAULT 0,
+    claimed_at REAL,
+    last_error TEXT,
+    
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- کلیدهای یکتای درخواست‌ها (هدر Idempotency-Key)
+-- چند درخواست ادغام‌شده به یک ردیف outbox اشاره میکنن؛ تکرار یک درخواست نادیده گرفته میشه
+CREATE TABLE IF NOT EXISTS outbox_keys (
+    idempotency_key TEXT PRIMARY KEY,
+    outbox_id INTEGER NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
 -- ایندکس‌ها برای سرعت بیشتر
 CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
 CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
 CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
 CREATE INDEX IF NOT EXISTS idx_tasks_notion_id ON tasks(notion_id);
 
+-- ایندکس‌های ترکیبی query_tasks (فیلتر برابری + ترتیب keyset روی (sort, id))
+CREATE INDEX IF NOT EXISTS idx_tasks_quadrant ON tasks(quadrant, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_quadrant ON tasks(status, quadrant, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_category_quadrant ON tasks(category, quadrant, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_energy_quadrant ON tasks(energy_level, quadrant, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_urgency_quadrant ON tasks(urgency, quadrant, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_sort ON tasks(COALESCE(due_date, '9999-12-31'), id);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_due_sort ON tasks(status, COALESCE(due_date, '9999-12-31'), id);
+
+-- ترتیب 'priority' (Focus Mode و /api/tasks?limit=N)
+CREATE INDEX IF NOT EXISTS idx_tasks_priority_sort ON tasks((COALESCE(quadrant, 4) || '|' || COALESCE(due_date, '9999-12-31')), id);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_priority_sort ON tasks(status, (COALESCE(quadrant, 4) || '|' || COALESCE(due_date, '9999-12-31')), id);
+CREATE INDEX IF NOT EXISTS idx_tasks_urgency_priority_sort ON tasks(urgency, (COALESCE(quadrant, 4) || '|' || COALESCE(due_date, '9999-12-31')), id);
+
 CREATE INDEX IF NOT EXISTS idx_habits_type ON habits(type);
 CREATE INDEX IF NOT EXISTS idx_habits_status ON habits(status);
 
 CREATE INDEX IF NOT EXISTS idx_daily_logs_date ON daily_logs(log_date);
 
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at, id);
+CREATE INDEX IF NOT EXISTS idx_outbox_entity ON outbox(entity_id, status);
+CREATE INDEX IF NOT EXISTS idx_outbox_keys_outbox ON outbox_keys(outbox_id);
+
 -- داده‌های اولیه تنظیمات
 INSERT OR IGNORE INTO settings (key, value) VALUES 
     ('user_name', 'کاربر'),
@@ -0,0 +1,140 @@
+-- ============================================
+-- 📊 Stats Cache
+-- آمار داشبورد به صورت شمارنده‌هایی که Trigger ها بروز نگه میدارن
+-- (خواندن آمار = چند lookup روی کلید اصلی، مستقل از اندازه جدول‌ها)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS stats_cache (
+    metric TEXT NOT NULL,
+    -- Values: tasks.total, tasks.done, tasks.urgent, tasks.status, tasks.category,
+    --         habits.total, habits.good, habits.bad, habits.active, habits.achieved,
+    --         habits.counter, habits.longest_streak
+    key TEXT NOT NULL DEFAULT '',
+    -- برای tasks.status / tasks.category: مقدار ستون
+    value INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, key)
+) WITHOUT ROWID;
+
+-- MAX(best_streak) بعد از حذف/کاهش با این ایندکس دوباره حساب میشه
+CREATE INDEX IF NOT EXISTS idx_habits_best_streak ON habits(best_streak);
+
+-- ============================================
+-- Tasks
+-- ============================================
+
+CREATE TRIGGER IF NOT EXISTS stats_tasks_insert
+AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO stats_cache (metric, key, value) VALUES
+        ('tasks.total', '', 1),
+        ('tasks.done', '', NEW.status IS 'Done'),
+        ('tasks.urgent', '', COALESCE(NEW.urgency = 'Urgent' AND NEW.status != 'Done', 0))
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    SELECT 'tasks.status', NEW.status, 1 WHERE NEW.status IS NOT NULL
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    SELECT 'tasks.category', NEW.category, 1 WHERE NEW.category != ''
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_tasks_delete
+AFTER DELETE ON tasks
+BEGIN
+    INSERT INTO stats_cache (metric, key, value) VALUES
+        ('tasks.total', '', -1),
+        ('tasks.done', '', -(OLD.status IS 'Done')),
+        ('tasks.urgent', '', -COALESCE(OLD.urgency = 'Urgent' AND OLD.status != 'Done', 0))
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    SELECT 'tasks.status', OLD.status, -1 WHERE OLD.status IS NOT NULL
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    SELECT 'tasks.category', OLD.category, -1 WHERE OLD.category != ''
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_tasks_update
+AFTER UPDATE OF status, category, urgency ON tasks
+BEGIN
+    INSERT INTO stats_cache (metric, key, value) VALUES
+        ('tasks.done', '', (NEW.status IS 'Done') - (OLD.status IS 'Done')),
+        ('tasks.urgent', '',
+            COALESCE(NEW.urgency = 'Urgent' AND NEW.status != 'Done', 0)
+            - COALESCE(OLD.urgency = 'Urgent' AND OLD.status != 'Done', 0))
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    SELECT 'tasks.status', OLD.status, -1 WHERE OLD.status IS NOT NULL
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    SELECT 'tasks.status', NEW.status, 1 WHERE NEW.status IS NOT NULL
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    SELECT 'tasks.category', OLD.category, -1 WHERE OLD.category != ''
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    SELECT 'tasks.category', NEW.category, 1 WHERE NEW.category != ''
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+END;
+
+-- ============================================
+-- Habits
+-- ============================================
+
+CREATE TRIGGER IF NOT EXISTS stats_habits_insert
+AFTER INSERT ON habits
+BEGIN
+    INSERT INTO stats_cache (metric, key, value) VALUES
+        ('habits.total', '', 1),
+        ('habits.good', '', NEW.type IS 'good'),
+        ('habits.bad', '', NEW.type IS 'bad'),
+        ('habits.active', '', NEW.status IS 'active'),
+        ('habits.achieved', '', NEW.status IS 'achieved'),
+        ('habits.counter', '', COALESCE(NEW.counter, 0))
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    VALUES ('habits.longest_streak', '', (SELECT COALESCE(MAX(best_streak), 0) FROM habits))
+    ON CONFLICT(metric, key) DO UPDATE SET value = excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_habits_delete
+AFTER DELETE ON habits
+BEGIN
+    INSERT INTO stats_cache (metric, key, value) VALUES
+        ('habits.total', '', -1),
+        ('habits.good', '', -(OLD.type IS 'good')),
+        ('habits.bad', '', -(OLD.type IS 'bad')),
+        ('habits.active', '', -(OLD.status IS 'active')),
+        ('habits.achieved', '', -(OLD.status IS 'achieved')),
+        ('habits.counter', '', -COALESCE(OLD.counter, 0))
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    VALUES ('habits.longest_streak', '', (SELECT COALESCE(MAX(best_streak), 0) FROM habits))
+    ON CONFLICT(metric, key) DO UPDATE SET value = excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_habits_update
+AFTER UPDATE OF type, status, counter, best_streak ON habits
+BEGIN
+    INSERT INTO stats_cache (metric, key, value) VALUES
+        ('habits.good', '', (NEW.type IS 'good') - (OLD.type IS 'good')),
+        ('habits.bad', '', (NEW.type IS 'bad') - (OLD.type IS 'bad')),
+        ('habits.active', '', (NEW.status IS 'active') - (OLD.status IS 'active')),
+        ('habits.achieved', '', (NEW.status IS 'achieved') - (OLD.status IS 'achieved')),
+        ('habits.counter', '', COALESCE(NEW.counter, 0) - COALESCE(OLD.counter, 0))
+    ON CONFLICT(metric, key) DO UPDATE SET value = value + excluded.value;
+
+    INSERT INTO stats_cache (metric, key, value)
+    VALUES ('habits.longest_streak', '', (SELECT COALESCE(MAX(best_streak), 0) FROM habits))
+    ON CONFLICT(metric, key) DO UPDATE SET value = excluded.value;
+END;
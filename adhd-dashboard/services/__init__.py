@@ -4,8 +4,16 @@ Services Package v3.0
 
 from .sheet_service import SheetService, create_sheet_service
 from .db_service import DatabaseService, create_database_service
+from .notion_sync import NotionSyncEngine, create_notion_sync_engine
+from .notion_cache import NotionCache, create_notion_cache
+from .sync_worker import SyncWorker, create_sync_worker, load_sync_status
+from .outbox import Outbox, create_outbox
 
 __all__ = [
     'SheetService', 'create_sheet_service',
-    'DatabaseService', 'create_database_service'
+    'DatabaseService', 'create_database_service',
+    'NotionSyncEngine', 'create_notion_sync_engine',
+    'NotionCache', 'create_notion_cache',
+    'SyncWorker', 'create_sync_worker', 'load_sync_status',
+    'Outbox', 'create_outbox'
 ]
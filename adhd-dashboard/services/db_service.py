@@ -5,28 +5,98 @@
 
 import os
 import json
+import html
+import base64
 import sqlite3
 import logging
 from datetime import datetime, date
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from contextlib import contextmanager
+
+from .db_pool import SQLitePool
+from utils.records import TaskRecord, HabitRecord
 
 logger = logging.getLogger(__name__)
 
+# ستون‌هایی که بعد از نسخه اول به schema اضافه شدن
+# (دیتابیس‌های قدیمی با ALTER TABLE بروز میشن)
+SCHEMA_MIGRATIONS = {
+    'tasks': [
+        ('context', "TEXT DEFAULT '[]'"),
+        ('time_label', 'TEXT'),
+        ('quadrant', 'INTEGER DEFAULT 4'),
+        ('notion_url', 'TEXT'),
+        ('notion_created_at', 'DATETIME'),
+        ('notion_edited_at', 'DATETIME'),
+    ],
+    'habits': [
+        ('notion_url', 'TEXT'),
+        ('notion_edited_at', 'DATETIME'),
+    ]
+}
+
+# مقادیر Status که Done حساب میشن (هم‌خوان با فیلتر Notion)
+DONE_STATUSES = ('✅ Done', 'Done')
+
+# پیشوند notion_id برای Task هایی که هنوز از Outbox به Notion نرسیدن
+LOCAL_ID_PREFIX = 'local:'
+
+# ترتیب‌های query_tasks (عبارت‌ها باید با ایندکس‌های schema.sql یکی باشن)
+TASK_SORTS = {
+    'quadrant': 'quadrant',
+    'due_date': "COALESCE(due_date, '9999-12-31')",  # بدون Due Date ها آخر
+    # «بهترین کار بعدی»: کوادرانت، بعد نزدیک‌ترین Due Date (هم‌خوان با NotionAPI.task_priority_key)
+    'priority': "COALESCE(quadrant, 4) || '|' || COALESCE(due_date, '9999-12-31')"
+}
+
+# جدول‌های FTS5 (database/fts.sql)
+FTS_TABLES = ('tasks_fts', 'daily_logs_fts')
+
+# متریک‌های تک‌مقداری stats_cache (database/stats_cache.sql) -> کلید خروجی
+TASK_STAT_METRICS = {
+    'tasks.total': 'total',
+    'tasks.done': 'done',
+    'tasks.urgent': 'urgent'
+}
+HABIT_STAT_METRICS = {
+    'habits.total': 'total',
+    'habits.good': 'good_count',
+    'habits.bad': 'bad_count',
+    'habits.active': 'active',
+    'habits.achieved': 'achieved',
+    'habits.longest_streak': 'longest_streak',
+    'habits.counter': 'total_counter'
+}
+
+# نشانگرهای موقت snippet (بعد از escape به <mark> تبدیل میشن)
+SNIPPET_OPEN, SNIPPET_CLOSE = '\x02', '\x03'
+
+# فیلترهای fetch_habits روی کپی محلی
+NOTION_HABIT_FILTERS = {
+    'good': ('type', '🟢 عادت خوب'),
+    'bad': ('type', '🔴 عادت بد'),
+    'active': ('status', '🎯 Active')
+}
+
 
 class DatabaseService:
     """سرویس مدیریت SQLite Database"""
     
-    def __init__(self, db_path: str = './database/local.db'):
+    def __init__(self, db_path: str = './database/local.db', pool_size: int = 8):
         """
         سازنده
         
         Args:
             db_path: مسیر فایل دیتابیس
+            pool_size: حداکثر اتصال‌های همزمان
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fts_enabled = False
+        self.stats_cache_enabled = False
+        self.summary_enabled = False
+        self.revisions_enabled = False
+        self._pool = SQLitePool(self.db_path, size=pool_size)
         self._init_db()
     
     def _init_db(self):
@@ -38,22 +108,123 @@ class DatabaseService:
                 schema = f.read()
             
             with self.get_connection() as conn:
+                self._migrate(conn)
                 conn.executescript(schema)
                 conn.commit()
+                self.fts_enabled = self._init_fts(conn)
+                self.stats_cache_enabled = self._init_stats_cache(conn)
+                self.summary_enabled = self._init_dashboard_summary(conn)
+                self.revisions_enabled = self._init_data_revisions(conn)
+                conn.commit()
             
             logger.info(f"Database initialized: {self.db_path}")
         else:
             logger.warning(f"Schema file not found: {schema_path}")
     
-    @contextmanager
-    def get_connection(self):
-        """Context manager برای اتصال به دیتابیس"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+    def _init_fts(self, conn) -> bool:
+        """ساخت ایندکس‌های جستجوی تمام‌متن (اگه SQLite از FTS5 پشتیبانی کنه)"""
+        fts_path = Path(__file__).parent.parent / 'database' / 'fts.sql'
+        if not fts_path.exists():
+            return False
+        
+        existing = {
+            row['name'] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        
         try:
-            yield conn
-        finally:
-            conn.close()
+            with open(fts_path, 'r', encoding='utf-8') as f:
+                conn.executescript(f.read())
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 not available, full-text search disabled: {e}")
+            return False
+        
+        # ایندکس تازه ساخته شده: ردیف‌های موجود باید ایندکس بشن
+        for table in FTS_TABLES:
+            if table not in existing:
+                conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+                logger.info(f"Built full-text index: {table}")
+        
+        return True
+    
+    def _init_stats_cache(self, conn) -> bool:
+        """ساخت جدول stats_cache و Trigger هاش"""
+        created = self._apply_sql_file(conn, 'stats_cache.sql', 'stats_cache')
+        if created is None:
+            return False
+        
+        # جدول تازه ساخته شده: شمارنده‌ها از داده‌های موجود پر میشن
+        if created:
+            self._rebuild_stats_cache(conn)
+            logger.info("Built stats cache")
+        
+        return True
+    
+    def _init_dashboard_summary(self, conn) -> bool:
+        """ساخت جدول dashboard_summary و Trigger هاش"""
+        old_view = self._view_sql(conn, 'dashboard_summary_rows')
+        created = self._apply_sql_file(conn, 'dashboard_summary.sql', 'dashboard_summary')
+        if created is None:
+            return False
+        
+        # جدول تازه، یا تعریف View عوض شده: شمارنده‌ها از نو حساب میشن
+        if created or old_view != self._view_sql(conn, 'dashboard_summary_rows'):
+            self._rebuild_dashboard_summary(conn)
+            logger.info("Built dashboard summary")
+        
+        return True
+    
+    def _init_data_revisions(self, conn) -> bool:
+        """ساخت جدول data_revisions و Trigger هاش (شمارنده‌ها از همین حالا شروع میشن)"""
+        return self._apply_sql_file(conn, 'data_revisions.sql', 'data_revisions') is not None
+    
+    def _view_sql(self, conn, name: str) -> Optional[str]:
+        """تعریف فعلی یک View (None اگه وجود نداشته باشه)"""
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = ?", (name,)
+        ).fetchone()
+        return row['sql'] if row else None
+    
+    def _apply_sql_file(self, conn, filename: str, table: str) -> Optional[bool]:
+        """
+        اجرای یک فایل از پوشه database
+        
+        Returns:
+            None اگه فایل وجود نداشته باشه، وگرنه آیا table تازه ساخته شد
+        """
+        sql_path = Path(__file__).parent.parent / 'database' / filename
+        if not sql_path.exists():
+            return None
+        
+        created = not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        
+        with open(sql_path, 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+        
+        return created
+    
+    def _migrate(self, conn):
+        """اضافه کردن ستون‌های جدید به جدول‌های موجود"""
+        for table, columns in SCHEMA_MIGRATIONS.items():
+            existing = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if not existing:
+                continue  # جدول هنوز ساخته نشده، schema خودش می‌سازه
+            
+            for column, decl in columns:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+                    logger.info(f"Migrated {table}: added column {column}")
+    
+    def get_connection(self):
+        """Context manager برای اتصال به دیتابیس (از Pool)"""
+        return self._pool.connection()
+    
+    def close(self):
+        """بستن اتصال‌های Pool"""
+        self._pool.close()
     
     # ============================================
     # Tasks CRUD
@@ -210,49 +381,684 @@ class DatabaseService:
             return False
     
     def get_task_stats(self) -> Dict:
-        """دریافت آمار Task ها"""
+        """دریافت آمار Task ها (از stats_cache، یا با یک اسکن جدول)"""
         try:
             with self.get_connection() as conn:
-                stats = {
-                    'total': 0,
-                    'done': 0,
-                    'pending': 0,
-                    'urgent': 0,
-                    'by_status': {},
-                    'by_category': {}
-                }
-                
-                # Total
-                cursor = conn.execute("SELECT COUNT(*) FROM tasks")
-                stats['total'] = cursor.fetchone()[0]
-                
-                # Done
-                cursor = conn.execute("SELECT COUNT(*) FROM tasks WHERE status = 'Done'")
-                stats['done'] = cursor.fetchone()[0]
-                
-                # Pending
-                stats['pending'] = stats['total'] - stats['done']
-                
-                # Urgent
-                cursor = conn.execute("SELECT COUNT(*) FROM tasks WHERE urgency = 'Urgent' AND status != 'Done'")
-                stats['urgent'] = cursor.fetchone()[0]
-                
-                # By Status
-                cursor = conn.execute("SELECT status, COUNT(*) as cnt FROM tasks GROUP BY status")
-                for row in cursor.fetchall():
-                    stats['by_status'][row['status']] = row['cnt']
+                if self.stats_cache_enabled:
+                    return self._cached_task_stats(conn)
+                return self._compute_task_stats(conn)
+        except Exception as e:
+            logger.error(f"Error getting task stats: {e}")
+            return {}
+    
+    def _compute_task_stats(self, conn) -> Dict:
+        """آمار Task ها با یک GROUP BY (به جای پنج Query جدا)"""
+        stats = {
+            'total': 0,
+            'done': 0,
+            'pending': 0,
+            'urgent': 0,
+            'by_status': {},
+            'by_category': {}
+        }
+        
+        cursor = conn.execute("""
+            SELECT status, category, COUNT(*) AS cnt,
+                   COALESCE(SUM(urgency = 'Urgent'), 0) AS urgent
+            FROM tasks
+            GROUP BY status, category
+        """)
+        for row in cursor.fetchall():
+            status, category, count = row['status'], row['category'], row['cnt']
+            
+            stats['total'] += count
+            if status is not None:
+                stats['by_status'][status] = stats['by_status'].get(status, 0) + count
+                if status == 'Done':
+                    stats['done'] += count
+                else:
+                    stats['urgent'] += row['urgent']
+            if category:
+                stats['by_category'][category] = stats['by_category'].get(category, 0) + count
+        
+        stats['pending'] = stats['total'] - stats['done']
+        return stats
+    
+    def _cached_task_stats(self, conn) -> Dict:
+        """آمار Task ها از شمارنده‌های stats_cache"""
+        stats = {key: 0 for key in TASK_STAT_METRICS.values()}
+        stats['by_status'] = {}
+        stats['by_category'] = {}
+        
+        cursor = conn.execute("""
+            SELECT metric, key, value FROM stats_cache
+            WHERE metric IN ('tasks.total', 'tasks.done', 'tasks.urgent',
+                             'tasks.status', 'tasks.category')
+        """)
+        for row in cursor.fetchall():
+            metric = row['metric']
+            if metric in TASK_STAT_METRICS:
+                stats[TASK_STAT_METRICS[metric]] = row['value']
+            elif row['value'] > 0:
+                group = 'by_status' if metric == 'tasks.status' else 'by_category'
+                stats[group][row['key']] = row['value']
+        
+        stats['pending'] = stats['total'] - stats['done']
+        return stats
+    
+    # ============================================
+    # Task Query (ایندکس‌دار، صفحه‌بندی keyset)
+    # ============================================
+    
+    def query_tasks(
+        self,
+        status=None,
+        category=None,
+        energy=None,
+        urgency=None,
+        context=None,
+        search: str = None,
+        include_done: bool = False,
+        quadrant=None,
+        sort: str = 'quadrant',
+        limit: int = 20,
+        after: str = None,
+        notion_only: bool = False,
+        with_total: bool = False
+    ) -> Dict:
+        """
+        جستجوی Task ها با صفحه‌بندی keyset
+        
+        هر صفحه از ادامه ایندکس (sort, id) خونده میشه، پس هزینه صفحه N
+        مثل صفحه اول است (برخلاف OFFSET)
+        
+        Args:
+            status, category, energy, urgency, context: یک مقدار یا لیست مقادیر
+            search: جستجو در عنوان و یادداشت
+            quadrant: یک کوادرانت یا لیست کوادرانت‌ها (1 تا 4)
+            sort: 'quadrant'، 'due_date' یا 'priority'
+            limit: تعداد Task در صفحه
+            after: next_cursor صفحه قبل
+            notion_only: فقط کپی محلی Notion (خروجی با فرمت NotionAPI)
+            with_total: محاسبه تعداد کل نتایج
+        
+        Returns:
+            {"tasks": [...], "next_cursor": str|None, "has_more": bool, "total": int|None}
+        """
+        sort_expr = TASK_SORTS.get(sort, TASK_SORTS['quadrant'])
+        where, params = self._task_conditions(
+            status, category, energy, urgency, context, search, include_done, notion_only, quadrant
+        )
+        
+        page_where, page_params = list(where), list(params)
+        key = self._decode_cursor(after)
+        if key:
+            page_where.append(f"({sort_expr} > ? OR ({sort_expr} = ? AND id > ?))")
+            page_params += [key[0], key[0], key[1]]
+        
+        sql = (
+            f"SELECT *, {sort_expr} AS sort_key FROM tasks"
+            f" WHERE {' AND '.join(page_where) or '1=1'}"
+            f" ORDER BY {sort_expr}, id LIMIT ?"
+        )
+        page_params.append(limit + 1)
+        
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute(sql, page_params).fetchall()
                 
-                # By Category
-                cursor = conn.execute("SELECT category, COUNT(*) as cnt FROM tasks WHERE category IS NOT NULL GROUP BY category")
-                for row in cursor.fetchall():
-                    if row['category']:
-                        stats['by_category'][row['category']] = row['cnt']
+                total = None
+                if with_total:
+                    total = conn.execute(
+                        f"SELECT COUNT(*) FROM tasks WHERE {' AND '.join(where) or '1=1'}", params
+                    ).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error querying tasks: {e}")
+            return {"tasks": [], "next_cursor": None, "has_more": False, "total": None}
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if notion_only:
+            tasks = [self._row_to_notion_task(row) for row in rows]
+        else:
+            tasks = []
+            for row in rows:
+                task = self._row_to_dict(row)
+                task.pop('sort_key', None)
+                tasks.append(task)
+        
+        return {
+            "tasks": tasks,
+            "next_cursor": self._encode_cursor(rows[-1]['sort_key'], rows[-1]['id']) if has_more else None,
+            "has_more": has_more,
+            "total": total
+        }
+    
+    def _task_conditions(self, status, category, energy, urgency, context,
+                         search, include_done, notion_only, quadrant=None):
+        """شرط‌های WHERE برای query_tasks"""
+        where, params = [], []
+        
+        if notion_only:
+            where.append("notion_id IS NOT NULL")
+        
+        if not include_done:
+            where.append(f"status NOT IN ({', '.join('?' * len(DONE_STATUSES))})")
+            params.extend(DONE_STATUSES)
+        
+        for column, value in (('status', status), ('category', category),
+                              ('energy_level', energy), ('urgency', urgency)):
+            values = self._as_list(value)
+            if values:
+                where.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        
+        quadrants = self._as_list(quadrant)
+        if quadrants:
+            where.append(f"quadrant IN ({', '.join('?' * len(quadrants))})")
+            params.extend(int(q) for q in quadrants)
+        
+        contexts = self._as_list(context)
+        if contexts:
+            # context یک آرایه JSON است؛ هر مقدار با کوتیشن‌هاش جستجو میشه
+            where.append("(" + " OR ".join(["context LIKE ? ESCAPE '\\'"] * len(contexts)) + ")")
+            params.extend(self._like_pattern(json.dumps(c, ensure_ascii=False)) for c in contexts)
+        
+        if search:
+            # «شامل متن» بدون حساسیت به حروف (مثل contains در Notion)؛ MATCH در FTS5
+            # فقط پیشوند Token ها رو پیدا میکنه ("work" در "Homework" نه)، پس
+            # tasks_fts فقط برای search() / api_search استفاده میشه
+            where.append("(title LIKE ? ESCAPE '\\' OR notes LIKE ? ESCAPE '\\')")
+            params += [self._like_pattern(search)] * 2
+        
+        return where, params
+    
+    def _as_list(self, value) -> List:
+        """یک مقدار یا لیست → لیست (مقادیر خالی حذف میشن)"""
+        if not value:
+            return []
+        if isinstance(value, (list, tuple, set)):
+            return [v for v in value if v]
+        return [value]
+    
+    def _like_pattern(self, text: str) -> str:
+        """الگوی LIKE برای «شامل text» (با escape کاراکترهای % و _)"""
+        escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"%{escaped}%"
+    
+    def _encode_cursor(self, sort_key, row_id: int) -> str:
+        """ساخت cursor از کلید آخرین ردیف صفحه"""
+        raw = json.dumps([sort_key, row_id], ensure_ascii=False).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+    
+    def _decode_cursor(self, cursor: str):
+        """خواندن cursor (نامعتبر = صفحه اول)"""
+        if not cursor:
+            return None
+        try:
+            sort_key, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return sort_key, int(row_id)
+        except (ValueError, TypeError):
+            return None
+    
+    # ============================================
+    # Full-Text Search
+    # ============================================
+    
+    def search(self, query: str, scope: str = 'all', limit: int = 20) -> Dict:
+        """
+        جستجوی تمام‌متن در Task ها و Daily Log ها
+        
+        Args:
+            query: متن جستجو (هر کلمه به عنوان پیشوند جستجو میشه)
+            scope: 'tasks'، 'logs' یا 'all'
+            limit: حداکثر نتیجه برای هر نوع
+        
+        Returns:
+            {"tasks": [...], "logs": [...]} مرتب بر اساس رتبه bm25،
+            هر نتیجه با snippet (کلمات پیدا شده داخل <mark>)
+        """
+        result = {"tasks": [], "logs": []}
+        match = self._fts_query(query)
+        if not self.fts_enabled or not match:
+            return result
+        
+        try:
+            with self.get_connection() as conn:
+                if scope in ('all', 'tasks'):
+                    rows = conn.execute(f"""
+                        SELECT t.id, t.notion_id, t.title, t.status, t.notion_url,
+                               snippet(tasks_fts, -1, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '…', 12) AS snippet,
+                               bm25(tasks_fts, 5.0, 1.0) AS rank
+                        FROM tasks_fts
+                        JOIN tasks t ON t.id = tasks_fts.rowid
+                        WHERE tasks_fts MATCH ?
+                        ORDER BY rank
+                        LIMIT ?
+                    """, (match, limit)).fetchall()
+                    
+                    result["tasks"] = [{
+                        "id": row['id'],
+                        "notion_id": row['notion_id'],
+                        "title": row['title'],
+                        "status": row['status'],
+                        "url": row['notion_url'] or "",
+                        "snippet": self._render_snippet(row['snippet']),
+                        "rank": round(row['rank'], 4)
+                    } for row in rows]
                 
-                return stats
+                if scope in ('all', 'logs'):
+                    rows = conn.execute(f"""
+                        SELECT l.id, l.log_date, l.mood, l.energy,
+                               snippet(daily_logs_fts, -1, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '…', 16) AS snippet,
+                               bm25(daily_logs_fts) AS rank
+                        FROM daily_logs_fts
+                        JOIN daily_logs l ON l.id = daily_logs_fts.rowid
+                        WHERE daily_logs_fts MATCH ?
+                        ORDER BY rank
+                        LIMIT ?
+                    """, (match, limit)).fetchall()
+                    
+                    result["logs"] = [{
+                        "id": row['id'],
+                        "date": row['log_date'],
+                        "mood": row['mood'],
+                        "energy": row['energy'],
+                        "snippet": self._render_snippet(row['snippet']),
+                        "rank": round(row['rank'], 4)
+                    } for row in rows]
         except Exception as e:
-            logger.error(f"Error getting task stats: {e}")
+            logger.error(f"Error searching: {e}")
+        
+        return result
+    
+    def _fts_query(self, text: str) -> Optional[str]:
+        """تبدیل متن کاربر به عبارت MATCH امن (هر کلمه یک پیشوند، با AND)"""
+        tokens = (text or '').split()
+        if not tokens:
+            return None
+        return ' '.join('"' + token.replace('"', '""') + '"*' for token in tokens)
+    
+    def _render_snippet(self, snippet: str) -> str:
+        """escape کردن HTML متن و تبدیل نشانگرها به <mark>"""
+        return (
+            html.escape(snippet or '')
+            .replace(SNIPPET_OPEN, '<mark>')
+            .replace(SNIPPET_CLOSE, '</mark>')
+        )
+    
+    # ============================================
+    # Notion Mirror (کپی محلی Task های Notion)
+    # ============================================
+    
+    def upsert_notion_tasks(self, tasks: List[Dict]) -> int:
+        """ذخیره/بروزرسانی Task های Notion با کلید notion_id"""
+        if not tasks:
+            return 0
+        
+        sql = """
+            INSERT INTO tasks (
+                notion_id, title, status, context, energy_level, importance,
+                urgency, time_label, due_date, quick_win, notes, quadrant,
+                notion_url, notion_created_at, notion_edited_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(notion_id) DO UPDATE SET
+                title = excluded.title,
+                status = excluded.status,
+                context = excluded.context,
+                energy_level = excluded.energy_level,
+                importance = excluded.importance,
+                urgency = excluded.urgency,
+                time_label = excluded.time_label,
+                due_date = excluded.due_date,
+                quick_win = excluded.quick_win,
+                notes = excluded.notes,
+                quadrant = excluded.quadrant,
+                notion_url = excluded.notion_url,
+                notion_created_at = excluded.notion_created_at,
+                notion_edited_at = excluded.notion_edited_at
+            -- ردیف بدون تغییر (مثلاً Page آخر Watermark در هر Sync افزایشی) نوشته
+            -- نمیشه تا Trigger ها (data_revisions و شمارنده‌ها) اجرا نشن
+            WHERE (title, status, context, energy_level,
+                   importance, urgency, time_label, due_date,
+                   quick_win, notes, quadrant, notion_url,
+                   notion_created_at, notion_edited_at)
+               IS NOT (excluded.title, excluded.status, excluded.context, excluded.energy_level,
+                       excluded.importance, excluded.urgency, excluded.time_label, excluded.due_date,
+                       excluded.quick_win, excluded.notes, excluded.quadrant, excluded.notion_url,
+                       excluded.notion_created_at, excluded.notion_edited_at)
+        """
+        
+        rows = [(
+            task['id'],
+            task.get('title', ''),
+            task.get('status', ''),
+            json.dumps(task.get('context', []), ensure_ascii=False),
+            task.get('energy', ''),
+            task.get('importance', ''),
+            task.get('urgency', ''),
+            task.get('time', ''),
+            task.get('due_date'),
+            1 if task.get('quick_win') else 0,
+            task.get('notes', ''),
+            task.get('quadrant', 4),
+            task.get('url', ''),
+            task.get('created_time'),
+            task.get('last_edited_time')
+        ) for task in tasks]
+        
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(sql, rows)
+                conn.commit()
+                return len(rows)
+        except Exception as e:
+            logger.error(f"Error upserting notion tasks: {e}")
+            return 0
+    
+    def get_notion_tasks(self, include_done: bool = False) -> List[Dict]:
+        """دریافت Task های کپی‌شده از Notion (با فرمت NotionAPI)"""
+        sql = "SELECT * FROM tasks WHERE notion_id IS NOT NULL"
+        params = []
+        
+        if not include_done:
+            sql += f" AND status NOT IN ({', '.join('?' * len(DONE_STATUSES))})"
+            params.extend(DONE_STATUSES)
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(sql, params)
+                return [self._row_to_notion_task(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error fetching notion tasks: {e}")
+            return []
+    
+    def get_notion_task(self, notion_id: str) -> Optional[Dict]:
+        """دریافت یک Task کپی‌شده با notion_id"""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute(
+                    "SELECT * FROM tasks WHERE notion_id = ?", (notion_id,)
+                ).fetchone()
+                return self._row_to_notion_task(row) if row else None
+        except Exception as e:
+            logger.error(f"Error fetching notion task: {e}")
+            return None
+    
+    def get_notion_task_versions(self) -> Dict[str, str]:
+        """نگاشت notion_id به last_edited_time برای تشخیص تغییرات"""
+        try:
+            with self.get_connection() as conn:
+                # Task های محلی (صف Outbox) در Notion نیستن و نباید حذف‌شده حساب بشن
+                cursor = conn.execute(
+                    "SELECT notion_id, notion_edited_at FROM tasks "
+                    "WHERE notion_id IS NOT NULL AND notion_id NOT LIKE ?",
+                    (LOCAL_ID_PREFIX + '%',)
+                )
+                return {row['notion_id']: row['notion_edited_at'] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error fetching notion task versions: {e}")
+            return {}
+    
+    def delete_notion_tasks(self, notion_ids: List[str] = None) -> bool:
+        """حذف Task های کپی‌شده (بدون notion_ids یعنی همه)"""
+        try:
+            with self.get_connection() as conn:
+                if notion_ids is None:
+                    conn.execute("DELETE FROM tasks WHERE notion_id IS NOT NULL")
+                else:
+                    conn.executemany(
+                        "DELETE FROM tasks WHERE notion_id = ?",
+                        [(notion_id,) for notion_id in notion_ids]
+                    )
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Error deleting notion tasks: {e}")
+            return False
+    
+    def upsert_notion_habits(self, habits: List[Dict]) -> int:
+        """ذخیره/بروزرسانی Habit های Notion با کلید notion_id"""
+        if not habits:
+            return 0
+        
+        sql = """
+            INSERT INTO habits (
+                notion_id, name, type, category, status, frequency,
+                start_date, counter, streak, best_streak, last_logged,
+                trigger_text, replacement, why_important,
+                notion_url, notion_edited_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(notion_id) DO UPDATE SET
+                name = excluded.name,
+                type = excluded.type,
+                category = excluded.category,
+                status = excluded.status,
+                frequency = excluded.frequency,
+                start_date = excluded.start_date,
+                counter = excluded.counter,
+                streak = excluded.streak,
+                best_streak = excluded.best_streak,
+                last_logged = excluded.last_logged,
+                trigger_text = excluded.trigger_text,
+                replacement = excluded.replacement,
+                why_important = excluded.why_important,
+                notion_url = excluded.notion_url,
+                notion_edited_at = excluded.notion_edited_at
+            WHERE (name, type, category, status, frequency,
+                   start_date, counter, streak, best_streak,
+                   last_logged, trigger_text, replacement,
+                   why_important, notion_url, notion_edited_at)
+               IS NOT (excluded.name, excluded.type, excluded.category, excluded.status,
+                       excluded.frequency, excluded.start_date, excluded.counter, excluded.streak,
+                       excluded.best_streak, excluded.last_logged, excluded.trigger_text,
+                       excluded.replacement, excluded.why_important, excluded.notion_url,
+                       excluded.notion_edited_at)
+        """
+        
+        rows = [(
+            habit['id'],
+            habit.get('name', ''),
+            habit.get('type', ''),
+            habit.get('category', ''),
+            habit.get('status', ''),
+            habit.get('frequency', ''),
+            habit.get('start_date'),
+            habit.get('counter', 0),
+            habit.get('streak', 0),
+            habit.get('best_streak', 0),
+            habit.get('last_mentioned'),
+            habit.get('trigger', ''),
+            habit.get('replacement', ''),
+            habit.get('why', ''),
+            habit.get('url', ''),
+            habit.get('last_edited_time')
+        ) for habit in habits]
+        
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(sql, rows)
+                conn.commit()
+                return len(rows)
+        except Exception as e:
+            logger.error(f"Error upserting notion habits: {e}")
+            return 0
+    
+    def get_notion_habits(self, filter_type: str = 'all') -> List[Dict]:
+        """دریافت Habit های کپی‌شده از Notion (با فرمت NotionAPI)"""
+        sql = "SELECT * FROM habits WHERE notion_id IS NOT NULL"
+        params = []
+        
+        if filter_type in NOTION_HABIT_FILTERS:
+            column, value = NOTION_HABIT_FILTERS[filter_type]
+            sql += f" AND {column} = ?"
+            params.append(value)
+        
+        sql += " ORDER BY streak DESC"
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(sql, params)
+                return [self._row_to_notion_habit(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error fetching notion habits: {e}")
+            return []
+    
+    def get_notion_habit(self, notion_id: str) -> Optional[Dict]:
+        """دریافت یک Habit کپی‌شده با notion_id"""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute(
+                    "SELECT * FROM habits WHERE notion_id = ?", (notion_id,)
+                ).fetchone()
+                return self._row_to_notion_habit(row) if row else None
+        except Exception as e:
+            logger.error(f"Error fetching notion habit: {e}")
+            return None
+    
+    def get_notion_habit_versions(self) -> Dict[str, str]:
+        """نگاشت notion_id به last_edited_time برای Habit ها"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(
+                    "SELECT notion_id, notion_edited_at FROM habits WHERE notion_id IS NOT NULL"
+                )
+                return {row['notion_id']: row['notion_edited_at'] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error fetching notion habit versions: {e}")
             return {}
     
+    def delete_notion_habits(self, notion_ids: List[str] = None) -> bool:
+        """حذف Habit های کپی‌شده (بدون notion_ids یعنی همه)"""
+        try:
+            with self.get_connection() as conn:
+                if notion_ids is None:
+                    conn.execute("DELETE FROM habits WHERE notion_id IS NOT NULL")
+                else:
+                    conn.executemany(
+                        "DELETE FROM habits WHERE notion_id = ?",
+                        [(notion_id,) for notion_id in notion_ids]
+                    )
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Error deleting notion habits: {e}")
+            return False
+    
+    # ============================================
+    # Dashboard Summary (database/dashboard_summary.sql)
+    # ============================================
+    
+    def get_dashboard_summary(self, today: str = None) -> Optional[Dict]:
+        """
+        آمار Task های Notion از شمارنده‌های آماده (همون خروجی TaskSnapshot.stats)
+        
+        Args:
+            today: تاریخ YYYY-MM-DD برای done_today (پیش‌فرض امروز)
+        
+        Returns:
+            None اگه جدول در دسترس نباشه
+        """
+        if not self.summary_enabled:
+            return None
+        
+        today = today or datetime.now().date().isoformat()
+        stats = {
+            "total": 0,
+            "done": 0,
+            "pending": 0,
+            "urgent": 0,
+            "done_today": 0,
+            "by_quadrant": {1: 0, 2: 0, 3: 0, 4: 0},
+            "by_energy": {"high": 0, "medium": 0, "low": 0},
+            "by_context": {},
+            "quick_wins_pending": 0
+        }
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT counter, key, value FROM dashboard_summary
+                    WHERE counter IN ('total', 'done', 'urgent', 'quick_wins_pending',
+                                      'quadrant', 'energy', 'context')
+                       OR (counter = 'done_day' AND key = ?)
+                """, (today,))
+                rows = cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Error reading dashboard summary: {e}")
+            return None
+        
+        for row in rows:
+            counter, key, value = row['counter'], row['key'], row['value']
+            if counter == 'done_day':
+                stats['done_today'] = value
+            elif counter == 'quadrant':
+                stats['by_quadrant'][int(key)] = value
+            elif counter == 'energy':
+                stats['by_energy'][key] = value
+            elif counter == 'context':
+                if value > 0:
+                    stats['by_context'][key] = value
+            else:
+                stats[counter] = value
+        
+        stats['pending'] = stats['total'] - stats['done']
+        return stats
+    
+    def rebuild_dashboard_summary(self) -> bool:
+        """محاسبه دوباره همه شمارنده‌های dashboard_summary"""
+        if not self.summary_enabled:
+            return False
+        try:
+            with self.get_connection() as conn:
+                self._rebuild_dashboard_summary(conn)
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Error rebuilding dashboard summary: {e}")
+            return False
+    
+    def _rebuild_dashboard_summary(self, conn):
+        """پر کردن dashboard_summary از روی View سهم Task ها"""
+        conn.execute("DELETE FROM dashboard_summary")
+        conn.execute("""
+            INSERT INTO dashboard_summary (counter, key, value)
+            SELECT counter, key, COUNT(*) FROM dashboard_summary_rows
+            GROUP BY counter, key
+        """)
+    
+    # ============================================
+    # Data Revisions (database/data_revisions.sql)
+    # ============================================
+    
+    def get_data_revision(self, *names: str) -> Optional[str]:
+        """
+        نسخه فعلی جدول‌ها برای ETag (با هر تغییر در یکی از جدول‌ها عوض میشه)
+        
+        Args:
+            names: tasks / habits / daily_logs
+        
+        Returns:
+            None اگه جدول در دسترس نباشه
+        """
+        if not self.revisions_enabled:
+            return None
+        
+        names = ('epoch',) + names
+        placeholders = ', '.join('?' * len(names))
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(
+                    f"SELECT name, revision FROM data_revisions WHERE name IN ({placeholders})",
+                    names
+                )
+                revisions = {row['name']: row['revision'] for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error reading data revisions: {e}")
+            return None
+        
+        return '.'.join(str(revisions.get(name, 0)) for name in names)
+    
     # ============================================
     # Habits CRUD
     # ============================================
@@ -352,45 +1158,73 @@ class DatabaseService:
             return None
     
     def get_habit_stats(self) -> Dict:
-        """دریافت آمار Habit ها"""
-        try:
-            with self.get_connection() as conn:
-                stats = {
-                    'total': 0,
-                    'good_count': 0,
-                    'bad_count': 0,
-                    'active': 0,
-                    'achieved': 0,
-                    'longest_streak': 0,
-                    'total_counter': 0
-                }
-                
-                cursor = conn.execute("SELECT COUNT(*) FROM habits")
-                stats['total'] = cursor.fetchone()[0]
-                
-                cursor = conn.execute("SELECT COUNT(*) FROM habits WHERE type = 'good'")
-                stats['good_count'] = cursor.fetchone()[0]
-                
-                cursor = conn.execute("SELECT COUNT(*) FROM habits WHERE type = 'bad'")
-                stats['bad_count'] = cursor.fetchone()[0]
-                
-                cursor = conn.execute("SELECT COUNT(*) FROM habits WHERE status = 'active'")
-                stats['active'] = cursor.fetchone()[0]
-                
-                cursor = conn.execute("SELECT COUNT(*) FROM habits WHERE status = 'achieved'")
-                stats['achieved'] = cursor.fetchone()[0]
-                
-                cursor = conn.execute("SELECT MAX(best_streak) FROM habits")
-                stats['longest_streak'] = cursor.fetchone()[0] or 0
-                
-                cursor = conn.execute("SELECT SUM(counter) FROM habits")
-                stats['total_counter'] = cursor.fetchone()[0] or 0
-                
-                return stats
+        """دریافت آمار Habit ها (از stats_cache، یا با یک اسکن جدول)"""
+        try:
+            with self.get_connection() as conn:
+                if self.stats_cache_enabled:
+                    return self._cached_habit_stats(conn)
+                return self._compute_habit_stats(conn)
         except Exception as e:
             logger.error(f"Error getting habit stats: {e}")
             return {}
     
+    def _compute_habit_stats(self, conn) -> Dict:
+        """آمار Habit ها با یک Query (Conditional Aggregation)"""
+        row = conn.execute("""
+            SELECT
+                COUNT(*) AS total,
+                COALESCE(SUM(type = 'good'), 0) AS good_count,
+                COALESCE(SUM(type = 'bad'), 0) AS bad_count,
+                COALESCE(SUM(status = 'active'), 0) AS active,
+                COALESCE(SUM(status = 'achieved'), 0) AS achieved,
+                COALESCE(MAX(best_streak), 0) AS longest_streak,
+                COALESCE(SUM(counter), 0) AS total_counter
+            FROM habits
+        """).fetchone()
+        return dict(row)
+    
+    def _cached_habit_stats(self, conn) -> Dict:
+        """آمار Habit ها از شمارنده‌های stats_cache"""
+        stats = {key: 0 for key in HABIT_STAT_METRICS.values()}
+        
+        placeholders = ','.join('?' * len(HABIT_STAT_METRICS))
+        cursor = conn.execute(
+            f"SELECT metric, value FROM stats_cache WHERE metric IN ({placeholders})",
+            list(HABIT_STAT_METRICS)
+        )
+        for row in cursor.fetchall():
+            stats[HABIT_STAT_METRICS[row['metric']]] = row['value']
+        
+        return stats
+    
+    def rebuild_stats_cache(self) -> bool:
+        """محاسبه دوباره همه شمارنده‌های stats_cache از روی جدول‌ها"""
+        if not self.stats_cache_enabled:
+            return False
+        try:
+            with self.get_connection() as conn:
+                self._rebuild_stats_cache(conn)
+                conn.commit()
+                return True
+        except Exception as e:
+            logger.error(f"Error rebuilding stats cache: {e}")
+            return False
+    
+    def _rebuild_stats_cache(self, conn):
+        """پر کردن stats_cache با مسیر Aggregate"""
+        tasks = self._compute_task_stats(conn)
+        habits = self._compute_habit_stats(conn)
+        
+        rows = [(metric, '', tasks[key]) for metric, key in TASK_STAT_METRICS.items()]
+        rows += [('tasks.status', k, v) for k, v in tasks['by_status'].items()]
+        rows += [('tasks.category', k, v) for k, v in tasks['by_category'].items()]
+        rows += [(metric, '', habits[key]) for metric, key in HABIT_STAT_METRICS.items()]
+        
+        conn.execute("DELETE FROM stats_cache")
+        conn.executemany(
+            "INSERT INTO stats_cache (metric, key, value) VALUES (?, ?, ?)", rows
+        )
+    
     # ============================================
     # Daily Logs CRUD
     # ============================================
@@ -398,17 +1232,34 @@ class DatabaseService:
     def create_daily_log(self, log_data: Dict) -> Optional[int]:
         """ایجاد لاگ روزانه"""
         sql = """
-            INSERT OR REPLACE INTO daily_logs (
+            INSERT INTO daily_logs (
                 log_date, mood, energy, top_win, main_obstacle,
                 techniques_suggested, techniques_used, bad_habits, good_habits,
                 desires, reflection, daily_report, sleep_hours, tasks_done
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(log_date) DO UPDATE SET
+                mood = excluded.mood,
+                energy = excluded.energy,
+                top_win = excluded.top_win,
+                main_obstacle = excluded.main_obstacle,
+                techniques_suggested = excluded.techniques_suggested,
+                techniques_used = excluded.techniques_used,
+                bad_habits = excluded.bad_habits,
+                good_habits = excluded.good_habits,
+                desires = excluded.desires,
+                reflection = excluded.reflection,
+                daily_report = excluded.daily_report,
+                sleep_hours = excluded.sleep_hours,
+                tasks_done = excluded.tasks_done
         """
+        # UPSERT به جای INSERT OR REPLACE: REPLACE ردیف رو بدون اجرای
+        # Trigger های DELETE حذف میکنه و ایندکس FTS قدیمی می‌مونه
+        log_date = log_data.get('log_date', date.today().isoformat())
         
         try:
             with self.get_connection() as conn:
-                cursor = conn.execute(sql, (
-                    log_data.get('log_date', date.today().isoformat()),
+                conn.execute(sql, (
+                    log_date,
                     log_data.get('mood', 5),
                     log_data.get('energy', 5),
                     log_data.get('top_win', ''),
@@ -424,11 +1275,110 @@ class DatabaseService:
                     log_data.get('tasks_done', 0)
                 ))
                 conn.commit()
-                return cursor.lastrowid
+                row = conn.execute(
+                    "SELECT id FROM daily_logs WHERE log_date = ?", (log_date,)
+                ).fetchone()
+                return row['id'] if row else None
         except Exception as e:
             logger.error(f"Error creating daily log: {e}")
             return None
     
+    def upsert_sheet_logs(self, logs: List[Dict]) -> int:
+        """
+        ذخیره/بروزرسانی Daily Log های Google Sheets (فرمت read_daily_logs) با کلید تاریخ
+        
+        sleep_hours و tasks_done لاگ‌های موجود دست نمی‌خورن
+        """
+        if not logs:
+            return 0
+        
+        sql = """
+            INSERT INTO daily_logs (
+                log_date, mood, energy, top_win, main_obstacle,
+                techniques_suggested, techniques_used, bad_habits, good_habits,
+                desires, reflection, daily_report, synced_to_sheets
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+            ON CONFLICT(log_date) DO UPDATE SET
+                mood = excluded.mood,
+                energy = excluded.energy,
+                top_win = excluded.top_win,
+                main_obstacle = excluded.main_obstacle,
+                techniques_suggested = excluded.techniques_suggested,
+                techniques_used = excluded.techniques_used,
+                bad_habits = excluded.bad_habits,
+                good_habits = excluded.good_habits,
+                desires = excluded.desires,
+                reflection = excluded.reflection,
+                daily_report = excluded.daily_report,
+                synced_to_sheets = 1
+            WHERE (mood, energy, top_win, main_obstacle, techniques_suggested,
+                   techniques_used, bad_habits, good_habits, desires, reflection,
+                   daily_report)
+               IS NOT (excluded.mood, excluded.energy, excluded.top_win,
+                       excluded.main_obstacle, excluded.techniques_suggested,
+                       excluded.techniques_used, excluded.bad_habits,
+                       excluded.good_habits, excluded.desires, excluded.reflection,
+                       excluded.daily_report)
+        """
+        # ردیف‌های بدون تغییر دوباره نوشته نمیشن (ایندکس FTS بیخودی بروز نمیشه)
+        
+        rows = [(
+            log['date'],
+            # محدوده CHECK جدول (1 تا 10)
+            min(max(log.get('mood', 5), 1), 10),
+            min(max(log.get('energy', 5), 1), 10),
+            log.get('top_win', ''),
+            log.get('main_obstacle', ''),
+            log.get('techniques_suggested', ''),
+            log.get('techniques_used', ''),
+            log.get('bad_habits', ''),
+            log.get('good_habits', ''),
+            log.get('desires', ''),
+            log.get('reflection', ''),
+            log.get('daily_report', '')
+        ) for log in logs]
+        
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(sql, rows)
+                conn.commit()
+                return len(rows)
+        except Exception as e:
+            logger.error(f"Error upserting sheet logs: {e}")
+            return 0
+    
+    def get_sheet_logs(self) -> Optional[List[Dict]]:
+        """
+        همه Daily Log ها به فرمت read_daily_logs (برعکس upsert_sheet_logs)
+
+        Returns:
+            None اگه جدول خونده نشه
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT log_date, mood, energy, top_win, main_obstacle,
+                           techniques_suggested, techniques_used, bad_habits,
+                           good_habits, desires, reflection, daily_report
+                    FROM daily_logs
+                    ORDER BY log_date
+                """)
+                rows = cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Error fetching sheet logs: {e}")
+            return None
+
+        text_fields = (
+            'top_win', 'main_obstacle', 'techniques_suggested', 'techniques_used',
+            'bad_habits', 'good_habits', 'desires', 'reflection', 'daily_report'
+        )
+        return [dict(
+            {field: row[field] or '' for field in text_fields},
+            date=row['log_date'],
+            mood=row['mood'] if row['mood'] is not None else 5,
+            energy=row['energy'] if row['energy'] is not None else 5
+        ) for row in rows]
+
     def get_daily_logs(self, days: int = 30) -> List[Dict]:
         """دریافت لاگ‌های روزانه"""
         try:
@@ -519,6 +1469,52 @@ class DatabaseService:
                 d['tags'] = {}
         
         return d
+    
+    def _row_to_notion_task(self, row) -> TaskRecord:
+        """تبدیل Row جدول tasks به فرمت خروجی NotionAPI._parse_task"""
+        try:
+            context = json.loads(row['context']) if row['context'] else []
+        except (ValueError, TypeError):
+            context = []
+        
+        return TaskRecord(
+            id=row['notion_id'],
+            title=row['title'] or "",
+            status=row['status'] or "",
+            context=context,
+            energy=row['energy_level'] or "",
+            importance=row['importance'] or "",
+            urgency=row['urgency'] or "",
+            time=row['time_label'] or "",
+            due_date=row['due_date'],
+            quick_win=bool(row['quick_win']),
+            notes=row['notes'] or "",
+            quadrant=row['quadrant'] or 4,
+            url=row['notion_url'] or "",
+            created_time=row['notion_created_at'],
+            last_edited_time=row['notion_edited_at']
+        )
+    
+    def _row_to_notion_habit(self, row) -> HabitRecord:
+        """تبدیل Row جدول habits به فرمت خروجی NotionAPI._parse_habit"""
+        return HabitRecord(
+            id=row['notion_id'],
+            name=row['name'] or "",
+            type=row['type'] or "",
+            category=row['category'] or "",
+            status=row['status'] or "",
+            frequency=row['frequency'] or "",
+            start_date=row['start_date'],
+            counter=row['counter'] or 0,
+            last_mentioned=row['last_logged'],
+            streak=row['streak'] or 0,
+            best_streak=row['best_streak'] or 0,
+            trigger=row['trigger_text'] or "",
+            replacement=row['replacement'] or "",
+            why=row['why_important'] or "",
+            url=row['notion_url'] or "",
+            last_edited_time=row['notion_edited_at']
+        )
 
 
 # Import timedelta
@@ -529,6 +1525,7 @@ from datetime import timedelta
 # Factory
 # ============================================
 
-def create_database_service(db_path: str = './database/local.db') -> DatabaseService:
+def create_database_service(db_path: str = './database/local.db',
+                            pool_size: int = 8) -> DatabaseService:
     """Factory function"""
-    return DatabaseService(db_path)
+    return DatabaseService(db_path, pool_size=pool_size)
@@ -0,0 +1,183 @@
+"""
+⚡ Notion Cache Service v3.1
+کش Read-through برای Task ها و Habit های Notion روی SQLite
+
+- خواندن‌ها از جدول‌های tasks و habits (کلید: notion_id) انجام میشن
+- اگه کش قدیمی‌تر از TTL باشه، در پس‌زمینه با NotionSyncEngine بروز میشه
+- بروزرسانی‌ها افزایشی هستن (فقط Page های ویرایش شده بعد از Watermark)
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Callable, Optional
+
+from .notion_sync import NotionSyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class NotionCache:
+    """کش محلی Task ها و Habit های Notion"""
+
+    def __init__(self, notion_api, db_service, ttl: int = 60,
+                 full_sync_interval: int = 3600):
+        """
+        سازنده
+
+        Args:
+            notion_api: نمونه NotionAPI
+            db_service: نمونه DatabaseService
+            ttl: عمر کش به ثانیه
+            full_sync_interval: فاصله Sync کامل به ثانیه
+        """
+        self.notion_api = notion_api
+        self.db = db_service
+        self.ttl = ttl
+        self.sync_engine = NotionSyncEngine(notion_api, db_service, full_sync_interval)
+        self._lock = threading.Lock()
+
+    # ============================================
+    # Read
+    # ============================================
+
+    def get_tasks(self, database_id: str, include_done: bool = False) -> List[Dict]:
+        """دریافت Task ها از کش محلی"""
+        self._ensure_fresh(database_id, self.sync_engine.sync_tasks)
+
+        tasks = self.db.get_notion_tasks(include_done)
+        tasks.sort(key=self.notion_api.task_sort_key)
+        return tasks
+
+    def query_tasks_page(self, database_id: str, page_size: int = 10,
+                         start_cursor: str = None, **filters) -> Dict:
+        """
+        یک صفحه از Task های فیلترشده از کش محلی (با ایندکس‌های SQLite)
+
+        Args:
+            filters: آرگومان‌های DatabaseService.query_tasks
+        """
+        self._ensure_fresh(database_id, self.sync_engine.sync_tasks)
+
+        return self.db.query_tasks(
+            limit=page_size, after=start_cursor, notion_only=True, with_total=True, **filters
+        )
+
+    def select_tasks(self, database_id: str, limit: int = 1, **filters) -> List[Dict]:
+        """
+        limit Task اول با ترتیب 'priority' (فقط همین ردیف‌ها از SQLite خونده میشن)
+
+        Args:
+            filters: آرگومان‌های DatabaseService.query_tasks
+        """
+        self._ensure_fresh(database_id, self.sync_engine.sync_tasks)
+
+        return self.db.query_tasks(
+            limit=limit, sort='priority', notion_only=True, **filters
+        )["tasks"]
+
+    def get_task_stats(self, database_id: str) -> Optional[Dict]:
+        """آمار Task ها از شمارنده‌های dashboard_summary (None اگه در دسترس نباشه)"""
+        self._ensure_fresh(database_id, self.sync_engine.sync_tasks)
+        return self.db.get_dashboard_summary()
+
+    def get_habits(self, database_id: str, filter_type: str = 'all') -> List[Dict]:
+        """دریافت Habit ها از کش محلی"""
+        self._ensure_fresh(database_id, self.sync_engine.sync_habits)
+        return self.db.get_notion_habits(filter_type)
+
+    def get_data_version(self, database_id: str, kind: str = 'tasks') -> Optional[str]:
+        """
+        نسخه Task ها یا Habit های کش برای ETag
+
+        مثل بقیه خواندن‌ها اول کش رو تازه میکنه، پس پاسخ 304 جلوی Sync رو نمیگیره
+        """
+        sync = self.sync_engine.sync_habits if kind == 'habits' else self.sync_engine.sync_tasks
+        self._ensure_fresh(database_id, sync)
+        return self.db.get_data_revision(kind)
+    
+    def is_warm(self, database_id: str) -> bool:
+        """آیا کش برای این Database پر شده؟"""
+        return bool(self.sync_engine.last_synced_at(database_id))
+
+    def is_stale(self, database_id: str) -> bool:
+        """آیا از آخرین بروزرسانی بیشتر از TTL گذشته؟"""
+        synced_at = self.sync_engine.last_synced_at(database_id)
+        if not synced_at:
+            return True
+
+        try:
+            age = (datetime.now() - datetime.fromisoformat(synced_at)).total_seconds()
+        except ValueError:
+            return True
+
+        return age > self.ttl
+
+    # ============================================
+    # Refresh
+    # ============================================
+
+    def _ensure_fresh(self, database_id: str, sync: Callable):
+        """پر کردن کش سرد به صورت همزمان، یا بروزرسانی کش قدیمی در پس‌زمینه"""
+        if not self.is_warm(database_id):
+            # اولین بار: باید صبر کنیم تا کش پر بشه
+            self.refresh(database_id, sync)
+        elif self.is_stale(database_id):
+            self.refresh_async(database_id, sync)
+
+    def refresh(self, database_id: str, sync: Callable) -> bool:
+        """بروزرسانی همزمان کش (منتظر refresh در حال اجرا می‌مونه)"""
+        with self._lock:
+            # ممکنه یک Thread دیگه همین الان کش رو پر کرده باشه
+            if self.is_warm(database_id) and not self.is_stale(database_id):
+                return True
+            return self._refresh(database_id, sync)
+
+    def refresh_async(self, database_id: str, sync: Callable) -> bool:
+        """بروزرسانی در پس‌زمینه (اگه refresh دیگه‌ای در جریان نباشه)"""
+        if not self._lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self._refresh(database_id, sync)
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, name='notion-cache-refresh', daemon=True).start()
+        return True
+
+    def _refresh(self, database_id: str, sync: Callable) -> bool:
+        """اجرای Sync افزایشی"""
+        try:
+            sync(database_id)
+            return True
+        except Exception as e:
+            logger.error(f"خطا در بروزرسانی کش Notion: {e}")
+            return False
+
+    # ============================================
+    # Write-through
+    # ============================================
+
+    def store_task(self, task: Dict):
+        """ثبت Task ایجاد/بروز شده در کش"""
+        self.db.upsert_notion_tasks([task])
+
+    def forget_task(self, notion_id: str):
+        """حذف Task آرشیو شده از کش"""
+        self.db.delete_notion_tasks([notion_id])
+
+    def store_habit(self, habit: Dict):
+        """ثبت Habit ایجاد/بروز شده در کش"""
+        self.db.upsert_notion_habits([habit])
+
+
+# ============================================
+# Factory
+# ============================================
+
+def create_notion_cache(notion_api, db_service, ttl: int = 60,
+                        full_sync_interval: int = 3600) -> NotionCache:
+    """Factory function"""
+    return NotionCache(notion_api, db_service, ttl, full_sync_interval)
@@ -0,0 +1,185 @@
+"""
+🔄 Notion Sync Engine v3.1
+Sync افزایشی (Delta) از Notion به SQLite
+
+- برای هر Database یک Watermark (آخرین last_edited_time دیده‌شده) در جدول settings
+- هر Sync فقط Page های ویرایش شده بعد از Watermark رو از Notion می‌گیره
+- Page های آرشیو شده در Query ها برنمی‌گردن، پس هر چند وقت یک‌بار
+  Sync کامل انجام میشه تا حذف‌ها هم اعمال بشن
+"""
+
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import Optional, List, Dict, Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# تعداد Page هایی که هر بار در SQLite ادغام میشن (برابر اندازه صفحه Notion)
+BATCH_SIZE = 100
+
+
+class NotionSyncEngine:
+    """موتور Sync افزایشی Tasks و Habits"""
+
+    def __init__(self, notion_api, db_service, full_sync_interval: int = 3600):
+        """
+        سازنده
+
+        Args:
+            notion_api: نمونه NotionAPI
+            db_service: نمونه DatabaseService
+            full_sync_interval: فاصله Sync کامل به ثانیه (برای تشخیص حذف‌ها)
+        """
+        self.notion_api = notion_api
+        self.db = db_service
+        self.full_sync_interval = full_sync_interval
+
+    # ============================================
+    # Public
+    # ============================================
+
+    def sync_tasks(self, database_id: str, full: bool = False) -> Dict:
+        """Sync کردن Task ها (شامل Done ها)"""
+        return self._sync(
+            'tasks', database_id, full,
+            query=lambda since: self.notion_api.iter_tasks(
+                database_id, include_done=True, edited_since=since
+            ),
+            versions=self.db.get_notion_task_versions,
+            upsert=self.db.upsert_notion_tasks,
+            delete=self.db.delete_notion_tasks
+        )
+
+    def sync_habits(self, database_id: str, full: bool = False) -> Dict:
+        """Sync کردن Habit ها"""
+        return self._sync(
+            'habits', database_id, full,
+            query=lambda since: self.notion_api.iter_habits(
+                database_id, filter_type='all', edited_since=since
+            ),
+            versions=self.db.get_notion_habit_versions,
+            upsert=self.db.upsert_notion_habits,
+            delete=self.db.delete_notion_habits
+        )
+
+    def last_synced_at(self, database_id: str) -> Optional[str]:
+        """زمان آخرین Sync موفق این Database"""
+        return self.db.get_setting(f'notion_synced_at:{database_id}') or None
+
+    def get_watermark(self, database_id: str) -> Optional[str]:
+        """آخرین last_edited_time دیده‌شده برای این Database"""
+        return self.db.get_setting(f'notion_watermark:{database_id}') or None
+
+    def reset(self, database_id: str):
+        """پاک کردن Watermark (Sync بعدی کامل انجام میشه)"""
+        for key in ('notion_watermark', 'notion_synced_at', 'notion_full_sync_at'):
+            self.db.set_setting(f'{key}:{database_id}', '')
+
+    # ============================================
+    # Internal
+    # ============================================
+
+    def _sync(self, kind: str, database_id: str, full: bool,
+              query: Callable, versions: Callable,
+              upsert: Callable, delete: Callable) -> Dict:
+        """
+        Sync عمومی
+
+        Raises:
+            خطاهای Notion بالا فرستاده میشن تا Watermark جلو نره
+        """
+        # اگه Database عوض شده، کپی محلی قبلی معتبر نیست
+        db_key = f'notion_{kind}_db'
+        if self.db.get_setting(db_key) != database_id:
+            delete()
+            self.reset(database_id)
+            self.db.set_setting(db_key, database_id)
+
+        watermark = self.get_watermark(database_id)
+        full = full or not watermark or self._full_sync_due(database_id)
+
+        # Notion زمان ویرایش رو تا دقیقه گرد میکنه؛ on_or_after همون دقیقه رو
+        # دوباره میاره تا تغییرات هم‌دقیقه با Watermark از دست نرن
+        pages = query(None if full else watermark)
+
+        # نتایج صفحه به صفحه (هر بار حداکثر BATCH_SIZE) ادغام میشن
+        known = versions()
+        seen = set()
+        fetched = changed = 0
+        newest = watermark or ""
+
+        for batch in _batched(pages, BATCH_SIZE):
+            if full:
+                batch_changed = [
+                    page for page in batch
+                    if known.get(page["id"]) != page.get("last_edited_time")
+                    or (watermark and (page.get("last_edited_time") or "") >= watermark)
+                ]
+            else:
+                batch_changed = batch
+
+            upsert(batch_changed)
+            fetched += len(batch)
+            changed += len(batch_changed)
+
+            for page in batch:
+                seen.add(page["id"])
+                newest = max(newest, page.get("last_edited_time") or "")
+
+        removed = [notion_id for notion_id in known if notion_id not in seen] if full else []
+        if removed:
+            delete(removed)
+
+        if newest and newest != watermark:
+            watermark = newest
+            self.db.set_setting(f'notion_watermark:{database_id}', watermark)
+
+        now = datetime.now().isoformat()
+        self.db.set_setting(f'notion_synced_at:{database_id}', now)
+        if full:
+            self.db.set_setting(f'notion_full_sync_at:{database_id}', now)
+
+        result = {
+            "kind": kind,
+            "full": full,
+            "fetched": fetched,
+            "changed": changed,
+            "removed": len(removed),
+            "watermark": watermark
+        }
+        logger.info(f"Sync {kind}: {result}")
+        return result
+
+    def _full_sync_due(self, database_id: str) -> bool:
+        """آیا وقت Sync کامل رسیده؟"""
+        last_full = self.db.get_setting(f'notion_full_sync_at:{database_id}')
+        if not last_full:
+            return True
+
+        try:
+            age = (datetime.now() - datetime.fromisoformat(last_full)).total_seconds()
+        except ValueError:
+            return True
+
+        return age > self.full_sync_interval
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    """تقسیم یک Iterator به لیست‌های حداکثر size تایی"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ============================================
+# Factory
+# ============================================
+
+def create_notion_sync_engine(notion_api, db_service,
+                              full_sync_interval: int = 3600) -> NotionSyncEngine:
+    """Factory function"""
+    return NotionSyncEngine(notion_api, db_service, full_sync_interval)
@@ -0,0 +1,622 @@
+"""
+📤 Outbox (Write-behind)
+تغییرات Task ها، Habit ها و Daily Log ها اول در SQLite اعمال میشن و Request
+بلافاصله جواب میگیره؛ یک Thread پس‌زمینه صف رو به Notion / Sheets می‌فرسته
+
+- Idempotency: هر درخواست یک کلید داره (هدر Idempotency-Key)؛ تکرار همون
+  درخواست نه دوباره اعمال میشه نه دوباره در صف قرار میگیره
+- Coalescing: تغییرات پشت سر هم یک Task (یا افزایش‌های یک Habit) تا وقتی
+  فرستاده نشدن در یک ردیف صف ادغام میشن
+- Batching: Daily Log های صف‌شده هر Sheet با یک append_rows نوشته میشن
+- Retry: خطاهای موقت با backoff نمایی تکرار میشن؛ ترتیب عملیات هر Entity حفظ میشه
+
+ارسال حداقل یک‌بار (at-least-once) است: اگه Process درست بعد از پاسخ
+Notion و قبل از ثبت نتیجه از کار بیفته، عملیات دوباره فرستاده میشه
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .db_service import LOCAL_ID_PREFIX
+from utils.rate_limit import is_retryable
+
+logger = logging.getLogger(__name__)
+
+# فیلدهای Task که update_task قبول میکنه (فرمت NotionAPI)
+TASK_FIELDS = (
+    'title', 'status', 'context', 'energy', 'importance', 'urgency',
+    'time', 'due_date', 'quick_win', 'notes'
+)
+
+# حداکثر فاصله بین تلاش‌ها (ثانیه)
+MAX_BACKOFF = 600
+
+# ردیف‌های فرستاده‌شده بعد از این مدت پاک میشن (ثانیه)
+DONE_RETENTION = 86400
+
+
+class Outbox:
+    """صف تغییرات در انتظار ارسال به Notion و Google Sheets"""
+
+    def __init__(self, db_service, notion_api=None, sheets_api=None,
+                 batch_size: int = 50, max_attempts: int = 8,
+                 backoff: float = 2.0, lease: float = 300):
+        """
+        Args:
+            db_service: نمونه DatabaseService (صف در جدول outbox)
+            notion_api: نمونه NotionAPI
+            sheets_api: نمونه SheetsAPI
+            batch_size: حداکثر ردیف در هر flush
+            max_attempts: بعد از این تعداد خطا ردیف failed میشه
+            backoff: فاصله اولین تکرار به ثانیه
+            lease: ردیف processing بعد از این مدت (مثلاً بعد از crash) دوباره برداشته میشه
+        """
+        self.db = db_service
+        self.notion_api = notion_api
+        self.sheets_api = sheets_api
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ============================================
+    # Enqueue (اعمال محلی + صف)
+    # ============================================
+
+    def create_task(self, database_id: str, task_data: Dict, key: str = None) -> Optional[Dict]:
+        """ایجاد Task با شناسه موقت local:... تا وقتی به Notion برسه"""
+        local_id = LOCAL_ID_PREFIX + uuid.uuid4().hex
+        data = {field: task_data[field] for field in TASK_FIELDS if field in task_data}
+
+        entry_id, new = self._enqueue(
+            key, 'notion', 'create_task', local_id,
+            {"database_id": database_id, "data": data}
+        )
+        if not new:
+            return self.db.get_notion_task(self._entry_entity_id(entry_id))
+
+        task = self._apply_task(local_id, data, base={
+            "id": local_id,
+            "status": "",
+            "context": [],
+            "energy": "",
+            "importance": "",
+            "urgency": "",
+            "time": "",
+            "due_date": None,
+            "quick_win": False,
+            "notes": "",
+            "url": "",
+            "created_time": datetime.now().isoformat(timespec='seconds'),
+            "last_edited_time": None
+        })
+        self.wake()
+        return task
+
+    def update_task(self, task_id: str, task_data: Dict, key: str = None) -> Dict:
+        """بروزرسانی Task (ادغام با تغییرات فرستاده‌نشده همین Task)"""
+        data = {field: task_data[field] for field in TASK_FIELDS if field in task_data}
+
+        entry_id, new = self._enqueue(key, 'notion', 'update_task', task_id, {"data": data})
+        # شناسه local:... که create_task اش فرستاده شده با شناسه Notion جایگزین شده
+        task_id = self._entry_entity_id(entry_id) or task_id
+        task = self.db.get_notion_task(task_id)
+        if new:
+            task = self._apply_task(task_id, data, base=task)
+            self.wake()
+        return task or {"id": task_id, **data}
+
+    def mark_done(self, task_id: str, key: str = None) -> Dict:
+        """تغییر وضعیت به Done"""
+        return self.update_task(task_id, {"status": "✅ Done"}, key)
+
+    def delete_task(self, task_id: str, key: str = None) -> bool:
+        """
+        حذف (آرشیو) Task
+
+        Task موقتی که create_task اش هنوز فرستاده نشده فقط از صف و کش محلی
+        پاک میشه؛ بقیه بعد از عملیات در انتظار همون Task در Notion آرشیو میشن
+
+        Returns:
+            آیا آرشیو در صف ارسال به Notion قرار گرفت
+        """
+        if task_id.startswith(LOCAL_ID_PREFIX) and self._cancel_local_task(task_id):
+            self.db.delete_notion_tasks([task_id])
+            return False
+
+        entry_id, new = self._enqueue(key, 'notion', 'archive_task', task_id, {})
+        resolved_id = self._entry_entity_id(entry_id) or task_id
+        self.db.delete_notion_tasks(list({task_id, resolved_id}))
+        if new:
+            self.wake()
+        return True
+
+    def increment_habit(self, habit_id: str, key: str = None) -> Optional[Dict]:
+        """افزایش Counter عادت (None اگه Habit در کش محلی نباشه)"""
+        _, new = self._enqueue(key, 'notion', 'increment_habit', habit_id, {"count": 1})
+        habit = self.db.get_notion_habit(habit_id)
+        if not new or habit is None:
+            return habit
+
+        counter, streak, best = self.notion_api.next_habit_counts(habit)
+        habit = dict(habit)
+        habit.update({
+            "counter": counter,
+            "streak": streak,
+            "best_streak": best,
+            "last_mentioned": datetime.now().strftime("%Y-%m-%d")
+        })
+        self.db.upsert_notion_habits([habit])
+        self.wake()
+        return habit
+
+    def append_daily_log(self, sheet_id: str, sheet_name: str, data: Dict,
+                         key: str = None) -> bool:
+        """ثبت لاگ روزانه (محلی در daily_logs، بعد در Sheet)"""
+        _, new = self._enqueue(
+            key, 'sheets', 'append_daily_log', None,
+            {"sheet_id": sheet_id, "sheet_name": sheet_name, "data": data}
+        )
+        if new:
+            log = dict(data)
+            log['log_date'] = data.get('date') or datetime.now().strftime("%Y-%m-%d")
+            self.db.create_daily_log(log)
+            self.wake()
+        return True
+
+    def _apply_task(self, task_id: str, data: Dict, base: Optional[Dict]) -> Optional[Dict]:
+        """اعمال تغییرات روی کپی محلی Task (اگه وجود داشته باشه)"""
+        if base is None:
+            return None
+
+        task = dict(base)
+        task.update(data)
+        if 'context' in data and not isinstance(data['context'], list):
+            task['context'] = [data['context']] if data['context'] else []
+        task['quadrant'] = self.notion_api._calculate_quadrant(
+            task.get('importance', ''), task.get('urgency', '')
+        )
+        self.db.upsert_notion_tasks([task])
+        return task
+
+    def _cancel_local_task(self, local_id: str) -> bool:
+        """
+        پاک کردن create_task فرستاده‌نشده یک Task موقت و عملیات بعدیش از صف
+
+        Returns:
+            False اگه create_task در حال ارسال یا فرستاده شده باشه (Page باید آرشیو بشه)
+        """
+        with self.db.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                status, notion_id = self._lookup_create(conn, local_id)
+                if status == 'processing' or notion_id:
+                    conn.rollback()
+                    return False
+
+                conn.execute(
+                    "DELETE FROM outbox WHERE entity_id = ? AND status != 'done'",
+                    (local_id,)
+                )
+                conn.commit()
+                return True
+            except Exception:
+                conn.rollback()
+                raise
+
+    def _entry_entity_id(self, entry_id: int) -> Optional[str]:
+        """شناسه Entity یک ردیف صف (بعد از جایگزینی شناسه موقت)"""
+        with self.db.get_connection() as conn:
+            row = conn.execute("SELECT entity_id FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+        return row['entity_id'] if row else None
+
+    def _lookup_create(self, conn, local_id: str):
+        """
+        ردیف create_task یک شناسه موقت
+
+        Returns:
+            (status، شناسه Notion اگه فرستاده شده) - (None, None) اگه ردیفی نباشه
+        """
+        row = conn.execute(
+            """SELECT status, json_extract(payload, '$.notion_id') AS notion_id
+               FROM outbox WHERE operation = 'create_task' AND entity_id = ?
+               ORDER BY id DESC LIMIT 1""",
+            (local_id,)
+        ).fetchone()
+        return (row['status'], row['notion_id']) if row else (None, None)
+
+    def _enqueue(self, key: Optional[str], target: str, operation: str,
+                 entity_id: Optional[str], payload: Dict):
+        """
+        ثبت یک عملیات در صف
+
+        Returns:
+            (شناسه ردیف صف، آیا درخواست جدید بود) - برای کلید تکراری (id, False)
+        """
+        key = key or uuid.uuid4().hex
+
+        with self.db.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT outbox_id FROM outbox_keys WHERE idempotency_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    conn.rollback()
+                    return row['outbox_id'], False
+
+                if operation != 'create_task' and entity_id and entity_id.startswith(LOCAL_ID_PREFIX):
+                    # صفحه‌ای که قبل از ارسال create_task باز شده هنوز شناسه موقت رو داره
+                    _, notion_id = self._lookup_create(conn, entity_id)
+                    entity_id = notion_id or entity_id
+
+                entry_id = self._coalesce(conn, operation, entity_id, payload)
+                if entry_id is None:
+                    entry_id = conn.execute(
+                        """INSERT INTO outbox (target, operation, entity_id, payload)
+                           VALUES (?, ?, ?, ?)""",
+                        (target, operation, entity_id, json.dumps(payload, ensure_ascii=False))
+                    ).lastrowid
+
+                conn.execute(
+                    "INSERT INTO outbox_keys (idempotency_key, outbox_id) VALUES (?, ?)",
+                    (key, entry_id)
+                )
+                conn.commit()
+                return entry_id, True
+            except Exception:
+                conn.rollback()
+                raise
+
+    def _coalesce(self, conn, operation: str, entity_id: Optional[str],
+                  payload: Dict) -> Optional[int]:
+        """ادغام با آخرین ردیف pending همین Entity (اگه سازگار باشه)"""
+        if entity_id is None:
+            return None
+
+        row = conn.execute(
+            """SELECT id, operation, payload, status FROM outbox
+               WHERE entity_id = ? AND status IN ('pending', 'processing')
+               ORDER BY id DESC LIMIT 1""",
+            (entity_id,)
+        ).fetchone()
+        # ردیف در حال ارسال قابل تغییر نیست
+        if row is None or row['status'] != 'pending':
+            return None
+
+        current = json.loads(row['payload'])
+        if operation == 'update_task' and row['operation'] in ('create_task', 'update_task'):
+            current['data'].update(payload['data'])
+        elif operation == 'increment_habit' and row['operation'] == 'increment_habit':
+            current['count'] += payload['count']
+        else:
+            return None
+
+        conn.execute(
+            "UPDATE outbox SET payload = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (json.dumps(current, ensure_ascii=False), row['id'])
+        )
+        return row['id']
+
+    # ============================================
+    # Flush
+    # ============================================
+
+    def flush(self) -> Dict:
+        """
+        ارسال ردیف‌هایی که وقتشون رسیده
+
+        Returns:
+            {"sent": n, "retried": n, "failed": n}
+        """
+        result = {"sent": 0, "retried": 0, "failed": 0}
+        if not self._flush_lock.acquire(blocking=False):
+            return result  # flush دیگه‌ای در جریانه
+
+        try:
+            entries = self._claim()
+            failed_entities = set()
+
+            # Daily Log های هر Sheet با یک درخواست
+            appends = {}
+            for entry in entries:
+                if entry['operation'] == 'append_daily_log':
+                    payload = entry['payload']
+                    appends.setdefault((payload['sheet_id'], payload['sheet_name']), []).append(entry)
+
+            for (sheet_id, sheet_name), batch in appends.items():
+                try:
+                    self.sheets_api.append_daily_logs(
+                        sheet_id, sheet_name, [e['payload']['data'] for e in batch]
+                    )
+                    for entry in batch:
+                        self._mark_done(entry)
+                    result["sent"] += len(batch)
+                except Exception as e:
+                    for entry in batch:
+                        result[self._mark_error(entry, e)] += 1
+
+            for entry in entries:
+                if entry['operation'] == 'append_daily_log':
+                    continue
+                # عملیات بعدی یک Entity بعد از خطای عملیات قبلیش اجرا نمیشه
+                if entry['entity_id'] in failed_entities:
+                    self._release(entry)
+                    continue
+                try:
+                    self._send(entry, entries)
+                    self._mark_done(entry)
+                    result["sent"] += 1
+                except Exception as e:
+                    failed_entities.add(entry['entity_id'])
+                    result[self._mark_error(entry, e)] += 1
+
+            self._prune()
+        finally:
+            self._flush_lock.release()
+
+        if entries:
+            logger.info(f"Outbox flush: {result}")
+        return result
+
+    def _claim(self) -> List[Dict]:
+        """برداشتن ردیف‌های آماده (با حفظ ترتیب عملیات هر Entity)"""
+        now = time.time()
+
+        with self.db.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    """SELECT * FROM outbox
+                       WHERE status IN ('pending', 'processing')
+                       ORDER BY id"""
+                ).fetchall()
+
+                claimed, blocked = [], set()
+                creates, orphaned = set(), []
+                for row in rows:
+                    entity_id = row['entity_id']
+                    if entity_id and entity_id.startswith(LOCAL_ID_PREFIX):
+                        if row['operation'] == 'create_task':
+                            creates.add(entity_id)
+                        elif entity_id not in creates:
+                            status, notion_id = self._lookup_create(conn, entity_id)
+                            if notion_id:
+                                # همزمان با ارسال create_task در صف اومده
+                                conn.execute(
+                                    "UPDATE outbox SET entity_id = ? WHERE id = ?",
+                                    (notion_id, row['id'])
+                                )
+                                row = dict(row, entity_id=notion_id)
+                                entity_id = notion_id
+                            elif status in ('failed', None):
+                                # create_task این Task شکست خورده: شناسه local هیچ‌وقت به Notion نمیرسه
+                                orphaned.append(row['id'])
+                                continue
+                    ready = (
+                        (row['status'] == 'pending' and row['next_attempt_at'] <= now)
+                        or (row['status'] == 'processing' and (row['claimed_at'] or 0) < now - self.lease)
+                    )
+                    if ready and entity_id not in blocked and len(claimed) < self.batch_size:
+                        claimed.append(row)
+                    elif entity_id is not None:
+                        # عملیات بعدی این Entity باید منتظر این یکی بمونن
+                        blocked.add(entity_id)
+
+                conn.executemany(
+                    "UPDATE outbox SET status = 'processing', claimed_at = ? WHERE id = ?",
+                    [(now, row['id']) for row in claimed]
+                )
+                conn.executemany(
+                    """UPDATE outbox SET status = 'failed', last_error = ?,
+                       updated_at = CURRENT_TIMESTAMP WHERE id = ?""",
+                    [("create_task failed for this task", entry_id) for entry_id in orphaned]
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        entries = []
+        for row in claimed:
+            entry = dict(row)
+            entry['payload'] = json.loads(row['payload'] or '{}')
+            entries.append(entry)
+        return entries
+
+    def _send(self, entry: Dict, entries: List[Dict]):
+        """ارسال یک عملیات Notion (خطا بالا فرستاده میشه)"""
+        operation, entity_id, payload = entry['operation'], entry['entity_id'], entry['payload']
+
+        if operation == 'create_task':
+            task = self.notion_api._create_task_page(payload['database_id'], payload['data'])
+            self._resolve_local_id(entity_id, task['id'], entries)
+        elif operation == 'update_task':
+            self.notion_api._update_task_page(entity_id, payload['data'])
+        elif operation == 'archive_task':
+            self.notion_api._archive_task_page(entity_id)
+        elif operation == 'increment_habit':
+            self.notion_api._increment_habit_page(entity_id, payload.get('count', 1))
+        else:
+            raise ValueError(f"Unknown outbox operation: {operation}")
+
+    def _resolve_local_id(self, local_id: str, notion_id: str, entries: List[Dict]):
+        """
+        جایگزینی شناسه موقت با شناسه Notion در صف و کش محلی
+
+        نگاشت local → Notion روی خود ردیف create_task می‌مونه تا عملیاتی که
+        بعداً با شناسه موقت برسن (_enqueue) هم به همون Page فرستاده بشن
+        """
+        with self.db.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    """UPDATE outbox SET payload = json_set(payload, '$.notion_id', ?)
+                       WHERE entity_id = ? AND operation = 'create_task'""",
+                    (notion_id, local_id)
+                )
+                conn.execute(
+                    """UPDATE outbox SET entity_id = ?
+                       WHERE entity_id = ? AND operation != 'create_task' AND status != 'done'""",
+                    (notion_id, local_id)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        for entry in entries:
+            if entry['entity_id'] == local_id and entry['operation'] != 'create_task':
+                entry['entity_id'] = notion_id
+        self.db.delete_notion_tasks([local_id])
+
+    def _mark_done(self, entry: Dict):
+        """ثبت ارسال موفق"""
+        with self.db.get_connection() as conn:
+            conn.execute(
+                """UPDATE outbox SET status = 'done', last_error = NULL,
+                   attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ?""",
+                (entry['id'],)
+            )
+            conn.commit()
+
+    def _mark_error(self, entry: Dict, error: Exception) -> str:
+        """ثبت خطا: تکرار با backoff، یا failed برای خطای دائمی / آخرین تلاش"""
+        attempts = entry['attempts'] + 1
+        # خطاهای HTTP غیرموقت (مثلاً 400 اعتبارسنجی) تکرار نمیشن
+        permanent = getattr(error, 'status', None) is not None and not is_retryable(error)
+
+        if permanent or attempts >= self.max_attempts:
+            status, outcome = 'failed', 'failed'
+            logger.error(f"Outbox {entry['operation']} #{entry['id']} failed: {error}")
+        else:
+            status, outcome = 'pending', 'retried'
+            logger.warning(f"Outbox {entry['operation']} #{entry['id']} will retry: {error}")
+
+        delay = min(self.backoff * (2 ** (attempts - 1)), MAX_BACKOFF)
+        with self.db.get_connection() as conn:
+            conn.execute(
+                """UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?,
+                   last_error = ?, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ?""",
+                (status, attempts, time.time() + delay, str(error), entry['id'])
+            )
+            conn.commit()
+
+        if status == 'failed' and entry['operation'] == 'create_task':
+            # Task موقت دیگه به Notion نمیرسه (عملیات بعدیش در _claim شکست میخورن)
+            self.db.delete_notion_tasks([entry['entity_id']])
+        return outcome
+
+    def _release(self, entry: Dict):
+        """برگرداندن ردیف برداشته‌شده به صف بدون تلاش"""
+        with self.db.get_connection() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'pending', claimed_at = NULL WHERE id = ?",
+                (entry['id'],)
+            )
+            conn.commit()
+
+    def _prune(self):
+        """
+        پاک کردن ردیف‌های فرستاده‌شده قدیمی و کلیدهاشون
+
+        ردیف‌های create_task نگه داشته میشن (نگاشت local → Notion برای صفحات باز)
+        """
+        with self.db.get_connection() as conn:
+            conn.execute(
+                """DELETE FROM outbox WHERE status = 'done' AND operation != 'create_task'
+                   AND updated_at < datetime('now', ?)""",
+                (f'-{DONE_RETENTION} seconds',)
+            )
+            conn.execute(
+                "DELETE FROM outbox_keys WHERE outbox_id NOT IN (SELECT id FROM outbox)"
+            )
+            conn.commit()
+
+    # ============================================
+    # Background Thread
+    # ============================================
+
+    def start(self, interval: float = 5) -> bool:
+        """ارسال پس‌زمینه: بلافاصله بعد از هر Enqueue، وگرنه هر interval ثانیه"""
+        if self._thread is not None and self._thread.is_alive():
+            return False
+
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"خطا در ارسال Outbox: {e}")
+                self._wake.wait(interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name='outbox-flush', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = None):
+        """توقف Thread پس‌زمینه"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self):
+        """بیدار کردن Thread ارسال"""
+        self._wake.set()
+
+    # ============================================
+    # Status
+    # ============================================
+
+    def get_status(self) -> Dict:
+        """تعداد ردیف‌ها در هر وضعیت و آخرین خطاها"""
+        with self.db.get_connection() as conn:
+            counts = {
+                row['status']: row['cnt'] for row in conn.execute(
+                    "SELECT status, COUNT(*) AS cnt FROM outbox GROUP BY status"
+                )
+            }
+            oldest = conn.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status IN ('pending', 'processing')"
+            ).fetchone()[0]
+            errors = [
+                dict(row) for row in conn.execute(
+                    """SELECT id, operation, entity_id, attempts, last_error, updated_at
+                       FROM outbox WHERE status = 'failed'
+                       ORDER BY id DESC LIMIT 5"""
+                )
+            ]
+
+        return {
+            "pending": counts.get('pending', 0) + counts.get('processing', 0),
+            "done": counts.get('done', 0),
+            "failed": counts.get('failed', 0),
+            "oldest_pending": oldest,
+            "recent_failures": errors
+        }
+
+
+# ============================================
+# Factory
+# ============================================
+
+def create_outbox(db_service, notion_api=None, sheets_api=None,
+                  max_attempts: int = 8) -> Outbox:
+    """Factory function"""
+    return Outbox(db_service, notion_api, sheets_api, max_attempts=max_attempts)
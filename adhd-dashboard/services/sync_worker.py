@@ -0,0 +1,197 @@
+"""
+🔁 Sync Worker
+Sync دوره‌ای Notion و Google Sheets در پس‌زمینه، تا Request Handler ها
+فقط از وضعیت محلی (SQLite و کش حافظه) بخونن
+
+- هر منبع (Task ها، Habit ها، Daily Log ها) فاصله اجرای خودش رو داره
+- وضعیت آخرین اجرا در جدول settings ذخیره میشه، پس /api/sync/status
+  حتی وقتی Worker در یک Process جدا اجرا میشه (sync_worker.py) در دسترسه
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .notion_sync import NotionSyncEngine
+
+logger = logging.getLogger(__name__)
+
+# پیشوند کلیدهای وضعیت در جدول settings
+STATUS_PREFIX = 'sync_status:'
+
+
+class SyncSource:
+    """یک منبع Sync با فاصله اجرای مستقل"""
+
+    def __init__(self, name: str, interval: float, run: Callable[[], Dict]):
+        """
+        Args:
+            name: نام منبع (notion_tasks، notion_habits، daily_logs)
+            interval: فاصله اجرا به ثانیه
+            run: تابع Sync؛ خروجیش در وضعیت ذخیره میشه
+        """
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.next_run = 0.0  # اولین اجرا بلافاصله
+
+
+class SyncWorker:
+    """زمان‌بند Sync پس‌زمینه"""
+
+    def __init__(self, db_service):
+        """
+        Args:
+            db_service: نمونه DatabaseService (برای ذخیره وضعیت)
+        """
+        self.db = db_service
+        self.sources: List[SyncSource] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_source(self, name: str, interval: float, run: Callable[[], Dict]):
+        """اضافه کردن یک منبع"""
+        self.sources.append(SyncSource(name, interval, run))
+
+    # ============================================
+    # Lifecycle
+    # ============================================
+
+    def start(self) -> bool:
+        """اجرا در یک Thread پس‌زمینه (daemon)"""
+        if self.is_running() or not self.sources:
+            return False
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name='sync-worker', daemon=True)
+        self._thread.start()
+        logger.info(f"Sync Worker شروع شد: {', '.join(s.name for s in self.sources)}")
+        return True
+
+    def stop(self, timeout: float = None):
+        """توقف حلقه (Sync در حال اجرا تموم میشه)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        """آیا Thread پس‌زمینه فعاله؟"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_forever(self):
+        """حلقه اصلی: اجرای منابعی که وقتشون رسیده و انتظار تا نوبت بعدی"""
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for source in self.sources:
+                if source.next_run <= now and not self._stop.is_set():
+                    self._run_source(source)
+                    source.next_run = time.monotonic() + source.interval
+
+            if self.sources:
+                wait = min(s.next_run for s in self.sources) - time.monotonic()
+                self._stop.wait(max(wait, 0.0))
+
+    def run_once(self, name: str = None) -> Dict[str, Dict]:
+        """اجرای فوری همه منابع (یا فقط name) و برگرداندن وضعیت‌ها"""
+        results = {}
+        for source in self.sources:
+            if name is None or source.name == name:
+                results[source.name] = self._run_source(source)
+        return results
+
+    # ============================================
+    # Status
+    # ============================================
+
+    def _run_source(self, source: SyncSource) -> Dict:
+        """اجرای یک منبع و ذخیره وضعیت (خطاها حلقه رو متوقف نمیکنن)"""
+        previous = self.get_source_status(source.name) or {}
+        started = time.monotonic()
+        status = {
+            "last_run": datetime.now().isoformat(),
+            "interval": source.interval,
+            "last_success": previous.get("last_success"),
+            "runs": previous.get("runs", 0) + 1,
+            "failures": previous.get("failures", 0)
+        }
+
+        try:
+            status["result"] = source.run()
+            status["ok"] = True
+            status["error"] = None
+            status["last_success"] = status["last_run"]
+        except Exception as e:
+            logger.error(f"خطا در Sync {source.name}: {e}")
+            status["ok"] = False
+            status["error"] = str(e)
+            status["failures"] += 1
+
+        status["duration"] = round(time.monotonic() - started, 3)
+        self.db.set_setting(STATUS_PREFIX + source.name, json.dumps(status, ensure_ascii=False))
+        return status
+
+    def get_source_status(self, name: str) -> Optional[Dict]:
+        """وضعیت آخرین اجرای یک منبع"""
+        value = self.db.get_setting(STATUS_PREFIX + name)
+        try:
+            return json.loads(value) if value else None
+        except ValueError:
+            return None
+
+    def get_status(self) -> Dict:
+        """وضعیت Worker و همه منابع"""
+        status = load_sync_status(self.db)
+        status["running"] = self.is_running()
+        return status
+
+
+def load_sync_status(db_service) -> Dict:
+    """وضعیت ذخیره‌شده همه منابع (بدون نیاز به نمونه Worker)"""
+    sources = {}
+    for key, value in db_service.get_all_settings().items():
+        if key.startswith(STATUS_PREFIX):
+            try:
+                sources[key[len(STATUS_PREFIX):]] = json.loads(value)
+            except (TypeError, ValueError):
+                continue
+    return {"running": False, "sources": sources}
+
+
+# ============================================
+# Factory
+# ============================================
+
+def create_sync_worker(db_service, notion_api=None, sheets_api=None,
+                       tasks_db_id: str = '', habits_db_id: str = '',
+                       sheet_id: str = '', sheet_name: str = 'Sheet1',
+                       notion_interval: float = 60, sheets_interval: float = 300,
+                       full_sync_interval: int = 3600) -> SyncWorker:
+    """
+    Factory function
+
+    منابعی که تنظیم نشدن (API یا شناسه خالی) اضافه نمیشن
+    """
+    worker = SyncWorker(db_service)
+
+    if notion_api is not None:
+        engine = NotionSyncEngine(notion_api, db_service, full_sync_interval)
+        if tasks_db_id:
+            worker.add_source('notion_tasks', notion_interval,
+                              lambda: engine.sync_tasks(tasks_db_id))
+        if habits_db_id:
+            worker.add_source('notion_habits', notion_interval,
+                              lambda: engine.sync_habits(habits_db_id))
+
+    if sheets_api is not None and sheet_id:
+        def sync_daily_logs() -> Dict:
+            columns = sheets_api.refresh_daily_logs(sheet_id, sheet_name)
+            logs = columns.to_logs()
+            return {"fetched": len(logs), "stored": db_service.upsert_sheet_logs(logs)}
+
+        worker.add_source('daily_logs', sheets_interval, sync_daily_logs)
+
+    return worker
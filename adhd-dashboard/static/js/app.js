@@ -165,9 +165,7 @@ async function completeFocusTask() {
     }
     
     try {
-        const response = await fetch(`/api/tasks/${currentFocusTaskId}/done`, {
-            method: 'POST'
-        });
+        const response = await postIdempotent(`/api/tasks/${currentFocusTaskId}/done`);
         
         if (response.ok) {
             celebrate();
@@ -259,28 +257,68 @@ function timerComplete() {
     }
 }
 
+// ============================================
+// Idempotent Requests
+// ============================================
+
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+}
+
+// POST با کلید Idempotency-Key ثابت؛ تکرار بعد از خطای شبکه دوباره اعمال نمیشه
+async function postIdempotent(url, retries = 2) {
+    const key = newIdempotencyKey();
+    
+    for (let attempt = 0; ; attempt++) {
+        try {
+            return await fetch(url, {
+                method: 'POST',
+                headers: { 'Idempotency-Key': key }
+            });
+        } catch (error) {
+            if (attempt >= retries) throw error;
+            await new Promise(resolve => setTimeout(resolve, 500 * (attempt + 1)));
+        }
+    }
+}
+
 // ============================================
 // Task Actions
 // ============================================
 
 async function markDone(taskId) {
+    // بازخورد فوری؛ اگه سرور خطا بده Task برمیگرده
+    const taskEl = document.querySelector(`[data-id="${taskId}"]`);
+    smallCelebrate();
+    showToast('✅ آفرین!', 'success');
+    
+    if (taskEl) {
+        taskEl.style.opacity = '0.5';
+        taskEl.style.transform = 'translateX(-20px)';
+        setTimeout(() => { taskEl.style.display = 'none'; }, 300);
+    }
+    
+    const restore = () => {
+        if (taskEl) {
+            taskEl.style.display = '';
+            taskEl.style.opacity = '';
+            taskEl.style.transform = '';
+        }
+        showToast('خطا در ثبت', 'error');
+    };
+    
     try {
-        const response = await fetch(`/api/tasks/${taskId}/done`, { method: 'POST' });
+        const response = await postIdempotent(`/api/tasks/${taskId}/done`);
         const result = await response.json();
         
         if (result.success) {
-            smallCelebrate();
-            showToast('✅ آفرین!', 'success');
-            
-            const taskEl = document.querySelector(`[data-id="${taskId}"]`);
-            if (taskEl) {
-                taskEl.style.opacity = '0.5';
-                taskEl.style.transform = 'translateX(-20px)';
-                setTimeout(() => taskEl.remove(), 300);
-            }
+            taskEl?.remove();
+        } else {
+            restore();
         }
     } catch (error) {
-        showToast('خطا', 'error');
+        restore();
     }
 }
 
@@ -305,27 +343,33 @@ async function deleteTask(taskId) {
 // ============================================
 
 async function incrementHabit(habitId) {
+    const card = document.querySelector(`[data-habit-id="${habitId}"]`);
+    const counterEl = card?.querySelector('.habit-counter');
+    const streakEl = card?.querySelector('.habit-streak');
+    const previous = counterEl?.textContent;
+    
+    // بازخورد فوری؛ مقدار نهایی از پاسخ سرور میاد
+    smallCelebrate();
+    if (counterEl) counterEl.textContent = (parseInt(previous, 10) || 0) + 1;
+    
     try {
-        const response = await fetch(`/api/habits/${habitId}/increment`, {
-            method: 'POST'
-        });
+        const response = await postIdempotent(`/api/habits/${habitId}/increment`);
         const result = await response.json();
         
         if (result.success) {
-            smallCelebrate();
-            showToast(`🔥 Streak: ${result.habit.streak}`, 'success');
-            
-            // Update UI
-            const card = document.querySelector(`[data-habit-id="${habitId}"]`);
-            if (card) {
-                const counterEl = card.querySelector('.habit-counter');
-                const streakEl = card.querySelector('.habit-streak');
-                
+            if (result.habit) {
+                showToast(`🔥 Streak: ${result.habit.streak}`, 'success');
                 if (counterEl) counterEl.textContent = result.habit.counter;
                 if (streakEl) streakEl.textContent = result.habit.streak;
+            } else {
+                showToast('🔥 ثبت شد', 'success');
             }
+        } else {
+            if (counterEl) counterEl.textContent = previous;
+            showToast('خطا', 'error');
         }
     } catch (error) {
+        if (counterEl) counterEl.textContent = previous;
         showToast('خطا', 'error');
     }
 }
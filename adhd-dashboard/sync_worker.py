@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+🔁 ADHD Dashboard - Sync Worker
+اجرای Sync پس‌زمینه Notion و Google Sheets در یک Process جدا
+
+وقتی داشبورد با چند Worker (مثلاً gunicorn) اجرا میشه، به جای
+SYNC_WORKER_ENABLED فقط همین یک Process با SQLite مشترک Sync میکنه؛
+Process های داشبورد با SYNC_WORKER_EXTERNAL=True از همون SQLite میخونن
+
+استفاده:
+    python sync_worker.py           # اجرای دائمی
+    python sync_worker.py --once    # یک‌بار Sync همه منابع و خروج
+"""
+
+import sys
+import json
+import logging
+from pathlib import Path
+
+# اضافه کردن مسیر پروژه
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from config import Config
+from utils.notion_api import NotionAPI
+from utils.sheets_api import create_sheets_api
+from services.db_service import create_database_service
+from services.sync_worker import create_sync_worker
+from services.outbox import create_outbox
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('sync_worker')
+
+
+def build_worker():
+    """ساخت سرویس‌ها و Worker با تنظیمات .env"""
+    db_service = create_database_service(Config.DATABASE_PATH, pool_size=Config.DATABASE_POOL_SIZE)
+
+    notion_api = None
+    if Config.is_notion_configured():
+        notion_api = NotionAPI(
+            Config.NOTION_API_KEY,
+            rate_limit=Config.NOTION_RATE_LIMIT,
+            import_concurrency=Config.NOTION_IMPORT_CONCURRENCY,
+            rate_limit_db=Config.NOTION_RATE_LIMIT_DB
+        )
+
+    sheets_api = None
+    if Config.is_sheets_configured():
+        sheets_api = create_sheets_api(Config.GOOGLE_SHEETS_CREDENTIALS)
+
+    worker = create_sync_worker(
+        db_service, notion_api, sheets_api,
+        tasks_db_id=Config.NOTION_TASKS_DB_ID,
+        habits_db_id=Config.NOTION_HABITS_DB_ID,
+        sheet_id=Config.DAILY_LOG_SHEET_ID,
+        sheet_name=Config.DAILY_LOG_SHEET_NAME,
+        notion_interval=Config.SYNC_NOTION_INTERVAL,
+        sheets_interval=Config.SYNC_SHEETS_INTERVAL,
+        full_sync_interval=Config.NOTION_FULL_SYNC_INTERVAL
+    )
+
+    # ارسال صف Outbox (Process های داشبورد هم میفرستن؛ ردیف‌ها قفل میشن)
+    if Config.OUTBOX_ENABLED:
+        outbox = create_outbox(
+            db_service, notion_api, sheets_api,
+            max_attempts=Config.OUTBOX_MAX_ATTEMPTS
+        )
+        worker.add_source('outbox', Config.OUTBOX_FLUSH_INTERVAL, outbox.flush)
+
+    return worker
+
+
+def main():
+    worker = build_worker()
+    if not worker.sources:
+        logger.error("هیچ منبعی برای Sync تنظیم نشده (Notion / Google Sheets)")
+        return 1
+
+    if '--once' in sys.argv:
+        results = worker.run_once()
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0 if all(r["ok"] for r in results.values()) else 1
+
+    logger.info(f"Sync Worker: {', '.join(s.name for s in worker.sources)}")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Sync Worker متوقف شد")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# ماژول‌های برنامه (services، utils) از ریشه adhd-dashboard import میشن
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,37 @@
+"""تست هم‌خوانی شمارنده‌های dashboard_summary با TaskSnapshot.stats"""
+
+import pytest
+
+from services.db_service import DatabaseService
+from utils.task_snapshot import TaskSnapshot
+
+
+TASKS = [
+    {"id": "a", "title": "A", "status": "✅", "quick_win": True},
+    {"id": "b", "title": "B", "status": "", "quick_win": True, "urgency": "🚨 Urgent"},
+    {"id": "c", "title": "C", "status": "✅ Done", "quick_win": True},
+    {"id": "d", "title": "D", "status": "▶️ Next Action", "quick_win": True, "energy": "🔥 High"},
+    {"id": "e", "title": "E", "status": "🔄 In Progress", "context": ["🏠 Home"]},
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    service = DatabaseService(str(tmp_path / 'test.db'))
+    service.upsert_notion_tasks(TASKS)
+    yield service
+    service.close()
+
+
+def test_summary_matches_snapshot(db):
+    expected = TaskSnapshot(db.get_notion_tasks(include_done=True)).stats
+    summary = db.get_dashboard_summary()
+
+    for key in ("total", "done", "pending", "urgent", "quick_wins_pending",
+                "by_quadrant", "by_energy", "by_context"):
+        assert summary[key] == expected[key], key
+
+
+def test_summary_follows_status_change(db):
+    db.upsert_notion_tasks([dict(TASKS[3], status="✅")])
+    assert db.get_dashboard_summary()["quick_wins_pending"] == 1
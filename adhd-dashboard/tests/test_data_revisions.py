@@ -0,0 +1,54 @@
+"""تست‌های شمارنده data_revisions (پایه ETag پاسخ‌های API)"""
+
+import pytest
+
+from services.db_service import DatabaseService
+
+
+TASK = {"id": "page-1", "title": "Read", "status": "📥 Inbox", "last_edited_time": "2026-10-01T10:00:00.000Z"}
+HABIT = {"id": "habit-1", "name": "Walk", "counter": 1, "last_edited_time": "2026-10-01T10:00:00.000Z"}
+
+
+@pytest.fixture
+def db(tmp_path):
+    service = DatabaseService(str(tmp_path / 'test.db'))
+    yield service
+    service.close()
+
+
+def test_unchanged_upsert_keeps_revision(db):
+    db.upsert_notion_tasks([TASK])
+    db.upsert_notion_habits([HABIT])
+    tasks, habits = db.get_data_revision('tasks'), db.get_data_revision('habits')
+
+    # Sync افزایشی همون Page ها رو دوباره میخونه
+    db.upsert_notion_tasks([TASK])
+    db.upsert_notion_habits([HABIT])
+
+    assert db.get_data_revision('tasks') == tasks
+    assert db.get_data_revision('habits') == habits
+
+
+def test_changed_row_bumps_revision(db):
+    db.upsert_notion_tasks([TASK])
+    before = db.get_data_revision('tasks', 'habits')
+
+    # همون last_edited_time (Notion به دقیقه گرد میکنه) ولی محتوای جدید
+    db.upsert_notion_tasks([dict(TASK, status="✅ Done")])
+    after = db.get_data_revision('tasks', 'habits')
+
+    assert after != before
+    assert after.split('.')[2] == before.split('.')[2]  # habits دست نخورده
+    db.delete_notion_tasks(["page-1"])
+    assert db.get_data_revision('tasks', 'habits') != after
+
+
+def test_revision_survives_reopen(tmp_path):
+    first = DatabaseService(str(tmp_path / 'test.db'))
+    first.upsert_notion_tasks([TASK])
+    version = first.get_data_revision('tasks')
+    first.close()
+
+    second = DatabaseService(str(tmp_path / 'test.db'))
+    assert second.get_data_revision('tasks') == version
+    second.close()
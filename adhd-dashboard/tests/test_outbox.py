@@ -0,0 +1,259 @@
+"""تست‌های صف Outbox (بدون Notion واقعی)"""
+
+import json
+
+import pytest
+
+from services.db_service import DatabaseService, LOCAL_ID_PREFIX
+from services.outbox import Outbox
+
+
+class APIError(Exception):
+    """خطای HTTP شبیه notion_client"""
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class FakeNotion:
+    """فقط متدهایی از NotionAPI که Outbox صدا میزنه"""
+
+    def __init__(self):
+        self.calls = []
+        self.errors = {}   # operation -> لیست خطاها (به ترتیب)
+        self._next_id = 0
+
+    def _fail(self, operation: str):
+        errors = self.errors.get(operation)
+        if errors:
+            raise errors.pop(0)
+
+    def _create_task_page(self, database_id, data):
+        self.calls.append(('create_task', None, dict(data)))
+        self._fail('create_task')
+        self._next_id += 1
+        return {"id": f"page-{self._next_id}", **data}
+
+    def _update_task_page(self, page_id, data):
+        self.calls.append(('update_task', page_id, dict(data)))
+        self._fail('update_task')
+        return {"id": page_id, **data}
+
+    def _archive_task_page(self, page_id):
+        self.calls.append(('archive_task', page_id, None))
+        self._fail('archive_task')
+
+    def _increment_habit_page(self, habit_id, count=1):
+        self.calls.append(('increment_habit', habit_id, count))
+        self._fail('increment_habit')
+        return {"id": habit_id}
+
+    @staticmethod
+    def next_habit_counts(habit, count=1):
+        return habit["counter"] + count, habit["streak"], habit["best_streak"]
+
+    def _calculate_quadrant(self, importance, urgency):
+        return 4
+
+
+@pytest.fixture
+def db(tmp_path):
+    service = DatabaseService(str(tmp_path / 'test.db'))
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def notion():
+    return FakeNotion()
+
+
+@pytest.fixture
+def outbox(db, notion):
+    return Outbox(db, notion, backoff=0)
+
+
+def outbox_rows(db):
+    with db.get_connection() as conn:
+        return [dict(row) for row in conn.execute("SELECT * FROM outbox ORDER BY id")]
+
+
+def test_duplicate_idempotency_key_is_applied_once(outbox, notion, db):
+    first = outbox.create_task('db', {"title": "Write report"}, key='k1')
+    second = outbox.create_task('db', {"title": "Write report"}, key='k1')
+
+    assert second["id"] == first["id"]
+    assert len(outbox_rows(db)) == 1
+
+    outbox.flush()
+    assert [call[0] for call in notion.calls] == ['create_task']
+
+
+def test_update_coalesces_into_pending_create(outbox, notion, db):
+    task = outbox.create_task('db', {"title": "Draft"}, key='c')
+    outbox.update_task(task["id"], {"title": "Final", "status": "Next Action"}, key='u1')
+    outbox.update_task(task["id"], {"notes": "soon"}, key='u2')
+
+    rows = outbox_rows(db)
+    assert len(rows) == 1 and rows[0]["operation"] == 'create_task'
+
+    assert outbox.flush()["sent"] == 1
+    assert notion.calls == [
+        ('create_task', None, {"title": "Final", "status": "Next Action", "notes": "soon"})
+    ]
+
+
+def test_habit_increments_coalesce(outbox, notion, db):
+    db.upsert_notion_habits([{"id": "habit-1", "name": "Walk", "counter": 3}])
+    outbox.increment_habit("habit-1", key='i1')
+    habit = outbox.increment_habit("habit-1", key='i2')
+
+    assert habit["counter"] == 5
+    outbox.flush()
+    assert notion.calls == [('increment_habit', 'habit-1', 2)]
+
+
+def test_resolve_local_id_rewrites_queue_and_cache(outbox, notion, db):
+    task = outbox.create_task('db', {"title": "Call"}, key='c')
+    local_id = task["id"]
+    assert local_id.startswith(LOCAL_ID_PREFIX)
+
+    # ردیف update جدا (ردیف create در حال ارسال ادغام نمیشه)
+    entries = outbox._claim()
+    outbox.update_task(local_id, {"status": "Done"}, key='u')
+    outbox._resolve_local_id(local_id, "page-9", entries)
+
+    rows = outbox_rows(db)
+    # ردیف create شناسه موقت و نگاشتش به Notion رو نگه میداره
+    assert [row["entity_id"] for row in rows] == [local_id, "page-9"]
+    assert json.loads(rows[0]["payload"])["notion_id"] == "page-9"
+    assert entries[0]["entity_id"] == local_id
+    assert db.get_notion_task(local_id) is None
+
+
+def test_update_with_local_id_after_create_was_sent(outbox, notion, db):
+    task = outbox.create_task('db', {"title": "Call"}, key='c')
+    outbox.flush()
+
+    # صفحه‌ای که قبل از flush باز شده هنوز شناسه local:... رو داره
+    updated = outbox.update_task(task["id"], {"status": "Done"}, key='u')
+    assert updated["id"] == "page-1"
+
+    result = outbox.flush()
+    assert result == {"sent": 1, "retried": 0, "failed": 0}
+    assert notion.calls[1] == ('update_task', 'page-1', {"status": "Done"})
+
+
+def test_local_id_row_enqueued_during_create_send_is_not_orphaned(outbox, notion, db):
+    task = outbox.create_task('db', {"title": "Call"}, key='c')
+    outbox.flush()
+
+    # ردیفی که قبل از ثبت نگاشت (مثلاً در Process دیگه) با شناسه موقت ثبت شده
+    with db.get_connection() as conn:
+        conn.execute(
+            """INSERT INTO outbox (target, operation, entity_id, payload)
+               VALUES ('notion', 'update_task', ?, '{"data": {"notes": "x"}}')""",
+            (task["id"],)
+        )
+        conn.commit()
+
+    assert outbox.flush()["sent"] == 1
+    assert notion.calls[1] == ('update_task', 'page-1', {"notes": "x"})
+
+
+def test_update_after_create_is_sent_with_notion_id(outbox, notion, db):
+    task = outbox.create_task('db', {"title": "Call"}, key='c')
+    outbox._claim()  # create در حال ارسال: update بعدی ردیف جدا میشه
+    outbox.update_task(task["id"], {"status": "Done"}, key='u')
+
+    with db.get_connection() as conn:
+        conn.execute("UPDATE outbox SET status = 'pending'")
+        conn.commit()
+
+    outbox.flush()
+    assert notion.calls[0][0] == 'create_task'
+    assert notion.calls[1] == ('update_task', 'page-1', {"status": "Done"})
+
+
+def test_later_operations_wait_for_retried_predecessor(outbox, notion, db):
+    db.upsert_notion_tasks([{"id": "page-1", "title": "A"}])
+    outbox.update_task("page-1", {"title": "B"}, key='u1')
+    entries = outbox._claim()
+    outbox.update_task("page-1", {"title": "C"}, key='u2')
+    outbox._release(entries[0])
+
+    notion.errors['update_task'] = [APIError(503)]
+    result = outbox.flush()
+
+    assert result == {"sent": 0, "retried": 1, "failed": 0}
+    assert notion.calls == [('update_task', 'page-1', {"title": "B"})]
+    assert [row["status"] for row in outbox_rows(db)] == ['pending', 'pending']
+
+    outbox.flush()
+    assert [call[2] for call in notion.calls[1:]] == [{"title": "B"}, {"title": "C"}]
+
+
+def test_failed_create_fails_dependent_operations(outbox, notion, db):
+    task = outbox.create_task('db', {"title": "Bad"}, key='c')
+    outbox._claim()
+    outbox.update_task(task["id"], {"status": "Done"}, key='u')
+    with db.get_connection() as conn:
+        conn.execute("UPDATE outbox SET status = 'pending'")
+        conn.commit()
+
+    notion.errors['create_task'] = [APIError(400)]
+    outbox.flush()
+    outbox.flush()
+
+    assert [call[0] for call in notion.calls] == ['create_task']
+    assert [row["status"] for row in outbox_rows(db)] == ['failed', 'failed']
+    assert db.get_notion_task(task["id"]) is None
+    assert task["id"] not in db.get_notion_task_versions()
+
+
+def test_transient_error_retries_then_fails_after_max_attempts(db, notion):
+    outbox = Outbox(db, notion, backoff=0, max_attempts=2)
+    db.upsert_notion_tasks([{"id": "page-1", "title": "A"}])
+    outbox.update_task("page-1", {"title": "B"}, key='u')
+
+    notion.errors['update_task'] = [APIError(502), APIError(502)]
+    assert outbox.flush()["retried"] == 1
+    assert outbox.flush()["failed"] == 1
+    assert outbox.get_status()["failed"] == 1
+
+
+def test_delete_unsent_local_task_drops_its_queue_rows(outbox, notion, db):
+    task = outbox.create_task('db', {"title": "Oops"}, key='c')
+    outbox._claim()  # update بعدی ردیف جدا میشه
+    outbox.update_task(task["id"], {"notes": "x"}, key='u')
+    with db.get_connection() as conn:
+        conn.execute("UPDATE outbox SET status = 'pending'")
+        conn.commit()
+
+    assert outbox.delete_task(task["id"], key='d') is False
+    assert outbox_rows(db) == []
+    assert db.get_notion_task(task["id"]) is None
+
+    outbox.flush()
+    assert notion.calls == []
+
+
+def test_delete_is_archived_after_pending_updates(outbox, notion, db):
+    db.upsert_notion_tasks([{"id": "page-1", "title": "A"}])
+    outbox.update_task("page-1", {"title": "B"}, key='u')
+
+    assert outbox.delete_task("page-1", key='d') is True
+    assert db.get_notion_task("page-1") is None
+
+    outbox.flush()
+    assert [call[:2] for call in notion.calls] == [('update_task', 'page-1'), ('archive_task', 'page-1')]
+
+
+def test_delete_with_local_id_after_create_was_sent(outbox, notion, db):
+    task = outbox.create_task('db', {"title": "Call"}, key='c')
+    outbox.flush()
+
+    assert outbox.delete_task(task["id"], key='d') is True
+    outbox.flush()
+    assert notion.calls[1] == ('archive_task', 'page-1', None)
@@ -0,0 +1,78 @@
+"""تست‌های retry در ThrottledClient"""
+
+import pytest
+from notion_client import Client
+from notion_client.errors import RequestTimeoutError
+
+from utils.rate_limit import ThrottledClient, TokenBucket, is_retryable
+
+
+class APIError(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.headers = {"Retry-After": "0"}
+
+
+class FakeEndpoint:
+    """جایگزین Endpoint های notion_client (create / update)"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _call(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+    create = _call
+    update = _call
+
+
+def make_client() -> ThrottledClient:
+    return ThrottledClient(Client(auth="test"), TokenBucket(1000), retries=3, backoff=0)
+
+
+@pytest.mark.parametrize("error", [RequestTimeoutError(), APIError(502)])
+def test_create_is_not_retried_after_ambiguous_error(error):
+    endpoint = FakeEndpoint([error])
+    create = make_client().wrap(endpoint.create, idempotent=False)
+
+    with pytest.raises(type(error)):
+        create(parent={})
+    assert endpoint.calls == 1
+
+
+def test_create_is_retried_after_429():
+    endpoint = FakeEndpoint([APIError(429), APIError(429)])
+    create = make_client().wrap(endpoint.create, idempotent=False)
+
+    assert create(parent={}) == {"ok": True}
+    assert endpoint.calls == 3
+
+
+def test_update_is_retried_after_timeout():
+    endpoint = FakeEndpoint([RequestTimeoutError(), APIError(503)])
+    update = make_client().wrap(endpoint.update)
+
+    assert update(page_id="p") == {"ok": True}
+    assert endpoint.calls == 3
+
+
+def test_pages_create_is_wrapped_as_non_idempotent():
+    client = make_client()
+    endpoint = FakeEndpoint([RequestTimeoutError()])
+    client._client.pages.create = endpoint.create
+
+    with pytest.raises(RequestTimeoutError):
+        client.pages.create(parent={})
+    assert endpoint.calls == 1
+
+
+def test_is_retryable():
+    assert is_retryable(APIError(500))
+    assert not is_retryable(APIError(400))
+    assert not is_retryable(APIError(500), idempotent=False)
+    assert is_retryable(APIError(429), idempotent=False)
@@ -0,0 +1,49 @@
+"""تست‌های خواندن آمار Daily Log از SQLite (وقتی Sync Worker جدول daily_logs رو پر میکنه)"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from services.db_service import DatabaseService
+from utils.sheets_api import SheetsAPI
+
+
+def make_log(days_ago, mood, bad_habits=''):
+    day = (date.today() - timedelta(days=days_ago)).isoformat()
+    return {"date": day, "mood": mood, "energy": 6, "bad_habits": bad_habits}
+
+
+@pytest.fixture
+def db(tmp_path):
+    service = DatabaseService(str(tmp_path / 'test.db'))
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def sheets(db, tmp_path):
+    # بدون credentials: هر خواندن از Google Sheets خطا میده
+    return SheetsAPI(str(tmp_path / 'missing.json'), local_store=db)
+
+
+def test_analytics_read_from_sqlite(db, sheets):
+    db.upsert_sheet_logs([make_log(1, 4, 'Scrolling'), make_log(2, 8, 'Scrolling, Snacks')])
+
+    summary = sheets.get_analytics_summary('sheet', 'Sheet1', days=30)
+    assert summary["days_tracked"] == 2
+    assert summary["avg_mood"] == 6
+
+    habits = {item["name"]: item["count"] for item in sheets.get_bad_habits_frequency('sheet', 'Sheet1')}
+    assert habits == {"Scrolling": 2, "Snacks": 1}
+
+
+def test_worker_sync_is_seen_without_waiting_for_ttl(db, sheets):
+    db.upsert_sheet_logs([make_log(1, 4)])
+    version = sheets.get_logs_version('sheet', 'Sheet1')
+    assert sheets.get_analytics_summary('sheet', 'Sheet1')["days_tracked"] == 1
+
+    # Sync بعدی Worker (Process دیگه) یک روز جدید مینویسه
+    db.upsert_sheet_logs([make_log(1, 4), make_log(0, 9)])
+
+    assert sheets.get_logs_version('sheet', 'Sheet1') != version
+    assert sheets.get_analytics_summary('sheet', 'Sheet1')["days_tracked"] == 2
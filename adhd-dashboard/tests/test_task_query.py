@@ -0,0 +1,35 @@
+"""تست‌های فیلتر جستجوی query_tasks"""
+
+import pytest
+
+from services.db_service import DatabaseService
+
+
+@pytest.fixture
+def db(tmp_path):
+    service = DatabaseService(str(tmp_path / 'test.db'))
+    service.upsert_notion_tasks([
+        {"id": "page-1", "title": "Homework review", "status": "📥 Inbox"},
+        {"id": "page-2", "title": "Call mom", "status": "📥 Inbox", "notes": "about the HOMEWORK"},
+    ])
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize("search, expected", [
+    ("work", {"page-1", "page-2"}),
+    ("ework", {"page-1", "page-2"}),
+    ("Home", {"page-1", "page-2"}),
+    ("review", {"page-1"}),
+    ("50%", set()),
+])
+def test_search_is_case_insensitive_substring(db, search, expected):
+    tasks = db.query_tasks(search=search, notion_only=True)["tasks"]
+    assert {task["id"] for task in tasks} == expected
+
+
+def test_full_text_search_still_available(db):
+    if not db.fts_enabled:
+        pytest.skip("SQLite بدون FTS5")
+    results = db.search("homework", scope='tasks')
+    assert {task["notion_id"] for task in results["tasks"]} == {"page-1", "page-2"}
@@ -3,9 +3,25 @@
 شامل:
 - NotionAPI: ارتباط با Notion + Sync Structure
 - SheetsAPI: ارتباط با Google Sheets (12 ستون)
+- ParallelLoader: اجرای همزمان درخواست‌های یک صفحه
+- TaskSnapshot: دریافت یک‌باره Task ها برای کل صفحه
+- TaskRecord / HabitRecord: رکورد فشرده (__slots__ + کدهای Intern) برای هر Page
+- classification: دسته‌بندی یک‌باره برچسب‌های Select (Energy، Urgency، ...)
+- notion_decoder: Decoder صفحات Notion کامپایل‌شده از schema هر Database
+- DailyLogAnalytics: محاسبه همه آمارهای Daily Log در یک پیمایش
+- DailyLogColumns: ذخیره ستونی Daily Log ها برای تحلیل بازه‌های بلند
 """
 
 from .notion_api import NotionAPI
 from .sheets_api import SheetsAPI, create_sheets_api
+from .parallel import ParallelLoader
+from .task_snapshot import TaskSnapshot
+from .records import TaskRecord, HabitRecord
+from .log_analytics import DailyLogAnalytics, DailyLogMetrics
+from .log_store import DailyLogColumns
 
-__all__ = ['NotionAPI', 'SheetsAPI', 'create_sheets_api']
+__all__ = [
+    'NotionAPI', 'SheetsAPI', 'create_sheets_api',
+    'ParallelLoader', 'TaskSnapshot', 'TaskRecord', 'HabitRecord',
+    'DailyLogAnalytics', 'DailyLogMetrics', 'DailyLogColumns'
+]
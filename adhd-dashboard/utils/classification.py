@@ -0,0 +1,210 @@
+"""
+ماژول دسته‌بندی مقادیر Select
+همه قواعد برچسب -> دسته (مثلاً "High" in energy or "🔥" in energy) فقط
+همین‌جا هستن و برای هر برچسب یک‌بار اجرا میشن:
+- هر فیلد یک OptionIndex داره: برچسب <-> کد عددی کوچک + دسته نرمال‌شده
+- Option های _define_schemas (و فایل MD در sync_structure) از قبل ثبت میشن؛
+  برچسب‌های ناشناخته هم اولین بار که دیده بشن اضافه میشن
+- بعد از اون هر بررسی فقط یک Lookup در لیست/Dictionary است، پس نسخه‌های
+  انگلیسی و Emoji دار یک برچسب همیشه یک نتیجه میدن
+"""
+
+import threading
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional
+
+# مقادیر Status که Done حساب میشن (هم‌خوان با فیلتر fetch_tasks)
+DONE_STATUSES = ("✅ Done", "Done")
+
+
+class TaskStatus(str, Enum):
+    INBOX = 'inbox'
+    NEXT = 'next'
+    IN_PROGRESS = 'in_progress'
+    WAITING = 'waiting'
+    DONE = 'done'
+    SOMEDAY = 'someday'
+    OTHER = 'other'
+
+
+class Energy(str, Enum):
+    HIGH = 'high'
+    MEDIUM = 'medium'
+    LOW = 'low'
+    NONE = 'none'
+
+
+class Importance(str, Enum):
+    HIGH = 'high'
+    MEDIUM = 'medium'
+    LOW = 'low'
+    NONE = 'none'
+
+
+class Urgency(str, Enum):
+    URGENT = 'urgent'
+    SOON = 'soon'
+    NORMAL = 'normal'
+    LOW = 'low'
+    NONE = 'none'
+
+
+class HabitType(str, Enum):
+    GOOD = 'good'
+    BAD = 'bad'
+
+
+class HabitStatus(str, Enum):
+    ACTIVE = 'active'
+    ACHIEVED = 'achieved'
+    PAUSED = 'paused'
+    ABANDONED = 'abandoned'
+    OTHER = 'other'
+
+
+def _first_match(rules, default):
+    """قاعده‌ها به ترتیب: اولین دسته‌ای که یکی از نشانه‌هاش در برچسب باشه"""
+    def classify(label: str):
+        for kind, markers in rules:
+            if any(marker in label for marker in markers):
+                return kind
+        return default
+    return classify
+
+
+classify_task_status = _first_match((
+    (TaskStatus.DONE, ("Done", "✅")),
+    (TaskStatus.IN_PROGRESS, ("Progress", "🔄")),
+    (TaskStatus.NEXT, ("Next", "▶️")),
+    (TaskStatus.WAITING, ("Waiting", "⏳")),
+    (TaskStatus.SOMEDAY, ("Someday", "💭")),
+    (TaskStatus.INBOX, ("Inbox", "📥")),
+), TaskStatus.OTHER)
+
+classify_energy = _first_match((
+    (Energy.HIGH, ("High", "🔥")),
+    (Energy.MEDIUM, ("Medium", "⚡")),
+    (Energy.LOW, ("Low", "🪶")),
+), Energy.NONE)
+
+classify_importance = _first_match((
+    (Importance.HIGH, ("High", "🔴")),
+    (Importance.MEDIUM, ("Medium", "🟡")),
+    (Importance.LOW, ("Low", "🟢")),
+), Importance.NONE)
+
+classify_urgency = _first_match((
+    (Urgency.URGENT, ("Urgent", "🚨")),
+    (Urgency.SOON, ("Soon", "⏰")),
+    (Urgency.NORMAL, ("Normal", "📅")),
+    (Urgency.LOW, ("Low", "🐢")),
+), Urgency.NONE)
+
+classify_habit_type = _first_match((
+    (HabitType.GOOD, ("خوب", "🟢")),
+), HabitType.BAD)
+
+classify_habit_status = _first_match((
+    (HabitStatus.ACTIVE, ("Active", "🎯")),
+    (HabitStatus.ACHIEVED, ("Achieved", "✅")),
+    (HabitStatus.PAUSED, ("Paused", "⏸")),
+    (HabitStatus.ABANDONED, ("Abandoned", "❌")),
+), HabitStatus.OTHER)
+
+
+class OptionIndex:
+    """برچسب‌های یک فیلد Select: برچسب <-> کد (کد 0 = خالی) و دسته هر کد"""
+
+    def __init__(self, classify: Callable[[str], Enum] = None):
+        """
+        Args:
+            classify: برچسب -> دسته (یک‌بار برای هر برچسب جدید اجرا میشه)
+        """
+        self._classify = classify
+        self.vocab = []          # code -> label
+        self.kinds = []          # code -> دسته
+        self._index = {}         # label -> code
+        self._lock = threading.Lock()
+        self.code("")
+
+    def code(self, label: str) -> int:
+        """کد یک برچسب (برچسب جدید اضافه میشه)"""
+        code = self._index.get(label)
+        if code is None:
+            with self._lock:
+                code = self._index.get(label)
+                if code is None:
+                    code = len(self.vocab)
+                    self.vocab.append(label)
+                    self.kinds.append(self._classify(label) if self._classify else None)
+                    self._index[label] = code
+        return code
+
+    def kind(self, label: str) -> Optional[Enum]:
+        """دسته نرمال‌شده یک برچسب"""
+        return self.kinds[self.code(label or "")]
+
+    def codes_of(self, *kinds: Enum) -> frozenset:
+        """کد همه برچسب‌های شناخته‌شده از این دسته‌ها"""
+        return frozenset(code for code, kind in enumerate(self.kinds) if kind in kinds)
+
+    def register(self, options: Iterable[Dict]):
+        """ثبت Option های schema به ترتیب خودشون"""
+        for option in options:
+            self.code(option["name"])
+
+
+# جدول‌های مشترک (کدها در تمام Process ثابت میمونن)
+TASK_STATUS = OptionIndex(classify_task_status)
+TASK_CONTEXT = OptionIndex()
+TASK_ENERGY = OptionIndex(classify_energy)
+TASK_IMPORTANCE = OptionIndex(classify_importance)
+TASK_URGENCY = OptionIndex(classify_urgency)
+TASK_TIME = OptionIndex()
+
+HABIT_TYPE = OptionIndex(classify_habit_type)
+HABIT_CATEGORY = OptionIndex()
+HABIT_STATUS = OptionIndex(classify_habit_status)
+HABIT_FREQUENCY = OptionIndex()
+
+# Property های هر Database -> جدول (برای ثبت schema فایل MD)
+SCHEMA_FIELDS = {
+    "Tasks": {
+        "Status": TASK_STATUS,
+        "Context": TASK_CONTEXT,
+        "Energy Level": TASK_ENERGY,
+        "Importance": TASK_IMPORTANCE,
+        "Urgency": TASK_URGENCY,
+        "Estimated Time": TASK_TIME
+    },
+    "Habits": {
+        "Type": HABIT_TYPE,
+        "Category": HABIT_CATEGORY,
+        "Status": HABIT_STATUS,
+        "Frequency": HABIT_FREQUENCY
+    }
+}
+
+# کوادرانت آیزنهاور: (مهم؟، فوری؟) -> کوادرانت
+QUADRANTS = {(True, True): 1, (True, False): 2, (False, True): 3, (False, False): 4}
+URGENT_KINDS = (Urgency.URGENT, Urgency.SOON)
+
+
+def register_schema(databases: List[Dict]):
+    """ثبت Option های Database ها (خروجی parse_structure_md)"""
+    for db in databases:
+        for db_key, fields in SCHEMA_FIELDS.items():
+            if db_key.rstrip('s') not in db.get("name", ""):
+                continue
+            for prop in db.get("properties", []):
+                table = fields.get(prop.get("name"))
+                if table is not None:
+                    table.register(prop.get("options") or [])
+
+
+def quadrant(importance: str, urgency: str) -> int:
+    """کوادرانت ماتریس آیزنهاور از برچسب‌های Importance و Urgency"""
+    return QUADRANTS[(
+        TASK_IMPORTANCE.kind(importance) is Importance.HIGH,
+        TASK_URGENCY.kind(urgency) in URGENT_KINDS
+    )]
@@ -0,0 +1,128 @@
+"""
+ماژول تحلیل Daily Log ها
+همه آمارهای صفحه Analytics روی ستون‌های DailyLogColumns محاسبه میشن:
+- روند Mood/Energy و خلاصه آماری
+- فراوانی عادت‌های بد، روند عادت‌های خوب
+- استفاده از تکنیک‌ها، تحلیل خواسته‌ها
+"""
+
+from typing import List, Dict
+
+from .log_store import DailyLogColumns
+
+
+class DailyLogMetrics:
+    """نتیجه ترکیبی تحلیل Daily Log ها (خروجی DailyLogAnalytics.compute)"""
+
+    def __init__(self, mood_trend: Dict, summary: Dict,
+                 bad_habits_frequency: List[Dict], good_habits_streak: List[Dict],
+                 techniques_usage: List[Dict], desires_analysis: List[Dict]):
+        self.mood_trend = mood_trend
+        self.summary = summary
+        self.bad_habits_frequency = bad_habits_frequency
+        self.good_habits_streak = good_habits_streak
+        self.techniques_usage = techniques_usage
+        self.desires_analysis = desires_analysis
+
+    def to_dict(self) -> Dict:
+        """تبدیل به Dictionary"""
+        return {
+            "mood_trend": self.mood_trend,
+            "summary": self.summary,
+            "bad_habits_frequency": self.bad_habits_frequency,
+            "good_habits_streak": self.good_habits_streak,
+            "techniques_usage": self.techniques_usage,
+            "desires_analysis": self.desires_analysis
+        }
+
+
+class DailyLogAnalytics:
+    """محاسبه همه آمارها روی یک بازه از ستون‌های Daily Log"""
+
+    def __init__(self, columns: DailyLogColumns, start: int = 0, end: int = None):
+        """
+        Args:
+            columns: نمایش ستونی لاگ‌ها (مرتب بر اساس تاریخ)
+            start, end: بازه ردیف‌ها (پیش‌فرض: همه)
+        """
+        self.columns = columns
+        self.start = start
+        self.end = len(columns) if end is None else end
+
+    @classmethod
+    def from_logs(cls, logs: List[Dict]) -> 'DailyLogAnalytics':
+        """ساخت از لیست لاگ‌ها (خروجی SheetsAPI.read_daily_logs)"""
+        return cls(DailyLogColumns.from_logs(logs))
+
+    @classmethod
+    def window(cls, columns: DailyLogColumns, days: int) -> 'DailyLogAnalytics':
+        """تحلیل days روز اخیر"""
+        return cls(columns, columns.window_start(days))
+
+    def compute(self) -> DailyLogMetrics:
+        """محاسبه ستونی آمارها و ساخت نتیجه ترکیبی"""
+        columns, start, end = self.columns, self.start, self.end
+        labels = columns.labels(start, end)
+
+        return DailyLogMetrics(
+            mood_trend={
+                "labels": labels,
+                "mood": columns.moods[start:end].tolist(),
+                "energy": columns.energies[start:end].tolist()
+            },
+            summary=self._summary(),
+            bad_habits_frequency=[
+                {"name": name, "count": count}
+                for name, count in columns.bad_habits.most_common(start, end, 10)
+            ],
+            good_habits_streak=[
+                {"date": label, "count": count}
+                for label, count in zip(labels, columns.good_habit_counts[start:end])
+            ],
+            techniques_usage=[
+                {"name": name, "value": value}
+                for name, value in columns.techniques_used.most_common(start, end)
+            ],
+            desires_analysis=[
+                {"desire": name, "frequency": count}
+                for name, count in columns.desires.most_common(start, end, 10)
+            ]
+        )
+
+    def _summary(self) -> Dict:
+        """خلاصه آماری Mood و Energy (از جمع‌های تجمعی، بدون پیمایش)"""
+        columns, start, end = self.columns, self.start, self.end
+        count = end - start
+
+        if count <= 0:
+            return {
+                "avg_mood": 0,
+                "avg_energy": 0,
+                "days_tracked": 0,
+                "trend": "neutral"
+            }
+
+        avg_mood = columns.mood_sum(start, end) / count
+        avg_energy = columns.energy_sum(start, end) / count
+
+        # تعیین روند
+        mid = count // 2
+        if mid > 0:
+            first_half = columns.mood_sum(start, start + mid) / mid
+            second_half = columns.mood_sum(start + mid, end) / (count - mid)
+
+            if second_half > first_half + 0.5:
+                trend = "improving"
+            elif second_half < first_half - 0.5:
+                trend = "declining"
+            else:
+                trend = "stable"
+        else:
+            trend = "neutral"
+
+        return {
+            "avg_mood": round(avg_mood, 1),
+            "avg_energy": round(avg_energy, 1),
+            "days_tracked": count,
+            "trend": trend
+        }
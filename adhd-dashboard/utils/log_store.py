@@ -0,0 +1,151 @@
+"""
+ماژول ذخیره ستونی Daily Log ها
+به جای یک Dictionary با 12 رشته برای هر روز، هر ستون یک آرایه فشرده است:
+- تاریخ: آرایه int32 از ordinal روزها (مرتب، برای bisect)
+- Mood / Energy: آرایه int8 + جمع تجمعی برای میانگین O(1)
+- عادت‌ها/تکنیک‌ها/خواسته‌ها: کدگذاری دیکشنری (هر مقدار یک‌بار ذخیره میشه)
+
+پیدا کردن بازه 30/90/365 روزه با جستجوی دودویی انجام میشه، پس هزینه
+تحلیل به طول بازه بستگی داره نه به طول کل تاریخچه
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import List, Dict, Iterable, Tuple
+
+# محدوده int8 برای Mood/Energy (مقیاس 1 تا 10)
+SCORE_MIN, SCORE_MAX = -128, 127
+
+
+class CodedColumn:
+    """ستون چندمقداری با کدگذاری دیکشنری (مقادیر هر ردیف پشت سر هم + offset)"""
+
+    def __init__(self):
+        self.vocab = []         # code -> name
+        self._index = {}        # name -> code
+        self.codes = array('i')
+        self.offsets = array('i', [0])
+
+    def append(self, items: Iterable[str]):
+        """اضافه کردن مقادیر یک ردیف"""
+        for item in items:
+            code = self._index.get(item)
+            if code is None:
+                code = len(self.vocab)
+                self.vocab.append(item)
+                self._index[item] = code
+            self.codes.append(code)
+        self.offsets.append(len(self.codes))
+
+    def most_common(self, start: int, end: int, n: int = None) -> List[Tuple[str, int]]:
+        """پرتکرارترین مقادیر در ردیف‌های [start, end)"""
+        counts = Counter(self.codes[self.offsets[start]:self.offsets[end]])
+        return [(self.vocab[code], count) for code, count in counts.most_common(n)]
+
+
+class DailyLogColumns:
+    """نمایش ستونی Daily Log ها (مرتب بر اساس تاریخ)"""
+
+    # ستون‌های متنی که فقط برای بازسازی لاگ‌ها نگه داشته میشن
+    TEXT_FIELDS = (
+        'top_win', 'main_obstacle', 'techniques_suggested', 'reflection',
+        'techniques_used', 'bad_habits', 'good_habits', 'desires', 'daily_report'
+    )
+
+    def __init__(self):
+        self.dates = array('i')
+        self.moods = array('b')
+        self.energies = array('b')
+        self._mood_sums = array('q', [0])
+        self._energy_sums = array('q', [0])
+
+        self.good_habit_counts = array('h')
+        self.bad_habits = CodedColumn()
+        self.techniques_used = CodedColumn()
+        self.desires = CodedColumn()
+
+        self.text = {field: [] for field in self.TEXT_FIELDS}
+
+        # اثر انگشت ردیف‌های Sheet (SheetsAPI.get_logs_version)؛ خالی یعنی نامعلوم
+        self.fingerprint = ''
+
+    @classmethod
+    def from_logs(cls, logs: Iterable[Dict]) -> 'DailyLogColumns':
+        """ساخت از لیست لاگ‌ها (فرمت read_daily_logs)"""
+        columns = cls()
+        for log in sorted(logs, key=lambda x: x["date"]):
+            columns.append(log)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def append(self, log: Dict):
+        """اضافه کردن یک لاگ (باید به ترتیب تاریخ اضافه بشن)"""
+        mood = min(max(log.get("mood", 5), SCORE_MIN), SCORE_MAX)
+        energy = min(max(log.get("energy", 5), SCORE_MIN), SCORE_MAX)
+
+        self.dates.append(date.fromisoformat(log["date"]).toordinal())
+        self.moods.append(mood)
+        self.energies.append(energy)
+        self._mood_sums.append(self._mood_sums[-1] + mood)
+        self._energy_sums.append(self._energy_sums[-1] + energy)
+
+        good = log.get("good_habits", "")
+        self.good_habit_counts.append(
+            len([h for h in good.split(',') if h.strip() and h != '-']) if good else 0
+        )
+        self.bad_habits.append(self._split(log.get("bad_habits", "")))
+        self.techniques_used.append(self._split(log.get("techniques_used", "")))
+        self.desires.append(self._split(log.get("desires", "")))
+
+        for field in self.TEXT_FIELDS:
+            self.text[field].append(log.get(field, ""))
+
+    def _split(self, value: str) -> List[str]:
+        """جدا کردن مقادیر با کاما ('-' یعنی خالی)"""
+        if not value or value == '-':
+            return []
+        return [item.strip() for item in value.split(',')]
+
+    # ============================================
+    # Window Queries
+    # ============================================
+
+    def window_start(self, days: int, now: datetime = None) -> int:
+        """
+        اندیس اولین ردیف در بازه days روز اخیر (جستجوی دودویی)
+
+        هم‌خوان با فیلتر قدیمی date_obj >= now - days که در اون تاریخ
+        هر ردیف نیمه‌شب همون روز حساب میشه
+        """
+        cutoff = (now or datetime.now()) - timedelta(days=days)
+        first = cutoff.toordinal()
+        if cutoff.time() != time.min:
+            first += 1
+        return bisect_left(self.dates, first)
+
+    def mood_sum(self, start: int, end: int) -> int:
+        """جمع Mood در ردیف‌های [start, end)"""
+        return self._mood_sums[end] - self._mood_sums[start]
+
+    def energy_sum(self, start: int, end: int) -> int:
+        """جمع Energy در ردیف‌های [start, end)"""
+        return self._energy_sums[end] - self._energy_sums[start]
+
+    def labels(self, start: int, end: int) -> List[str]:
+        """تاریخ‌های ردیف‌ها با فرمت YYYY-MM-DD"""
+        return [date.fromordinal(d).isoformat() for d in self.dates[start:end]]
+
+    def to_logs(self, start: int = 0, end: int = None) -> List[Dict]:
+        """بازسازی لاگ‌ها با فرمت read_daily_logs"""
+        end = len(self) if end is None else end
+        logs = []
+        for i, label in zip(range(start, end), self.labels(start, end)):
+            log = {"date": label, "mood": self.moods[i], "energy": self.energies[i]}
+            for field in self.TEXT_FIELDS:
+                log[field] = self.text[field][i]
+            logs.append(log)
+        return logs
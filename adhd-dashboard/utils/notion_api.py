@@ -7,25 +7,77 @@
 """
 
 import re
+import heapq
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from notion_client import Client
 from notion_client.errors import APIResponseError
 
+from .task_snapshot import TaskSnapshot
+from .records import TaskRecord, HabitRecord
+from .notion_decoder import compile_decoders
+from .classification import (
+    HabitStatus, register_schema, quadrant, TASK_STATUS, TASK_CONTEXT, TASK_ENERGY,
+    TASK_IMPORTANCE, TASK_URGENCY, TASK_TIME, HABIT_TYPE, HABIT_CATEGORY, HABIT_STATUS,
+    HABIT_FREQUENCY
+)
+from .rate_limit import TokenBucket, SharedTokenBucket, ThrottledClient
+
 logger = logging.getLogger(__name__)
 
+# حداکثر تعداد نتیجه در هر درخواست Query (محدودیت Notion)
+PAGE_SIZE = 100
+
+
+class EmptyQuery(Exception):
+    """فیلترها با هیچ Task ای جور نمیشن (Query به Notion فرستاده نمیشه)"""
+
 
 class NotionAPI:
     """کلاس مدیریت ارتباط با Notion"""
     
-    def __init__(self, api_key: str):
-        """سازنده کلاس"""
-        self.client = Client(auth=api_key)
+    def __init__(self, api_key: str, rate_limit: float = 3, import_concurrency: int = 3,
+                 rate_limit_db: str = None):
+        """
+        سازنده کلاس
+        
+        Args:
+            api_key: کلید Integration
+            rate_limit: حداکثر درخواست در ثانیه (محدودیت Notion حدود 3)
+            import_concurrency: تعداد درخواست همزمان در Import
+            rate_limit_db: فایل SQLite برای محدودیت مشترک بین Worker ها
+                (بدون اون محدودیت فقط داخل همین Process اعمال میشه)
+        """
+        self.rate_limiter = self._create_rate_limiter(rate_limit, rate_limit_db)
+        self.import_concurrency = import_concurrency
+        
+        # همه درخواست‌ها از محدودکننده نرخ و retry عبور میکنن
+        self.client = ThrottledClient(Client(auth=api_key), self.rate_limiter)
         self.api_version = "2022-06-28"
         
+        # کش محلی Task ها و Habit ها (NotionCache) - اختیاری، از بیرون تنظیم میشه
+        self.cache = None
+        
         # تعریف ساختار Database ها
         self._define_schemas()
+        
+        # Decoder صفحات هر Database (از همون schema ای که sync_structure میسازه)
+        self.decoders = compile_decoders(self._get_default_databases(), self._db_name_to_key)
+    
+    def _create_rate_limiter(self, rate: float, db_path: str = None):
+        """محدودکننده مشترک (SQLite) یا محلی"""
+        if db_path:
+            try:
+                return SharedTokenBucket(db_path, rate)
+            except Exception as e:
+                logger.warning(f"محدودکننده مشترک در دسترس نیست، استفاده از محدودکننده محلی: {e}")
+        return TokenBucket(rate)
+    
+    def get_api_status(self) -> Dict:
+        """شمارنده‌های محدودیت نرخ و retry"""
+        return self.client.get_status()
     
     def _define_schemas(self):
         """تعریف schema های پیش‌فرض برای هر Database"""
@@ -153,6 +205,19 @@ class NotionAPI:
         
         # Mood/Energy Scores (1-10)
         self.score_options = [{"name": str(i), "color": "default"} for i in range(1, 11)]
+        
+        # ثبت در ایندکس دسته‌بندی (utils/classification) و کدهای رکوردها
+        for table, options in ((TASK_STATUS, self.task_status_options),
+                               (TASK_CONTEXT, self.context_options),
+                               (TASK_ENERGY, self.energy_options),
+                               (TASK_IMPORTANCE, self.importance_options),
+                               (TASK_URGENCY, self.urgency_options),
+                               (TASK_TIME, self.time_options),
+                               (HABIT_TYPE, self.habit_type_options),
+                               (HABIT_CATEGORY, self.habit_category_options),
+                               (HABIT_STATUS, self.habit_status_options),
+                               (HABIT_FREQUENCY, self.habit_frequency_options)):
+            table.register(options)
 
     # ============================================
     # Sync Structure - ساخت/بروزرسانی Database ها
@@ -285,6 +350,8 @@ class NotionAPI:
         
         # اگه MD نداریم، از ساختار پیش‌فرض استفاده کن
         databases = self._get_default_databases() if not md_content else self.parse_structure_md(md_content)
+        register_schema(databases)
+        self.decoders.update(compile_decoders(databases, self._db_name_to_key))
         
         for db in databases:
             try:
@@ -514,117 +581,287 @@ class NotionAPI:
     # ============================================
     # Tasks CRUD
     # ============================================
-    
-    def _parse_task(self, page: dict) -> dict:
-        """تبدیل داده Notion به فرمت برنامه"""
-        props = page.get("properties", {})
-        
-        # استخراج عنوان
-        title = ""
-        if "Name" in props and props["Name"].get("title"):
-            title = props["Name"]["title"][0]["plain_text"] if props["Name"]["title"] else ""
-        
-        # استخراج Status
-        status = ""
-        if "Status" in props and props["Status"].get("select"):
-            status = props["Status"]["select"].get("name", "")
-        
-        # استخراج Context (multi-select)
-        context = []
-        if "Context" in props and props["Context"].get("multi_select"):
-            context = [item["name"] for item in props["Context"]["multi_select"]]
-        
-        # استخراج Energy Level
-        energy = ""
-        if "Energy Level" in props and props["Energy Level"].get("select"):
-            energy = props["Energy Level"]["select"].get("name", "")
-        
-        # استخراج Importance
-        importance = ""
-        if "Importance" in props and props["Importance"].get("select"):
-            importance = props["Importance"]["select"].get("name", "")
-        
-        # استخراج Urgency
-        urgency = ""
-        if "Urgency" in props and props["Urgency"].get("select"):
-            urgency = props["Urgency"]["select"].get("name", "")
-        
-        # استخراج Estimated Time
-        time_est = ""
-        if "Estimated Time" in props and props["Estimated Time"].get("select"):
-            time_est = props["Estimated Time"]["select"].get("name", "")
-        
-        # استخراج Due Date
-        due_date = None
-        if "Due Date" in props and props["Due Date"].get("date"):
-            due_date = props["Due Date"]["date"].get("start")
-        
-        # استخراج Quick Win
-        quick_win = False
-        if "Quick Win" in props:
-            quick_win = props["Quick Win"].get("checkbox", False)
-        
-        # استخراج Notes
-        notes = ""
-        if "Notes" in props and props["Notes"].get("rich_text"):
-            notes = props["Notes"]["rich_text"][0]["plain_text"] if props["Notes"]["rich_text"] else ""
-        
-        # محاسبه Quadrant
-        quadrant = self._calculate_quadrant(importance, urgency)
+
+    def _parse_task(self, page: dict) -> TaskRecord:
+        """تبدیل داده Notion به فرمت برنامه (TaskRecord)"""
+        fields = self.decoders["tasks"].decode(page)
         
-        return {
-            "id": page["id"],
-            "title": title,
-            "status": status,
-            "context": context,
-            "energy": energy,
-            "importance": importance,
-            "urgency": urgency,
-            "time": time_est,
-            "due_date": due_date,
-            "quick_win": quick_win,
-            "notes": notes,
-            "quadrant": quadrant,
-            "url": page.get("url", ""),
-            "created_time": page.get("created_time"),
-            "last_edited_time": page.get("last_edited_time")
-        }
+        return TaskRecord(
+            id=page["id"],
+            quadrant=self._calculate_quadrant(fields.get("importance", ""), fields.get("urgency", "")),
+            url=page.get("url", ""),
+            created_time=page.get("created_time"),
+            last_edited_time=page.get("last_edited_time"),
+            **fields
+        )
     
     def _calculate_quadrant(self, importance: str, urgency: str) -> int:
-        """محاسبه کوادرانت ماتریس آیزنهاور"""
-        is_important = "High" in importance or "🔴" in importance
-        is_urgent = "Urgent" in urgency or "🚨" in urgency or "Soon" in urgency or "⏰" in urgency
-        
-        if is_important and is_urgent:
-            return 1  # بحران
-        elif is_important and not is_urgent:
-            return 2  # ذکاوت
-        elif not is_important and is_urgent:
-            return 3  # حواس‌پرتی
-        else:
-            return 4  # اتلاف
+        """محاسبه کوادرانت ماتریس آیزنهاور (1 بحران، 2 ذکاوت، 3 حواس‌پرتی، 4 اتلاف)"""
+        return quadrant(importance or "", urgency or "")
     
-    def fetch_tasks(self, database_id: str, include_done: bool = False) -> List[Dict]:
-        """دریافت Task ها از Notion"""
-        try:
-            query_params = {"database_id": database_id}
-            
-            if not include_done:
-                query_params["filter"] = {
-                    "and": [
-                        {"property": "Status", "select": {"does_not_equal": "✅ Done"}},
-                        {"property": "Status", "select": {"does_not_equal": "Done"}}
-                    ]
-                }
+    def task_sort_key(self, task: dict) -> tuple:
+        """
+        کلید مرتب‌سازی هم‌خوان با sorts در iter_tasks
+        (Notion فیلدهای Select رو به ترتیب Options مرتب میکنه، خالی‌ها آخر)
+        """
+        def rank(options: List[Dict], value: str) -> int:
+            for i, opt in enumerate(options):
+                if opt["name"] == value:
+                    return i
+            return len(options)
+        
+        return (
+            rank(self.urgency_options, task.get("urgency", "")),
+            rank(self.importance_options, task.get("importance", ""))
+        )
+    
+    def task_priority_key(self, task: dict) -> tuple:
+        """
+        کلید «بهترین کار بعدی»: کوادرانت، بعد نزدیک‌ترین Due Date (بدون Due Date ها آخر)
+        هم‌خوان با ترتیب 'priority' در DatabaseService.query_tasks
+        """
+        return (task.get("quadrant") or 4, task.get("due_date") or "9999-12-31")
+    
+    def _iter_query(self, query_params: dict) -> Iterator[Dict]:
+        """
+        اجرای databases.query با دنبال کردن has_more / next_cursor
+        
+        Page های خام Notion رو یکی‌یکی yield میکنه (بدون نگه داشتن کل نتیجه)
+        """
+        params = dict(query_params, page_size=PAGE_SIZE)
+        
+        while True:
+            response = self.client.databases.query(**params)
+            yield from response.get("results", [])
             
-            query_params["sorts"] = [
+            if not response.get("has_more") or not response.get("next_cursor"):
+                break
+            params["start_cursor"] = response["next_cursor"]
+    
+    def _edited_since_filter(self, edited_since: str) -> dict:
+        """فیلتر Page هایی که از یک زمان به بعد ویرایش شدن"""
+        return {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": edited_since}
+        }
+    
+    def build_task_query(self, include_done: bool = False, edited_since: str = None,
+                         status: str = None, context: str = None, energy: str = None,
+                         search: str = None, urgency: str = None, quadrant: int = None) -> dict:
+        """
+        ساخت filter و sorts برای databases.query از فیلترهای صفحه /tasks
+        
+        فیلترهای status/context/energy/urgency مثل فیلتر قبلی صفحه زیررشته‌ای هستن؛
+        چون Notion برای Select فقط equals داره، هر مقدار به Option هایی که
+        شاملش هستن تبدیل میشه. search در عنوان و Notes جستجو میکنه.
+        quadrant (1 تا 4) به شرط روی Option های Importance و Urgency تبدیل میشه.
+        
+        Returns:
+            {"filter": ..., "sorts": [...]} (filter فقط اگه شرطی باشه)
+        
+        Raises:
+            EmptyQuery: اگه هیچ Option ای با کوادرانت جور نباشه
+        """
+        conditions = []
+        
+        if not include_done:
+            conditions += [
+                {"property": "Status", "select": {"does_not_equal": "✅ Done"}},
+                {"property": "Status", "select": {"does_not_equal": "Done"}}
+            ]
+        
+        if edited_since:
+            conditions.append(self._edited_since_filter(edited_since))
+        
+        if status:
+            conditions.append(self._option_filter("Status", "select", self.task_status_options, status))
+        
+        if context:
+            conditions.append(self._option_filter("Context", "multi_select", self.context_options, context))
+        
+        if energy:
+            conditions.append(self._option_filter("Energy Level", "select", self.energy_options, energy))
+        
+        if urgency:
+            conditions.append(self._option_filter("Urgency", "select", self.urgency_options, urgency))
+        
+        if quadrant:
+            conditions += self._quadrant_filter(int(quadrant))
+        
+        if search:
+            conditions.append({"or": [
+                {"property": "Name", "title": {"contains": search}},
+                {"property": "Notes", "rich_text": {"contains": search}}
+            ]})
+        
+        query = {
+            "sorts": [
                 {"property": "Urgency", "direction": "ascending"},
                 {"property": "Importance", "direction": "ascending"}
             ]
+        }
+        if conditions:
+            query["filter"] = {"and": conditions}
+        
+        return query
+    
+    def _option_filter(self, prop: str, prop_type: str, options: List[Dict], value: str) -> dict:
+        """شرط زیررشته‌ای روی Select/Multi-select (OR روی Option های شامل value)"""
+        names = self._matching_options(options, value)
+        operator = "equals" if prop_type == "select" else "contains"
+        
+        conditions = [{"property": prop, prop_type: {operator: name}} for name in names]
+        return conditions[0] if len(conditions) == 1 else {"or": conditions}
+    
+    def _quadrant_filter(self, quadrant: int) -> List[dict]:
+        """شرط‌های یک کوادرانت (همون قواعد _calculate_quadrant روی Option ها)"""
+        important = [o["name"] for o in self.importance_options
+                     if self._calculate_quadrant(o["name"], "") == 2]
+        urgent = [o["name"] for o in self.urgency_options
+                  if self._calculate_quadrant("", o["name"]) == 3]
+        
+        conditions = []
+        for prop, names, wanted in (("Importance", important, quadrant in (1, 2)),
+                                    ("Urgency", urgent, quadrant in (1, 3))):
+            if wanted:
+                if not names:
+                    # بدون Option مناسب هیچ Task ای در این کوادرانت نیست
+                    raise EmptyQuery(f"No {prop} option fits quadrant {quadrant}")
+                matches = [{"property": prop, "select": {"equals": n}} for n in names]
+                conditions.append(matches[0] if len(matches) == 1 else {"or": matches})
+            else:
+                conditions += [{"property": prop, "select": {"does_not_equal": n}} for n in names]
+        return conditions
+    
+    def _matching_options(self, options: List[Dict], value: str) -> List[str]:
+        """نام Option هایی که value رو شامل میشن (اگه هیچ‌کدوم نبود، خود value)"""
+        return [opt["name"] for opt in options if value in opt["name"]] or [value]
+    
+    def query_tasks_page(self, database_id: str, page_size: int = 10,
+                         start_cursor: str = None, **filters) -> Dict:
+        """
+        دریافت فقط یک صفحه از Task های فیلترشده
+        
+        با کش فعال از ایندکس‌های SQLite، وگرنه با فیلتر و مرتب‌سازی سمت Notion
+        
+        Args:
+            page_size: تعداد Task در صفحه
+            start_cursor: next_cursor صفحه قبل (None برای صفحه اول)
+            filters: آرگومان‌های build_task_query
+        
+        Returns:
+            {"tasks": [...], "next_cursor": str|None, "has_more": bool,
+             "total": int|None (فقط از کش محلی)}
+        """
+        if self.cache is not None:
+            return self._query_cached_tasks_page(database_id, page_size, start_cursor, **filters)
+        
+        try:
+            params = {"database_id": database_id, "page_size": min(page_size, PAGE_SIZE)}
+            params.update(self.build_task_query(**filters))
+            if start_cursor:
+                params["start_cursor"] = start_cursor
+            
+            response = self.client.databases.query(**params)
+            has_more = bool(response.get("has_more") and response.get("next_cursor"))
+            
+            return {
+                "tasks": [self._parse_task(page) for page in response.get("results", [])],
+                "next_cursor": response.get("next_cursor") if has_more else None,
+                "has_more": has_more,
+                "total": None
+            }
+        except EmptyQuery:
+            return {"tasks": [], "next_cursor": None, "has_more": False, "total": 0}
+        except Exception as e:
+            logger.error(f"خطا در دریافت Tasks: {e}")
+            return {"tasks": [], "next_cursor": None, "has_more": False, "total": None}
+    
+    def _query_cached_tasks_page(self, database_id: str, page_size: int, start_cursor: str,
+                                 include_done: bool = False, status: str = None,
+                                 context: str = None, energy: str = None,
+                                 search: str = None, urgency: str = None,
+                                 quadrant: int = None) -> Dict:
+        """query_tasks_page روی کش محلی (فیلترهای زیررشته‌ای به Option ها تبدیل میشن)"""
+        try:
+            return self.cache.query_tasks_page(
+                database_id,
+                page_size=page_size,
+                start_cursor=start_cursor,
+                **self._cached_task_filters(include_done, status, context, energy,
+                                            search, urgency, quadrant)
+            )
+        except Exception as e:
+            logger.error(f"خطا در دریافت Tasks: {e}")
+            return {"tasks": [], "next_cursor": None, "has_more": False, "total": None}
+    
+    def _cached_task_filters(self, include_done: bool = False, status: str = None,
+                             context: str = None, energy: str = None, search: str = None,
+                             urgency: str = None, quadrant: int = None) -> Dict:
+        """فیلترهای build_task_query → آرگومان‌های DatabaseService.query_tasks"""
+        return {
+            "include_done": include_done,
+            "status": self._matching_options(self.task_status_options, status) if status else None,
+            "context": self._matching_options(self.context_options, context) if context else None,
+            "energy": self._matching_options(self.energy_options, energy) if energy else None,
+            "urgency": self._matching_options(self.urgency_options, urgency) if urgency else None,
+            "quadrant": int(quadrant) if quadrant else None,
+            "search": search
+        }
+    
+    def select_tasks(self, database_id: str, limit: int = 1, **filters) -> List[Dict]:
+        """
+        limit «بهترین کار بعدی» با ترتیب task_priority_key (برای Focus Mode)
+        
+        با کش فعال فقط limit ردیف از ایندکس 'priority' در SQLite خونده میشه؛
+        وگرنه فیلترها سمت Notion اعمال میشن و نتیجه صفحه به صفحه از یک
+        Heap با اندازه limit رد میشه (Notion بر اساس کوادرانت مرتب نمیکنه)
+        
+        Args:
+            limit: تعداد Task
+            filters: آرگومان‌های build_task_query (status، urgency، energy، quadrant، ...)
+        """
+        try:
+            if self.cache is not None:
+                return self.cache.select_tasks(
+                    database_id, limit, **self._cached_task_filters(**filters)
+                )
             
-            response = self.client.databases.query(**query_params)
+            query_params = {"database_id": database_id}
+            query_params.update(self.build_task_query(**filters))
+            tasks = (self._parse_task(page) for page in self._iter_query(query_params))
+            return heapq.nsmallest(limit, tasks, key=self.task_priority_key)
+        except EmptyQuery:
+            return []
+        except Exception as e:
+            logger.error(f"خطا در دریافت Tasks: {e}")
+            return []
+    
+    def iter_tasks(self, database_id: str, include_done: bool = False,
+                   edited_since: str = None) -> Iterator[Dict]:
+        """
+        دریافت صفحه به صفحه Task ها از Notion (بدون کش)
+        
+        هر Task به محض رسیدن صفحه‌اش yield میشه و در هر لحظه فقط یک صفحه
+        در حافظه است. برخلاف fetch_tasks خطا رو بالا میفرسته.
+        
+        Args:
+            include_done: شامل Task های Done
+            edited_since: فقط Page های ویرایش شده از این زمان (ISO) به بعد
+        """
+        query_params = {"database_id": database_id}
+        query_params.update(self.build_task_query(include_done=include_done, edited_since=edited_since))
+        
+        for page in self._iter_query(query_params):
+            yield self._parse_task(page)
+    
+    def fetch_tasks(self, database_id: str, include_done: bool = False) -> List[Dict]:
+        """دریافت Task ها (از کش محلی اگه فعال باشه، وگرنه از Notion)"""
+        try:
+            if self.cache is not None:
+                return self.cache.get_tasks(database_id, include_done)
             
-            tasks = [self._parse_task(page) for page in response.get("results", [])]
+            tasks = list(self.iter_tasks(database_id, include_done))
             logger.info(f"دریافت {len(tasks)} تسک")
             return tasks
             
@@ -635,105 +872,128 @@ class NotionAPI:
     def create_task(self, database_id: str, task_data: dict) -> Optional[Dict]:
         """ایجاد Task جدید"""
         try:
-            properties = {
-                "Name": {"title": [{"text": {"content": task_data.get("title", "")}}]}
-            }
-            
-            if task_data.get("status"):
-                properties["Status"] = {"select": {"name": task_data["status"]}}
-            
-            if task_data.get("context"):
-                contexts = task_data["context"] if isinstance(task_data["context"], list) else [task_data["context"]]
-                properties["Context"] = {"multi_select": [{"name": c} for c in contexts]}
-            
-            if task_data.get("energy"):
-                properties["Energy Level"] = {"select": {"name": task_data["energy"]}}
-            
-            if task_data.get("importance"):
-                properties["Importance"] = {"select": {"name": task_data["importance"]}}
-            
-            if task_data.get("urgency"):
-                properties["Urgency"] = {"select": {"name": task_data["urgency"]}}
-            
-            if task_data.get("time"):
-                properties["Estimated Time"] = {"select": {"name": task_data["time"]}}
-            
-            if task_data.get("due_date"):
-                properties["Due Date"] = {"date": {"start": task_data["due_date"]}}
-            
-            if task_data.get("quick_win") is not None:
-                properties["Quick Win"] = {"checkbox": task_data["quick_win"]}
-            
-            if task_data.get("notes"):
-                properties["Notes"] = {"rich_text": [{"text": {"content": task_data["notes"]}}]}
-            
-            response = self.client.pages.create(
-                parent={"database_id": database_id},
-                properties=properties
-            )
-            
-            logger.info(f"Task ایجاد شد: {task_data.get('title')}")
-            return self._parse_task(response)
-            
+            return self._create_task_page(database_id, task_data)
         except Exception as e:
             logger.error(f"خطا در ایجاد Task: {e}")
             return None
     
+    def _create_task_page(self, database_id: str, task_data: dict) -> Dict:
+        """ایجاد Task جدید (خطای API بالا فرستاده میشه تا قابل تکرار باشه)"""
+        properties = {
+            "Name": {"title": [{"text": {"content": task_data.get("title", "")}}]}
+        }
+        
+        if task_data.get("status"):
+            properties["Status"] = {"select": {"name": task_data["status"]}}
+        
+        if task_data.get("context"):
+            contexts = task_data["context"] if isinstance(task_data["context"], list) else [task_data["context"]]
+            properties["Context"] = {"multi_select": [{"name": c} for c in contexts]}
+        
+        if task_data.get("energy"):
+            properties["Energy Level"] = {"select": {"name": task_data["energy"]}}
+        
+        if task_data.get("importance"):
+            properties["Importance"] = {"select": {"name": task_data["importance"]}}
+        
+        if task_data.get("urgency"):
+            properties["Urgency"] = {"select": {"name": task_data["urgency"]}}
+        
+        if task_data.get("time"):
+            properties["Estimated Time"] = {"select": {"name": task_data["time"]}}
+        
+        if task_data.get("due_date"):
+            properties["Due Date"] = {"date": {"start": task_data["due_date"]}}
+        
+        if task_data.get("quick_win") is not None:
+            properties["Quick Win"] = {"checkbox": task_data["quick_win"]}
+        
+        if task_data.get("notes"):
+            properties["Notes"] = {"rich_text": [{"text": {"content": task_data["notes"]}}]}
+        
+        response = self.client.pages.create(
+            parent={"database_id": database_id},
+            properties=properties
+        )
+        
+        logger.info(f"Task ایجاد شد: {task_data.get('title')}")
+        task = self._parse_task(response)
+        
+        if self.cache is not None:
+            self.cache.store_task(task)
+        
+        return task
+    
     def update_task(self, page_id: str, task_data: dict) -> Optional[Dict]:
         """بروزرسانی Task"""
         try:
-            properties = {}
-            
-            if "title" in task_data:
-                properties["Name"] = {"title": [{"text": {"content": task_data["title"]}}]}
-            
-            if "status" in task_data:
-                properties["Status"] = {"select": {"name": task_data["status"]}}
-            
-            if "context" in task_data:
-                contexts = task_data["context"] if isinstance(task_data["context"], list) else [task_data["context"]]
-                properties["Context"] = {"multi_select": [{"name": c} for c in contexts]}
-            
-            if "energy" in task_data:
-                properties["Energy Level"] = {"select": {"name": task_data["energy"]}}
-            
-            if "importance" in task_data:
-                properties["Importance"] = {"select": {"name": task_data["importance"]}}
-            
-            if "urgency" in task_data:
-                properties["Urgency"] = {"select": {"name": task_data["urgency"]}}
-            
-            if "time" in task_data:
-                properties["Estimated Time"] = {"select": {"name": task_data["time"]}}
-            
-            if "due_date" in task_data:
-                properties["Due Date"] = {"date": {"start": task_data["due_date"]} if task_data["due_date"] else None}
-            
-            if "quick_win" in task_data:
-                properties["Quick Win"] = {"checkbox": task_data["quick_win"]}
-            
-            if "notes" in task_data:
-                properties["Notes"] = {"rich_text": [{"text": {"content": task_data["notes"]}}]}
-            
-            response = self.client.pages.update(page_id=page_id, properties=properties)
-            
-            logger.info(f"Task بروزرسانی شد: {page_id}")
-            return self._parse_task(response)
-            
+            return self._update_task_page(page_id, task_data)
         except Exception as e:
             logger.error(f"خطا در بروزرسانی Task: {e}")
             return None
     
+    def _update_task_page(self, page_id: str, task_data: dict) -> Dict:
+        """بروزرسانی Task (خطای API بالا فرستاده میشه تا قابل تکرار باشه)"""
+        properties = {}
+        
+        if "title" in task_data:
+            properties["Name"] = {"title": [{"text": {"content": task_data["title"]}}]}
+        
+        if "status" in task_data:
+            properties["Status"] = {"select": {"name": task_data["status"]}}
+        
+        if "context" in task_data:
+            contexts = task_data["context"] if isinstance(task_data["context"], list) else [task_data["context"]]
+            properties["Context"] = {"multi_select": [{"name": c} for c in contexts]}
+        
+        if "energy" in task_data:
+            properties["Energy Level"] = {"select": {"name": task_data["energy"]}}
+        
+        if "importance" in task_data:
+            properties["Importance"] = {"select": {"name": task_data["importance"]}}
+        
+        if "urgency" in task_data:
+            properties["Urgency"] = {"select": {"name": task_data["urgency"]}}
+        
+        if "time" in task_data:
+            properties["Estimated Time"] = {"select": {"name": task_data["time"]}}
+        
+        if "due_date" in task_data:
+            properties["Due Date"] = {"date": {"start": task_data["due_date"]} if task_data["due_date"] else None}
+        
+        if "quick_win" in task_data:
+            properties["Quick Win"] = {"checkbox": task_data["quick_win"]}
+        
+        if "notes" in task_data:
+            properties["Notes"] = {"rich_text": [{"text": {"content": task_data["notes"]}}]}
+        
+        response = self.client.pages.update(page_id=page_id, properties=properties)
+        
+        logger.info(f"Task بروزرسانی شد: {page_id}")
+        task = self._parse_task(response)
+        
+        if self.cache is not None:
+            self.cache.store_task(task)
+        
+        return task
+    
     def delete_task(self, page_id: str) -> bool:
         """آرشیو Task"""
         try:
-            self.client.pages.update(page_id=page_id, archived=True)
-            logger.info(f"Task آرشیو شد: {page_id}")
+            self._archive_task_page(page_id)
             return True
         except Exception as e:
             logger.error(f"خطا در آرشیو Task: {e}")
             return False
     
+    def _archive_task_page(self, page_id: str):
+        """آرشیو Task (خطای API بالا فرستاده میشه تا قابل تکرار باشه)"""
+        self.client.pages.update(page_id=page_id, archived=True)
+        logger.info(f"Task آرشیو شد: {page_id}")
+        
+        if self.cache is not None:
+            self.cache.forget_task(page_id)
+    
     def mark_done(self, page_id: str) -> Optional[Dict]:
         """تغییر وضعیت به Done"""
         return self.update_task(page_id, {"status": "✅ Done"})
@@ -742,123 +1002,66 @@ class NotionAPI:
     # Habits CRUD
     # ============================================
     
-    def _parse_habit(self, page: dict) -> dict:
-        """تبدیل داده Notion به فرمت Habit"""
-        props = page.get("properties", {})
-        
-        # نام
-        name = ""
-        if "Habit Name" in props and props["Habit Name"].get("title"):
-            name = props["Habit Name"]["title"][0]["plain_text"] if props["Habit Name"]["title"] else ""
-        
-        # Type
-        habit_type = ""
-        if "Type" in props and props["Type"].get("select"):
-            habit_type = props["Type"]["select"].get("name", "")
-        
-        # Category
-        category = ""
-        if "Category" in props and props["Category"].get("select"):
-            category = props["Category"]["select"].get("name", "")
-        
-        # Status
-        status = ""
-        if "Status" in props and props["Status"].get("select"):
-            status = props["Status"]["select"].get("name", "")
-        
-        # Frequency
-        frequency = ""
-        if "Frequency" in props and props["Frequency"].get("select"):
-            frequency = props["Frequency"]["select"].get("name", "")
-        
-        # Start Date
-        start_date = None
-        if "Start Date" in props and props["Start Date"].get("date"):
-            start_date = props["Start Date"]["date"].get("start")
-        
-        # Counter
-        counter = 0
-        if "Counter" in props and props["Counter"].get("number") is not None:
-            counter = props["Counter"]["number"]
-        
-        # Last Mentioned
-        last_mentioned = None
-        if "Last Mentioned" in props and props["Last Mentioned"].get("date"):
-            last_mentioned = props["Last Mentioned"]["date"].get("start")
-        
-        # Streak
-        streak = 0
-        if "Streak" in props and props["Streak"].get("number") is not None:
-            streak = props["Streak"]["number"]
-        
-        # Best Streak
-        best_streak = 0
-        if "Best Streak" in props and props["Best Streak"].get("number") is not None:
-            best_streak = props["Best Streak"]["number"]
-        
-        # Trigger
-        trigger = ""
-        if "Related Trigger" in props and props["Related Trigger"].get("rich_text"):
-            trigger = props["Related Trigger"]["rich_text"][0]["plain_text"] if props["Related Trigger"]["rich_text"] else ""
-        
-        # Replacement
-        replacement = ""
-        if "Replacement" in props and props["Replacement"].get("rich_text"):
-            replacement = props["Replacement"]["rich_text"][0]["plain_text"] if props["Replacement"]["rich_text"] else ""
-        
-        # Why Important
-        why = ""
-        if "Why Important" in props and props["Why Important"].get("rich_text"):
-            why = props["Why Important"]["rich_text"][0]["plain_text"] if props["Why Important"]["rich_text"] else ""
+    def _parse_habit(self, page: dict) -> HabitRecord:
+        """تبدیل داده Notion به فرمت Habit (HabitRecord)"""
+        return HabitRecord(
+            id=page["id"],
+            url=page.get("url", ""),
+            last_edited_time=page.get("last_edited_time"),
+            **self.decoders["habits"].decode(page)
+        )
+    
+    def iter_habits(self, database_id: str, filter_type: str = "all",
+                    edited_since: str = None) -> Iterator[Dict]:
+        """
+        دریافت صفحه به صفحه Habit ها از Notion (بدون کش، خطا رو بالا میفرسته)
         
-        return {
-            "id": page["id"],
-            "name": name,
-            "type": habit_type,
-            "category": category,
-            "status": status,
-            "frequency": frequency,
-            "start_date": start_date,
-            "counter": counter,
-            "last_mentioned": last_mentioned,
-            "streak": streak,
-            "best_streak": best_streak,
-            "trigger": trigger,
-            "replacement": replacement,
-            "why": why,
-            "is_good": "خوب" in habit_type or "🟢" in habit_type,
-            "url": page.get("url", "")
-        }
+        Args:
+            filter_type: all / good / bad / active
+            edited_since: فقط Page های ویرایش شده از این زمان (ISO) به بعد
+        """
+        query_params = {"database_id": database_id}
+        conditions = []
+        
+        # فیلتر بر اساس نوع
+        if filter_type == "good":
+            conditions.append({
+                "property": "Type",
+                "select": {"equals": "🟢 عادت خوب"}
+            })
+        elif filter_type == "bad":
+            conditions.append({
+                "property": "Type",
+                "select": {"equals": "🔴 عادت بد"}
+            })
+        elif filter_type == "active":
+            conditions.append({
+                "property": "Status",
+                "select": {"equals": "🎯 Active"}
+            })
+        
+        if edited_since:
+            conditions.append(self._edited_since_filter(edited_since))
+        
+        if len(conditions) == 1:
+            query_params["filter"] = conditions[0]
+        elif conditions:
+            query_params["filter"] = {"and": conditions}
+        
+        query_params["sorts"] = [
+            {"property": "Streak", "direction": "descending"}
+        ]
+        
+        for page in self._iter_query(query_params):
+            yield self._parse_habit(page)
     
     def fetch_habits(self, database_id: str, filter_type: str = "all") -> List[Dict]:
-        """دریافت Habits از Notion"""
+        """دریافت Habits (از کش محلی اگه فعال باشه، وگرنه از Notion)"""
         try:
-            query_params = {"database_id": database_id}
+            if self.cache is not None:
+                return self.cache.get_habits(database_id, filter_type)
             
-            # فیلتر بر اساس نوع
-            if filter_type == "good":
-                query_params["filter"] = {
-                    "property": "Type",
-                    "select": {"equals": "🟢 عادت خوب"}
-                }
-            elif filter_type == "bad":
-                query_params["filter"] = {
-                    "property": "Type",
-                    "select": {"equals": "🔴 عادت بد"}
-                }
-            elif filter_type == "active":
-                query_params["filter"] = {
-                    "property": "Status",
-                    "select": {"equals": "🎯 Active"}
-                }
-            
-            query_params["sorts"] = [
-                {"property": "Streak", "direction": "descending"}
-            ]
-            
-            response = self.client.databases.query(**query_params)
-            
-            habits = [self._parse_habit(page) for page in response.get("results", [])]
+            habits = list(self.iter_habits(database_id, filter_type))
             logger.info(f"دریافت {len(habits)} عادت")
             return habits
             
@@ -911,7 +1114,12 @@ class NotionAPI:
             )
             
             logger.info(f"Habit ایجاد شد: {habit_data.get('name')}")
-            return self._parse_habit(response)
+            habit = self._parse_habit(response)
+            
+            if self.cache is not None:
+                self.cache.store_habit(habit)
+            
+            return habit
             
         except Exception as e:
             logger.error(f"خطا در ایجاد Habit: {e}")
@@ -920,42 +1128,60 @@ class NotionAPI:
     def increment_habit(self, database_id: str, habit_id: str) -> Optional[Dict]:
         """افزایش Counter و بروزرسانی Streak"""
         try:
-            # دریافت اطلاعات فعلی
-            page = self.client.pages.retrieve(page_id=habit_id)
-            habit = self._parse_habit(page)
-            
-            today = datetime.now().strftime("%Y-%m-%d")
-            yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-            
-            new_counter = habit["counter"] + 1
-            new_streak = habit["streak"]
-            
-            # محاسبه Streak
-            last_mentioned = habit["last_mentioned"]
-            if last_mentioned == yesterday:
-                new_streak = habit["streak"] + 1
-            elif last_mentioned != today:
-                new_streak = 1  # Reset streak
-            
-            new_best = max(new_streak, habit["best_streak"])
-            
-            # بروزرسانی
-            properties = {
-                "Counter": {"number": new_counter},
-                "Streak": {"number": new_streak},
-                "Best Streak": {"number": new_best},
-                "Last Mentioned": {"date": {"start": today}}
-            }
-            
-            response = self.client.pages.update(page_id=habit_id, properties=properties)
-            
-            logger.info(f"Habit بروزرسانی شد: {habit['name']} (Counter: {new_counter}, Streak: {new_streak})")
-            return self._parse_habit(response)
-            
+            return self._increment_habit_page(habit_id)
         except Exception as e:
             logger.error(f"خطا در افزایش Habit: {e}")
             return None
     
+    def _increment_habit_page(self, habit_id: str, count: int = 1) -> Dict:
+        """
+        افزایش Counter به اندازه count (خطای API بالا فرستاده میشه)
+        
+        چند افزایش صف‌شده از Outbox با هم یک درخواست میشن
+        """
+        # دریافت اطلاعات فعلی
+        page = self.client.pages.retrieve(page_id=habit_id)
+        habit = self._parse_habit(page)
+        
+        new_counter, new_streak, new_best = self.next_habit_counts(habit, count)
+        today = datetime.now().strftime("%Y-%m-%d")
+        
+        # بروزرسانی
+        properties = {
+            "Counter": {"number": new_counter},
+            "Streak": {"number": new_streak},
+            "Best Streak": {"number": new_best},
+            "Last Mentioned": {"date": {"start": today}}
+        }
+        
+        response = self.client.pages.update(page_id=habit_id, properties=properties)
+        
+        logger.info(f"Habit بروزرسانی شد: {habit['name']} (Counter: {new_counter}, Streak: {new_streak})")
+        habit = self._parse_habit(response)
+        
+        if self.cache is not None:
+            self.cache.store_habit(habit)
+        
+        return habit
+    
+    @staticmethod
+    def next_habit_counts(habit: Dict, count: int = 1) -> tuple:
+        """(Counter, Streak, Best Streak) بعد از ثبت count بار در امروز"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        
+        new_counter = habit["counter"] + count
+        new_streak = habit["streak"]
+        
+        # محاسبه Streak
+        last_mentioned = habit["last_mentioned"]
+        if last_mentioned == yesterday:
+            new_streak = habit["streak"] + 1
+        elif last_mentioned != today:
+            new_streak = 1  # Reset streak
+        
+        return new_counter, new_streak, max(new_streak, habit["best_streak"])
+    
     def update_habit(self, habit_id: str, habit_data: dict) -> Optional[Dict]:
         """بروزرسانی Habit"""
         try:
@@ -987,63 +1213,52 @@ class NotionAPI:
             
             response = self.client.pages.update(page_id=habit_id, properties=properties)
             
-            return self._parse_habit(response)
+            habit = self._parse_habit(response)
+            
+            if self.cache is not None:
+                self.cache.store_habit(habit)
+            
+            return habit
             
         except Exception as e:
             logger.error(f"خطا در بروزرسانی Habit: {e}")
             return None
 
+    # ============================================
+    # Data Version (ETag)
+    # ============================================
+    
+    def get_data_version(self, database_id: str, kind: str = "tasks") -> Optional[str]:
+        """
+        نسخه فعلی داده‌های یک Database برای ETag پاسخ‌های API
+        
+        فقط با کش محلی: شمارنده data_revisions در SQLite بین همه Worker ها مشترکه.
+        بدون کش None برمیگرده (ساختن نسخه یک درخواست اضافه به Notion لازم داره)
+        
+        Args:
+            kind: tasks یا habits
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get_data_version(database_id, kind)
+    
     # ============================================
     # Statistics
     # ============================================
     
+    def get_task_snapshot(self, database_id: str) -> TaskSnapshot:
+        """دریافت یک‌باره همه Task ها (شامل Done) برای استفاده در کل درخواست"""
+        return TaskSnapshot(self.fetch_tasks(database_id, include_done=True))
+    
     def get_task_stats(self, database_id: str) -> dict:
-        """دریافت آمار Task ها"""
+        """دریافت آمار Task ها (با کش فعال: شمارنده‌های آماده SQLite)"""
         try:
-            all_tasks = self.fetch_tasks(database_id, include_done=True)
-            today = datetime.now().date().isoformat()
-            
-            stats = {
-                "total": len(all_tasks),
-                "done": 0,
-                "pending": 0,
-                "urgent": 0,
-                "done_today": 0,
-                "by_quadrant": {1: 0, 2: 0, 3: 0, 4: 0},
-                "by_energy": {"high": 0, "medium": 0, "low": 0},
-                "by_context": {},
-                "quick_wins_pending": 0
-            }
+            if self.cache is not None:
+                stats = self.cache.get_task_stats(database_id)
+                if stats is not None:
+                    return stats
             
-            for task in all_tasks:
-                if "Done" in task["status"] or "✅" in task["status"]:
-                    stats["done"] += 1
-                    if task.get("last_edited_time", "").startswith(today):
-                        stats["done_today"] += 1
-                else:
-                    stats["pending"] += 1
-                
-                if "Urgent" in task.get("urgency", "") or "🚨" in task.get("urgency", ""):
-                    stats["urgent"] += 1
-                
-                q = task.get("quadrant", 4)
-                stats["by_quadrant"][q] += 1
-                
-                energy = task.get("energy", "")
-                if "High" in energy or "🔥" in energy:
-                    stats["by_energy"]["high"] += 1
-                elif "Medium" in energy or "⚡" in energy:
-                    stats["by_energy"]["medium"] += 1
-                elif "Low" in energy or "🪶" in energy:
-                    stats["by_energy"]["low"] += 1
-                
-                for ctx in task.get("context", []):
-                    stats["by_context"][ctx] = stats["by_context"].get(ctx, 0) + 1
-                
-                if task.get("quick_win") and "Done" not in task.get("status", ""):
-                    stats["quick_wins_pending"] += 1
-            
-            return stats
+            return self.get_task_snapshot(database_id).stats
             
         except Exception as e:
             logger.error(f"خطا در دریافت آمار: {e}")
@@ -1066,9 +1281,10 @@ class NotionAPI:
             }
             
             for habit in all_habits:
-                if "Active" in habit.get("status", "") or "🎯" in habit.get("status", ""):
+                status = HABIT_STATUS.kind(habit.get("status", ""))
+                if status is HabitStatus.ACTIVE:
                     stats["active"] += 1
-                elif "Achieved" in habit.get("status", "") or "✅" in habit.get("status", ""):
+                elif status is HabitStatus.ACHIEVED:
                     stats["achieved"] += 1
                 
                 if habit.get("is_good"):
@@ -1088,16 +1304,30 @@ class NotionAPI:
             logger.error(f"خطا در دریافت آمار Habits: {e}")
             return {}
     
-    def import_tasks_from_json(self, database_id: str, tasks_json: List[Dict]) -> dict:
-        """Import کردن Task ها از JSON"""
+    def import_tasks_from_json(self, database_id: str, tasks_json: List[Dict],
+                               concurrency: int = None) -> dict:
+        """
+        Import کردن Task ها از JSON
+        
+        چند درخواست pages.create همزمان اجرا میشن؛ ThrottledClient نرخ کل رو زیر
+        محدودیت Notion نگه میداره و خطاهای 429/5xx رو با backoff تکرار میکنه
+        """
         result = {"success": 0, "failed": 0, "errors": []}
         
-        for task in tasks_json:
-            created = self.create_task(database_id, task)
-            if created:
-                result["success"] += 1
-            else:
-                result["failed"] += 1
-                result["errors"].append(f"خطا در ایجاد: {task.get('title', 'بدون عنوان')}")
+        def create(task: Dict) -> Dict:
+            return self._create_task_page(database_id, task)
+        
+        workers = max(1, min(concurrency or self.import_concurrency, len(tasks_json)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='notion-import') as executor:
+            futures = [executor.submit(create, task) for task in tasks_json]
+            
+            for task, future in zip(tasks_json, futures):
+                try:
+                    future.result()
+                    result["success"] += 1
+                except Exception as e:
+                    logger.error(f"خطا در ایجاد Task: {e}")
+                    result["failed"] += 1
+                    result["errors"].append(f"خطا در ایجاد: {task.get('title', 'بدون عنوان')}")
         
         return result
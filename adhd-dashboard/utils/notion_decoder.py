@@ -0,0 +1,162 @@
+"""
+ماژول Decoder صفحات Notion
+به جای زنجیره‌های دستی if "X" in props and props["X"].get(...)، برای هر
+Database یک‌بار از روی schema (همون ساختاری که sync_structure میسازه) یک
+لیست (Property، کلید خروجی، Extractor، پیش‌فرض) ساخته میشه و هر Page با یک
+حلقه ساده روی همین لیست Decode میشه:
+- هزینه هر Page فقط به تعداد Property های schema بستگی داره
+- title / rich_text همه Fragment ها رو به هم می‌چسبونه (نه فقط اولی)
+- برای هر پنج Database (Tasks، Projects، Resources، Daily Logs، Habits)
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def _text(prop_type: str) -> Callable[[Dict], str]:
+    """title / rich_text: متن همه Fragment ها"""
+    def extract(value: Dict) -> str:
+        parts = value.get(prop_type)
+        if not parts:
+            return ""
+        if len(parts) == 1:
+            return parts[0].get("plain_text", "")
+        return "".join([part.get("plain_text", "") for part in parts])
+    return extract
+
+
+def _select(value: Dict):
+    option = value.get("select")
+    return option.get("name", "") if option else None
+
+
+def _multi_select(value: Dict):
+    return [option["name"] for option in value.get("multi_select") or ()]
+
+
+def _date(value: Dict):
+    date = value.get("date")
+    return date.get("start") if date else None
+
+
+# نوع Property -> (Extractor، پیش‌فرض). Extractor با None یعنی «مقدار نداره»
+# (پیش‌فرض‌ها بین Page ها مشترکن، پس باید Immutable باشن)
+EXTRACTORS: Dict[str, Tuple[Callable[[Dict], Any], Any]] = {
+    "title": (_text("title"), ""),
+    "rich_text": (_text("rich_text"), ""),
+    "select": (_select, ""),
+    "multi_select": (_multi_select, ()),
+    "date": (_date, None),
+    "number": (lambda value: value.get("number"), None),
+    "checkbox": (lambda value: bool(value.get("checkbox")), False),
+    "url": (lambda value: value.get("url") or "", ""),
+}
+
+# نام Property -> کلید خروجی (هم‌خوان با TaskRecord / HabitRecord)؛
+# Property های بقیه Database ها به snake_case تبدیل میشن
+FIELD_KEYS = {
+    "tasks": {
+        "Name": "title",
+        "Status": "status",
+        "Context": "context",
+        "Energy Level": "energy",
+        "Importance": "importance",
+        "Urgency": "urgency",
+        "Estimated Time": "time",
+        "Due Date": "due_date",
+        "Quick Win": "quick_win",
+        "Notes": "notes",
+    },
+    "habits": {
+        "Habit Name": "name",
+        "Type": "type",
+        "Category": "category",
+        "Status": "status",
+        "Frequency": "frequency",
+        "Start Date": "start_date",
+        "Counter": "counter",
+        "Last Mentioned": "last_mentioned",
+        "Streak": "streak",
+        "Best Streak": "best_streak",
+        "Related Trigger": "trigger",
+        "Replacement": "replacement",
+        "Why Important": "why",
+    },
+}
+
+# پیش‌فرض‌های خاص (به جای پیش‌فرض نوع Property)
+FIELD_DEFAULTS = {
+    "habits": {"counter": 0, "streak": 0, "best_streak": 0},
+}
+
+
+def field_key(prop_name: str) -> str:
+    """نام Property -> کلید snake_case (مثلاً "Vision/Why" -> vision_why)"""
+    return re.sub(r'[^0-9a-z]+', '_', prop_name.lower()).strip('_')
+
+
+class PageDecoder:
+    """Decoder کامپایل‌شده یک Database"""
+
+    def __init__(self, fields: List[Tuple[str, str, Callable[[Dict], Any], Any]]):
+        """
+        Args:
+            fields: (نام Property، کلید خروجی، Extractor، پیش‌فرض)
+        """
+        self.fields = fields
+        self._extractors = tuple((name, key, extract) for name, key, extract, _ in fields)
+        self._defaults = {key: default for _, key, _, default in fields}
+
+    @classmethod
+    def compile(cls, properties: List[Dict], keys: Dict[str, str] = None,
+                defaults: Dict[str, Any] = None) -> 'PageDecoder':
+        """
+        ساخت از Property های schema
+
+        Args:
+            properties: [{"name", "type"}, ...] (مثل _get_default_databases)
+            keys: نام Property -> کلید خروجی؛ اگه باشه فقط همین Property ها Decode میشن
+            defaults: کلید خروجی -> پیش‌فرض
+        """
+        defaults = defaults or {}
+        fields = []
+        for prop in properties:
+            name, prop_type = prop["name"], prop.get("type")
+            if prop_type not in EXTRACTORS:
+                continue  # relation / rollup / formula
+            if keys is not None and name not in keys:
+                continue
+
+            key = keys[name] if keys is not None else field_key(name)
+            extract, default = EXTRACTORS[prop_type]
+            fields.append((name, key, extract, defaults.get(key, default)))
+        return cls(fields)
+
+    def decode(self, page: Dict) -> Dict:
+        """مقادیر Property های یک Page (بدون id / url / زمان‌ها)"""
+        props = page.get("properties") or {}
+        result = self._defaults.copy()
+        for name, key, extract in self._extractors:
+            value = props.get(name)
+            if value is not None:
+                value = extract(value)
+                if value is not None:
+                    result[key] = value
+        return result
+
+
+def compile_decoders(databases: List[Dict], db_key: Callable[[str], str]) -> Dict[str, PageDecoder]:
+    """
+    Decoder همه Database ها
+
+    Args:
+        databases: خروجی _get_default_databases یا parse_structure_md
+        db_key: نام Database -> key (NotionAPI._db_name_to_key)
+    """
+    decoders = {}
+    for db in databases:
+        key = db_key(db["name"])
+        decoders[key] = PageDecoder.compile(
+            db["properties"], FIELD_KEYS.get(key), FIELD_DEFAULTS.get(key)
+        )
+    return decoders
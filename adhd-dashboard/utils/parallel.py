@@ -0,0 +1,61 @@
+"""
+ماژول اجرای همزمان درخواست‌ها
+هر صفحه چند درخواست مستقل به Notion و Google Sheets داره؛
+ParallelLoader اون‌ها رو همزمان اجرا میکنه تا زمان صفحه برابر کندترین
+درخواست باشه، نه مجموع همه
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Thread Pool مشترک بین همه درخواست‌ها (تعداد اتصال همزمان به API ها محدود میمونه)
+MAX_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='loader')
+
+
+class ParallelLoader:
+    """
+    اجرای همزمان چند loader در محدوده یک درخواست
+
+    مثال:
+        loader = ParallelLoader()
+        loader.add('tasks', notion_api.fetch_tasks, db_id)
+        loader.add('stats', notion_api.get_task_stats, db_id)
+        results = loader.run()
+    """
+
+    def __init__(self):
+        self._loaders = {}
+
+    def add(self, name: str, func: Callable, *args, default: Any = None, **kwargs):
+        """
+        اضافه کردن یک loader
+
+        Args:
+            name: کلید نتیجه در خروجی run
+            func: تابع دریافت داده
+            default: مقدار جایگزین در صورت خطا
+        """
+        self._loaders[name] = (func, args, kwargs, default)
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        """اجرای همه loader ها و برگرداندن نتایج با همون کلیدها"""
+        futures = {
+            name: _executor.submit(func, *args, **kwargs)
+            for name, (func, args, kwargs, _) in self._loaders.items()
+        }
+
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.error(f"خطا در بارگذاری {name}: {e}")
+                results[name] = self._loaders[name][3]
+
+        return results
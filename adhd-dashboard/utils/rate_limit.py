@@ -0,0 +1,342 @@
+"""
+ماژول کنترل نرخ درخواست‌ها
+- TokenBucket: حداکثر rate درخواست در ثانیه (Notion حدود 3 درخواست در ثانیه)
+- SharedTokenBucket: همون محدودیت، مشترک بین همه Worker ها (با قفل SQLite)
+- retry_call: تکرار درخواست در خطاهای موقت (429 / 5xx / Timeout) با backoff نمایی
+- ThrottledClient: پوشش Notion Client که همه درخواست‌ها رو از محدودکننده و retry عبور میده
+"""
+
+import logging
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from notion_client.api_endpoints import Endpoint
+from notion_client.errors import RequestTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# کدهای HTTP که ارزش تکرار دارن
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# متدهای Endpoint که تکرارشون ممکنه رکورد تکراری بسازه (pages.create،
+# blocks.children.append، ...)؛ فقط بعد از 429 تکرار میشن، چون اون درخواست
+# قطعاً پردازش نشده. Timeout یا 5xx ممکنه بعد از ثبت در Notion رخ داده باشه
+NON_IDEMPOTENT_METHODS = {'create', 'append'}
+
+
+class TokenBucket:
+    """محدودکننده نرخ، امن برای چند Thread"""
+
+    def __init__(self, rate: float = 3, capacity: float = None):
+        """
+        Args:
+            rate: تعداد توکن در ثانیه
+            capacity: حداکثر توکن ذخیره (burst) - پیش‌فرض برابر rate
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        گرفتن یک توکن (در صورت نیاز صبر میکنه)
+
+        Returns:
+            مدت انتظار به ثانیه
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._blocked_until > now:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds: float):
+        """توقف همه درخواست‌ها برای seconds ثانیه (بعد از 429)"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def blocked_for(self) -> float:
+        """چند ثانیه دیگه درخواست‌ها متوقف هستن"""
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+
+class SharedTokenBucket:
+    """
+    محدودکننده نرخ مشترک بین چند Process (مثلاً Worker های gunicorn)
+
+    وضعیت bucket در یک فایل SQLite نگه داشته میشه و هر acquire داخل یک
+    تراکنش BEGIN IMMEDIATE انجام میشه، پس همه Worker ها از یک سهمیه
+    مصرف میکنن و Retry-After یک Worker بقیه رو هم متوقف میکنه
+    """
+
+    def __init__(self, db_path: str, rate: float = 3, capacity: float = None,
+                 name: str = 'notion'):
+        """
+        Args:
+            db_path: مسیر فایل SQLite وضعیت
+            rate: تعداد توکن در ثانیه
+            capacity: حداکثر توکن ذخیره (burst) - پیش‌فرض برابر rate
+            name: نام bucket (چند bucket میتونن در یک فایل باشن)
+        """
+        self.db_path = Path(db_path)
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.name = name
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute(
+                "INSERT OR IGNORE INTO rate_limits (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (self.name, self.capacity, time.time())
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """اتصال جدید (autocommit، تراکنش‌ها دستی)"""
+        return sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+
+    def acquire(self) -> float:
+        """
+        گرفتن یک توکن (در صورت نیاز صبر میکنه)
+
+        Returns:
+            مدت انتظار به ثانیه
+        """
+        waited = 0.0
+        while True:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                tokens, updated_at, blocked_until = conn.execute(
+                    "SELECT tokens, updated_at, blocked_until FROM rate_limits WHERE name = ?",
+                    (self.name,)
+                ).fetchone()
+
+                now = time.time()
+                tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * self.rate)
+
+                if blocked_until > now:
+                    delay = blocked_until - now
+                elif tokens >= 1:
+                    tokens -= 1
+                    delay = 0.0
+                else:
+                    delay = (1 - tokens) / self.rate
+
+                conn.execute(
+                    "UPDATE rate_limits SET tokens = ?, updated_at = ? WHERE name = ?",
+                    (tokens, now, self.name)
+                )
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+            if delay == 0.0:
+                return waited
+
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds: float):
+        """توقف همه درخواست‌ها (در همه Worker ها) برای seconds ثانیه"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE rate_limits SET blocked_until = MAX(blocked_until, ?) WHERE name = ?",
+                (time.time() + seconds, self.name)
+            )
+        finally:
+            conn.close()
+
+    def blocked_for(self) -> float:
+        """چند ثانیه دیگه درخواست‌ها متوقف هستن"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT blocked_until FROM rate_limits WHERE name = ?", (self.name,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return max(0.0, row[0] - time.time()) if row else 0.0
+
+
+def is_retryable(error: Exception, idempotent: bool = True) -> bool:
+    """
+    آیا خطا موقت است و درخواست باید تکرار بشه
+
+    Args:
+        idempotent: اگه False باشه فقط 429 تکرار میشه
+    """
+    if not idempotent:
+        return getattr(error, 'status', None) == 429
+    if isinstance(error, RequestTimeoutError):
+        return True
+    return getattr(error, 'status', None) in RETRYABLE_STATUSES
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """مقدار هدر Retry-After پاسخ (به ثانیه) - اگه وجود داشته باشه"""
+    headers = getattr(error, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_call(func: Callable[[], Any], retries: int = 3, backoff: float = 1.0,
+               on_retry: Callable[[Exception, float], None] = None,
+               idempotent: bool = True) -> Any:
+    """
+    اجرای func با تکرار در خطاهای موقت
+
+    فاصله تکرارها: backoff، 2×backoff، 4×backoff ... (با کمی jitter)؛ اگه
+    سرور Retry-After فرستاده باشه حداقل همون‌قدر صبر میشه.
+    خطاهای غیرموقت و خطای آخرین تلاش بالا فرستاده میشن
+
+    Args:
+        on_retry: قبل از هر انتظار با (خطا، مدت انتظار) صدا زده میشه
+        idempotent: False برای درخواست‌هایی که تکرارشون رکورد تکراری میسازه
+    """
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e, idempotent):
+                raise
+
+            delay = backoff * (2 ** attempt) * random.uniform(1, 1.25)
+            delay = max(delay, retry_after(e) or 0.0)
+            if on_retry:
+                on_retry(e, delay)
+            logger.warning(f"خطای موقت ({e})، تلاش دوباره در {delay:.1f} ثانیه")
+            time.sleep(delay)
+
+
+class ThrottledClient:
+    """
+    پوشش Notion Client
+
+    هر متد Endpoint (databases.query، pages.create، blocks.children.list و ...)
+    قبل از اجرا یک توکن از limiter میگیره و در خطاهای موقت تکرار میشه
+    (متدهای NON_IDEMPOTENT_METHODS فقط بعد از 429).
+    بعد از 429، limiter برای مدت Retry-After متوقف میشه
+    """
+
+    def __init__(self, client, limiter, retries: int = 3, backoff: float = 1.0):
+        """
+        Args:
+            client: notion_client.Client
+            limiter: TokenBucket یا SharedTokenBucket
+            retries: حداکثر تعداد تکرار
+            backoff: فاصله اولین تکرار به ثانیه
+        """
+        self._client = client
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff = backoff
+
+        self._stats = {
+            "calls": 0,             # تعداد درخواست‌های ارسال‌شده
+            "throttled": 0,         # درخواست‌هایی که منتظر توکن موندن
+            "throttle_wait": 0.0,   # مجموع انتظار برای توکن (ثانیه)
+            "rate_limited": 0,      # پاسخ‌های 429
+            "retries": 0,           # تعداد تکرارها
+            "failures": 0           # درخواست‌هایی که نهایتاً خطا دادن
+        }
+        self._stats_lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if isinstance(attr, Endpoint):
+            return _ThrottledEndpoint(self, attr)
+        if callable(attr):
+            return self.wrap(attr)
+        return attr
+
+    def wrap(self, func: Callable, idempotent: bool = True) -> Callable:
+        """پوشش یک متد API با محدودکننده و retry"""
+        def call(*args, **kwargs):
+            def attempt():
+                waited = self.limiter.acquire()
+                self._count(calls=1, throttled=1 if waited else 0, throttle_wait=waited)
+                return func(*args, **kwargs)
+
+            try:
+                return retry_call(
+                    attempt, self.retries, self.backoff,
+                    on_retry=self._on_retry, idempotent=idempotent
+                )
+            except Exception:
+                self._count(failures=1)
+                raise
+
+        return call
+
+    def _on_retry(self, error: Exception, delay: float):
+        """ثبت تکرار؛ بعد از 429 همه درخواست‌ها متوقف میشن"""
+        if getattr(error, 'status', None) == 429:
+            self.limiter.penalize(delay)
+            self._count(retries=1, rate_limited=1)
+        else:
+            self._count(retries=1)
+
+    def _count(self, **deltas):
+        """افزایش شمارنده‌ها"""
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    def get_status(self) -> Dict:
+        """شمارنده‌ها و وضعیت limiter (برای /api/notion/status)"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["throttle_wait"] = round(stats["throttle_wait"], 2)
+        stats["rate"] = self.limiter.rate
+        stats["shared"] = isinstance(self.limiter, SharedTokenBucket)
+        stats["blocked_for"] = round(self.limiter.blocked_for(), 2)
+        return stats
+
+
+class _ThrottledEndpoint:
+    """پوشش یک Endpoint (و Endpoint های تو در تو مثل blocks.children)"""
+
+    def __init__(self, owner: ThrottledClient, endpoint):
+        self._owner = owner
+        self._endpoint = endpoint
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._endpoint, name)
+        if isinstance(attr, Endpoint):
+            return _ThrottledEndpoint(self._owner, attr)
+        if callable(attr):
+            return self._owner.wrap(attr, idempotent=name not in NON_IDEMPOTENT_METHODS)
+        return attr
@@ -0,0 +1,198 @@
+"""
+ماژول رکوردهای فشرده Task و Habit
+به جای یک Dictionary با 15 کلید برای هر Page، هر Task یک شیء __slots__ است:
+- فیلدهای Select (Status، Energy، Urgency، ...) یک‌بار Intern میشن و فقط
+  کد عددی کوچکشون نگه داشته میشه (Context: tuple کدها)
+- دسته هر برچسب از utils/classification خونده میشه (status_kind،
+  energy_level، ...)، پس "Done" in status یک Lookup روی کد است
+
+رکوردها Mapping فقط‌خواندنی هستن، پس task["status"]، task.get(...)،
+dict(task) و task.status در Template ها مثل قبل کار میکنن؛ برای JSON از
+to_dict() استفاده میشه (RecordJSONProvider در app.py)
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, List
+
+from .classification import (
+    DONE_STATUSES, TaskStatus, Energy, Importance, Urgency, HabitType, HabitStatus,
+    OptionIndex, TASK_STATUS, TASK_CONTEXT, TASK_ENERGY, TASK_IMPORTANCE, TASK_URGENCY,
+    TASK_TIME, HABIT_TYPE, HABIT_CATEGORY, HABIT_STATUS, HABIT_FREQUENCY
+)
+
+# کد Status هایی که دقیقاً Done هستن (کد هر برچسب ثابته)
+CLOSED_CODES = frozenset(TASK_STATUS.code(status) for status in DONE_STATUSES)
+
+
+def _coded(slot: str, table: OptionIndex) -> property:
+    """فیلد Select: کد در slot، برچسب در خروجی"""
+    return property(lambda self: table.vocab[getattr(self, slot)])
+
+
+class Record(Mapping):
+    """پایه رکوردها: Mapping فقط‌خواندنی روی FIELDS"""
+
+    __slots__ = ()
+    FIELDS = ()
+    _field_set = frozenset()
+    DERIVED = ()  # کلیدهای محاسبه‌شده (در from_dict نادیده گرفته میشن)
+
+    def __getitem__(self, key: str):
+        if key not in self._field_set:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # کدها مخصوص همین Process هستن؛ Pickle با برچسب‌ها
+        return type(self).from_dict, (self.to_dict(),)
+
+    def to_dict(self) -> Dict:
+        """Dictionary با همون کلیدهای فرمت قبلی"""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Record':
+        """ساخت از Dictionary (کلیدهای ناشناخته نادیده گرفته میشن)"""
+        return cls(**{k: v for k, v in data.items() if k in cls._field_set and k not in cls.DERIVED})
+
+
+class TaskRecord(Record):
+    """یک Task (همون کلیدهای خروجی قبلی NotionAPI._parse_task)"""
+
+    __slots__ = (
+        'id', 'title', '_status', '_context', '_energy', '_importance', '_urgency',
+        '_time', 'due_date', 'quick_win', 'notes', 'quadrant', 'url',
+        'created_time', 'last_edited_time'
+    )
+    FIELDS = (
+        'id', 'title', 'status', 'context', 'energy', 'importance', 'urgency',
+        'time', 'due_date', 'quick_win', 'notes', 'quadrant', 'url',
+        'created_time', 'last_edited_time'
+    )
+    _field_set = frozenset(FIELDS)
+
+    def __init__(self, id: str, title: str = "", status: str = "", context: Iterable[str] = (),
+                 energy: str = "", importance: str = "", urgency: str = "", time: str = "",
+                 due_date: str = None, quick_win: bool = False, notes: str = "",
+                 quadrant: int = 4, url: str = "", created_time: str = None,
+                 last_edited_time: str = None):
+        self.id = id
+        self.title = title
+        self._status = TASK_STATUS.code(status or "")
+        self._context = tuple(TASK_CONTEXT.code(c) for c in context or ())
+        self._energy = TASK_ENERGY.code(energy or "")
+        self._importance = TASK_IMPORTANCE.code(importance or "")
+        self._urgency = TASK_URGENCY.code(urgency or "")
+        self._time = TASK_TIME.code(time or "")
+        self.due_date = due_date
+        self.quick_win = quick_win
+        self.notes = notes
+        self.quadrant = quadrant
+        self.url = url
+        self.created_time = created_time
+        self.last_edited_time = last_edited_time
+
+    status = _coded('_status', TASK_STATUS)
+    energy = _coded('_energy', TASK_ENERGY)
+    importance = _coded('_importance', TASK_IMPORTANCE)
+    urgency = _coded('_urgency', TASK_URGENCY)
+    time = _coded('_time', TASK_TIME)
+
+    @property
+    def context(self) -> List[str]:
+        return [TASK_CONTEXT.vocab[code] for code in self._context]
+
+    @property
+    def context_codes(self) -> tuple:
+        return self._context
+
+    @property
+    def status_kind(self) -> TaskStatus:
+        return TASK_STATUS.kinds[self._status]
+
+    @property
+    def energy_level(self) -> Energy:
+        return TASK_ENERGY.kinds[self._energy]
+
+    @property
+    def importance_level(self) -> Importance:
+        return TASK_IMPORTANCE.kinds[self._importance]
+
+    @property
+    def urgency_level(self) -> Urgency:
+        return TASK_URGENCY.kinds[self._urgency]
+
+    @property
+    def is_closed(self) -> bool:
+        """Status دقیقاً Done است (فیلتر fetch_tasks)"""
+        return self._status in CLOSED_CODES
+
+    @property
+    def is_done(self) -> bool:
+        """Status شامل Done یا ✅ است"""
+        return TASK_STATUS.kinds[self._status] is TaskStatus.DONE
+
+    @property
+    def is_urgent(self) -> bool:
+        return TASK_URGENCY.kinds[self._urgency] is Urgency.URGENT
+
+
+class HabitRecord(Record):
+    """یک Habit (همون کلیدهای خروجی قبلی NotionAPI._parse_habit)"""
+
+    __slots__ = (
+        'id', 'name', '_type', '_category', '_status', '_frequency', 'start_date',
+        'counter', 'last_mentioned', 'streak', 'best_streak', 'trigger',
+        'replacement', 'why', 'url', 'last_edited_time'
+    )
+    FIELDS = (
+        'id', 'name', 'type', 'category', 'status', 'frequency', 'start_date',
+        'counter', 'last_mentioned', 'streak', 'best_streak', 'trigger',
+        'replacement', 'why', 'is_good', 'url', 'last_edited_time'
+    )
+    _field_set = frozenset(FIELDS)
+    DERIVED = ('is_good',)
+
+    def __init__(self, id: str, name: str = "", type: str = "", category: str = "",
+                 status: str = "", frequency: str = "", start_date: str = None,
+                 counter: int = 0, last_mentioned: str = None, streak: int = 0,
+                 best_streak: int = 0, trigger: str = "", replacement: str = "",
+                 why: str = "", url: str = "", last_edited_time: str = None):
+        self.id = id
+        self.name = name
+        self._type = HABIT_TYPE.code(type or "")
+        self._category = HABIT_CATEGORY.code(category or "")
+        self._status = HABIT_STATUS.code(status or "")
+        self._frequency = HABIT_FREQUENCY.code(frequency or "")
+        self.start_date = start_date
+        self.counter = counter
+        self.last_mentioned = last_mentioned
+        self.streak = streak
+        self.best_streak = best_streak
+        self.trigger = trigger
+        self.replacement = replacement
+        self.why = why
+        self.url = url
+        self.last_edited_time = last_edited_time
+
+    type = _coded('_type', HABIT_TYPE)
+    category = _coded('_category', HABIT_CATEGORY)
+    status = _coded('_status', HABIT_STATUS)
+    frequency = _coded('_frequency', HABIT_FREQUENCY)
+
+    @property
+    def status_kind(self) -> HabitStatus:
+        return HABIT_STATUS.kinds[self._status]
+
+    @property
+    def is_good(self) -> bool:
+        return HABIT_TYPE.kinds[self._type] is HabitType.GOOD
@@ -5,15 +5,21 @@
 - جدید: Techniques Used, Bad Habits, Good Habits, Desires, Daily Report
 """
 
+import json
+import hashlib
 import logging
+import threading
 from typing import Optional, List, Dict
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from collections import Counter
 
 import gspread
 from google.oauth2.service_account import Credentials
 
+from .ttl_cache import TTLCache
+from .log_analytics import DailyLogAnalytics, DailyLogMetrics
+from .log_store import DailyLogColumns
+
 logger = logging.getLogger(__name__)
 
 # محدوده دسترسی‌های مورد نیاز
@@ -22,6 +28,9 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive.readonly'
 ]
 
+# حداکثر ردیف در هر درخواست append_rows
+BULK_CHUNK_SIZE = 500
+
 # ستون‌های Sheet (نسخه 2.0)
 COLUMNS = {
     'DATE': 0,                  # A
@@ -42,10 +51,33 @@ COLUMNS = {
 class SheetsAPI:
     """کلاس مدیریت ارتباط با Google Sheets"""
     
-    def __init__(self, credentials_path: str):
-        """سازنده کلاس"""
+    def __init__(self, credentials_path: str, cache_ttl: int = 60, cache_size: int = 16,
+                 local_store=None):
+        """
+        سازنده کلاس
+        
+        Args:
+            credentials_path: مسیر فایل credentials.json
+            cache_ttl: عمر کش ردیف‌های Daily Log به ثانیه
+            cache_size: حداکثر تعداد Sheet در کش
+            local_store: DatabaseService ای که Sync Worker جدول daily_logs اون رو
+                پر میکنه؛ با تنظیمش خواندن‌ها از SQLite انجام میشن
+        """
         self.credentials_path = Path(credentials_path)
         self.client = None
+        self.local_store = local_store
+        
+        # کش ردیف‌های پارس‌شده - کلید: (sheet_id, sheet_name, revision)
+        # revision با هر نوشتن از همین برنامه زیاد میشه تا لاگ جدید فوراً دیده بشه
+        self._logs_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._analytics_cache = TTLCache(maxsize=cache_size * 4, ttl=cache_ttl)
+        self._revisions = {}
+        
+        # Pool هندل‌ها (هر open_by_key/worksheet یک درخواست metadata به API است)
+        self._spreadsheets = {}   # sheet_id -> Spreadsheet
+        self._worksheets = {}     # (sheet_id, sheet_name) -> Worksheet
+        self._handles_lock = threading.Lock()
+        
         self._connect()
     
     def _connect(self) -> bool:
@@ -72,15 +104,55 @@ class SheetsAPI:
         return self.client is not None
     
     def get_sheet(self, sheet_id: str, sheet_name: str = "Sheet1"):
-        """دریافت یک Sheet خاص"""
+        """
+        دریافت یک Sheet خاص
+        
+        هندل‌ها در Pool نگه داشته میشن؛ اگه Worksheet پیدا نشه (مثلاً بعد از
+        تغییر نام) Spreadsheet یک‌بار دوباره باز میشه
+        """
+        key = (sheet_id, sheet_name)
+        with self._handles_lock:
+            worksheet = self._worksheets.get(key)
+        if worksheet is not None:
+            return worksheet
+        
         try:
-            spreadsheet = self.client.open_by_key(sheet_id)
-            worksheet = spreadsheet.worksheet(sheet_name)
+            try:
+                worksheet = self._open_spreadsheet(sheet_id).worksheet(sheet_name)
+            except gspread.exceptions.WorksheetNotFound:
+                # metadata کش‌شده Spreadsheet ممکنه قدیمی باشه
+                self._invalidate_spreadsheet(sheet_id)
+                worksheet = self._open_spreadsheet(sheet_id).worksheet(sheet_name)
+            
+            with self._handles_lock:
+                self._worksheets[key] = worksheet
             return worksheet
         except Exception as e:
             logger.error(f"خطا در دریافت Sheet: {e}")
             return None
     
+    def _open_spreadsheet(self, sheet_id: str):
+        """Spreadsheet از Pool (یا open_by_key)"""
+        with self._handles_lock:
+            spreadsheet = self._spreadsheets.get(sheet_id)
+        if spreadsheet is None:
+            spreadsheet = self.client.open_by_key(sheet_id)
+            with self._handles_lock:
+                self._spreadsheets[sheet_id] = spreadsheet
+        return spreadsheet
+    
+    def _invalidate_spreadsheet(self, sheet_id: str):
+        """حذف Spreadsheet و همه Worksheet هاش از Pool"""
+        with self._handles_lock:
+            self._spreadsheets.pop(sheet_id, None)
+            for key in [k for k in self._worksheets if k[0] == sheet_id]:
+                del self._worksheets[key]
+    
+    def _invalidate_sheet(self, sheet_id: str, sheet_name: str):
+        """حذف هندل یک Worksheet بعد از خطا (دفعه بعد دوباره باز میشه)"""
+        with self._handles_lock:
+            self._worksheets.pop((sheet_id, sheet_name), None)
+    
     # ============================================
     # Read Operations
     # ============================================
@@ -89,54 +161,14 @@ class SheetsAPI:
                         days: int = 30) -> List[Dict]:
         """
         خواندن Daily Log ها با 12 ستون
+        
+        کل Sheet یک‌بار خونده و به شکل ستونی کش میشه؛ بازه days با جستجوی
+        دودویی روی تاریخ‌ها پیدا میشه
         """
         try:
-            worksheet = self.get_sheet(sheet_id, sheet_name)
-            if not worksheet:
-                return []
+            columns = self._load_daily_logs(sheet_id, sheet_name)
             
-            all_values = worksheet.get_all_values()
-            
-            # Skip header row
-            if len(all_values) > 0 and all_values[0][0].lower() == 'date':
-                all_values = all_values[1:]
-            
-            logs = []
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            for row in all_values:
-                try:
-                    if len(row) < 1 or not row[0]:
-                        continue
-                    
-                    date_str = row[0]
-                    date_obj = self._parse_date(date_str)
-                    
-                    if not date_obj or date_obj < cutoff_date:
-                        continue
-                    
-                    log = {
-                        "date": date_obj.strftime("%Y-%m-%d"),
-                        "mood": self._safe_int(row[COLUMNS['MOOD']] if len(row) > COLUMNS['MOOD'] else 5),
-                        "energy": self._safe_int(row[COLUMNS['ENERGY']] if len(row) > COLUMNS['ENERGY'] else 5),
-                        "top_win": row[COLUMNS['TOP_WIN']] if len(row) > COLUMNS['TOP_WIN'] else "",
-                        "main_obstacle": row[COLUMNS['MAIN_OBSTACLE']] if len(row) > COLUMNS['MAIN_OBSTACLE'] else "",
-                        "techniques_suggested": row[COLUMNS['TECHNIQUES_SUGGESTED']] if len(row) > COLUMNS['TECHNIQUES_SUGGESTED'] else "",
-                        "reflection": row[COLUMNS['REFLECTION']] if len(row) > COLUMNS['REFLECTION'] else "",
-                        # ستون‌های جدید
-                        "techniques_used": row[COLUMNS['TECHNIQUES_USED']] if len(row) > COLUMNS['TECHNIQUES_USED'] else "",
-                        "bad_habits": row[COLUMNS['BAD_HABITS']] if len(row) > COLUMNS['BAD_HABITS'] else "",
-                        "good_habits": row[COLUMNS['GOOD_HABITS']] if len(row) > COLUMNS['GOOD_HABITS'] else "",
-                        "desires": row[COLUMNS['DESIRES']] if len(row) > COLUMNS['DESIRES'] else "",
-                        "daily_report": row[COLUMNS['DAILY_REPORT']] if len(row) > COLUMNS['DAILY_REPORT'] else ""
-                    }
-                    logs.append(log)
-                    
-                except Exception as e:
-                    logger.warning(f"خطا در پردازش ردیف: {e}")
-                    continue
-            
-            logs.sort(key=lambda x: x["date"])
+            logs = columns.to_logs(columns.window_start(days))
             logger.info(f"خواندن {len(logs)} لاگ روزانه")
             return logs
             
@@ -144,6 +176,143 @@ class SheetsAPI:
             logger.error(f"خطا در خواندن Daily Logs: {e}")
             return []
     
+    def _load_daily_logs(self, sheet_id: str, sheet_name: str) -> DailyLogColumns:
+        """ستون‌های پارس‌شده کل Sheet (از کش، یا یک‌بار خواندن از API/SQLite)"""
+        revision = self._cache_revision(sheet_id, sheet_name)
+        if self.local_store is not None:
+            loader = lambda: self._read_local_logs(revision[1])
+        else:
+            loader = lambda: self._fetch_daily_logs(sheet_id, sheet_name)
+        return self._logs_cache.get_or_load((sheet_id, sheet_name, revision), loader)
+    
+    def _cache_revision(self, sheet_id: str, sheet_name: str):
+        """
+        نسخه کلید کش‌ها: تعداد نوشتن‌های همین Process، و با local_store نسخه
+        جدول daily_logs (تا Sync های Worker بدون صبر برای TTL دیده بشن)
+        """
+        revision = self._revisions.get((sheet_id, sheet_name), 0)
+        if self.local_store is not None:
+            return (revision, self.local_store.get_data_revision('daily_logs'))
+        return revision
+    
+    def _read_local_logs(self, db_revision: Optional[str]) -> DailyLogColumns:
+        """
+        ساخت ستون‌ها از ردیف‌های daily_logs در SQLite (به جای خواندن Sheet)
+        
+        Raises:
+            RuntimeError اگه جدول خونده نشه تا نتیجه خالی کش نشه
+        """
+        logs = self.local_store.get_sheet_logs()
+        if logs is None:
+            raise RuntimeError("daily_logs در SQLite خونده نشد")
+        
+        columns = DailyLogColumns.from_logs(logs)
+        # نسخه قبل از خواندن ردیف‌ها گرفته شده، پس هیچ‌وقت از محتوا جلوتر نیست
+        columns.fingerprint = db_revision or ''
+        return columns
+    
+    def refresh_daily_logs(self, sheet_id: str, sheet_name: str = "Sheet1") -> DailyLogColumns:
+        """
+        خواندن دوباره کل Sheet و جایگزینی در کش (برای SyncWorker)
+        
+        Raises:
+            خطای API بالا فرستاده میشه
+        """
+        revision = self._revisions.get((sheet_id, sheet_name), 0)
+        columns = self._fetch_daily_logs(sheet_id, sheet_name)
+        
+        # با local_store کش از SQLite پر میشه (Worker همین ستون‌ها رو اونجا مینویسه)
+        if self.local_store is None:
+            self._logs_cache.set((sheet_id, sheet_name, revision), columns)
+        self._analytics_cache.invalidate(lambda key: key[:2] == (sheet_id, sheet_name))
+        return columns
+    
+    def _fetch_daily_logs(self, sheet_id: str, sheet_name: str) -> DailyLogColumns:
+        """
+        خواندن و پارس همه ردیف‌ها از Google Sheets
+        
+        Returns:
+            DailyLogColumns مرتب شده بر اساس تاریخ
+        
+        Raises:
+            خطای API بالا فرستاده میشه تا نتیجه خالی کش نشه
+        """
+        worksheet = self.get_sheet(sheet_id, sheet_name)
+        if not worksheet:
+            raise RuntimeError(f"Sheet در دسترس نیست: {sheet_name}")
+        
+        try:
+            all_values = worksheet.get_all_values()
+        except Exception:
+            self._invalidate_sheet(sheet_id, sheet_name)
+            raise
+        
+        # Skip header row
+        if len(all_values) > 0 and all_values[0][0].lower() == 'date':
+            all_values = all_values[1:]
+        
+        logs = []
+        
+        for row in all_values:
+            try:
+                if len(row) < 1 or not row[0]:
+                    continue
+                
+                date_str = row[0]
+                date_obj = self._parse_date(date_str)
+                
+                if not date_obj:
+                    continue
+                
+                log = {
+                    "date": date_obj.strftime("%Y-%m-%d"),
+                    "mood": self._safe_int(row[COLUMNS['MOOD']] if len(row) > COLUMNS['MOOD'] else 5),
+                    "energy": self._safe_int(row[COLUMNS['ENERGY']] if len(row) > COLUMNS['ENERGY'] else 5),
+                    "top_win": row[COLUMNS['TOP_WIN']] if len(row) > COLUMNS['TOP_WIN'] else "",
+                    "main_obstacle": row[COLUMNS['MAIN_OBSTACLE']] if len(row) > COLUMNS['MAIN_OBSTACLE'] else "",
+                    "techniques_suggested": row[COLUMNS['TECHNIQUES_SUGGESTED']] if len(row) > COLUMNS['TECHNIQUES_SUGGESTED'] else "",
+                    "reflection": row[COLUMNS['REFLECTION']] if len(row) > COLUMNS['REFLECTION'] else "",
+                    # ستون‌های جدید
+                    "techniques_used": row[COLUMNS['TECHNIQUES_USED']] if len(row) > COLUMNS['TECHNIQUES_USED'] else "",
+                    "bad_habits": row[COLUMNS['BAD_HABITS']] if len(row) > COLUMNS['BAD_HABITS'] else "",
+                    "good_habits": row[COLUMNS['GOOD_HABITS']] if len(row) > COLUMNS['GOOD_HABITS'] else "",
+                    "desires": row[COLUMNS['DESIRES']] if len(row) > COLUMNS['DESIRES'] else "",
+                    "daily_report": row[COLUMNS['DAILY_REPORT']] if len(row) > COLUMNS['DAILY_REPORT'] else ""
+                }
+                logs.append(log)
+                
+            except Exception as e:
+                logger.warning(f"خطا در پردازش ردیف: {e}")
+                continue
+        
+        columns = DailyLogColumns.from_logs(logs)
+        # اثر انگشت محتوا: در همه Worker هایی که همین داده رو خوندن یکسانه
+        columns.fingerprint = hashlib.sha1(
+            json.dumps(all_values, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        return columns
+    
+    def get_logs_version(self, sheet_id: str, sheet_name: str = "Sheet1") -> Optional[str]:
+        """
+        نسخه Daily Log های کش‌شده برای ETag (None اگه Sheet خونده نشه)
+        
+        از محتوای ردیف‌ها ساخته میشه، پس بین Worker ها مشترکه و فقط با تغییر
+        داده‌ها (نوشتن از همین برنامه، یا خواندن دوباره بعد از TTL) عوض میشه؛
+        با local_store همون نسخه جدول daily_logs است
+        """
+        if self.local_store is not None:
+            return self.local_store.get_data_revision('daily_logs')
+        try:
+            return self._load_daily_logs(sheet_id, sheet_name).fingerprint or None
+        except Exception as e:
+            logger.error(f"خطا در خواندن Daily Logs: {e}")
+            return None
+    
+    def _bump_revision(self, sheet_id: str, sheet_name: str):
+        """بی‌اعتبار کردن کش بعد از نوشتن در Sheet"""
+        key = (sheet_id, sheet_name)
+        self._revisions[key] = self._revisions.get(key, 0) + 1
+    
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """پارس تاریخ با فرمت‌های مختلف"""
         formats = ["%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y"]
@@ -174,24 +343,22 @@ class SheetsAPI:
             if not worksheet:
                 return False
             
-            today = data.get('date', datetime.now().strftime("%Y-%m-%d"))
+            row = self._build_row(data)
+            today = row[COLUMNS['DATE']]
             
-            row = [
-                today,
-                data.get('mood', 5),
-                data.get('energy', 5),
-                data.get('top_win', ''),
-                data.get('main_obstacle', ''),
-                data.get('techniques_suggested', ''),
-                data.get('reflection', ''),
-                data.get('techniques_used', ''),
-                data.get('bad_habits', ''),
-                data.get('good_habits', ''),
-                data.get('desires', ''),
-                data.get('daily_report', '')
-            ]
-            
-            worksheet.append_row(row)
+            try:
+                worksheet.append_row(row)
+            except Exception:
+                self._invalidate_sheet(sheet_id, sheet_name)
+                raise
+            self._bump_revision(sheet_id, sheet_name)
+            if self.local_store is not None:
+                # تا Sync بعدی Worker هم لاگ جدید در آمار دیده بشه
+                self.local_store.upsert_sheet_logs([dict(
+                    data, date=today,
+                    mood=self._safe_int(row[COLUMNS['MOOD']]),
+                    energy=self._safe_int(row[COLUMNS['ENERGY']])
+                )])
             logger.info(f"لاگ روزانه اضافه شد: {today}")
             return True
             
@@ -199,133 +366,103 @@ class SheetsAPI:
             logger.error(f"خطا در اضافه کردن لاگ: {e}")
             return False
     
+    def append_daily_logs(self, sheet_id: str, sheet_name: str, logs: List[Dict]) -> int:
+        """
+        اضافه کردن چند لاگ با یک درخواست append_rows (برای Outbox)
+        
+        Raises:
+            خطای API بالا فرستاده میشه تا قابل تکرار باشه
+        """
+        worksheet = self.get_sheet(sheet_id, sheet_name)
+        if not worksheet:
+            raise RuntimeError(f"Sheet در دسترس نیست: {sheet_name}")
+        
+        try:
+            worksheet.append_rows([self._build_row(log) for log in logs])
+        except Exception:
+            self._invalidate_sheet(sheet_id, sheet_name)
+            raise
+        self._bump_revision(sheet_id, sheet_name)
+        logger.info(f"{len(logs)} لاگ روزانه اضافه شد")
+        return len(logs)
+    
+    def _build_row(self, data: Dict) -> List:
+        """ساخت ردیف 12 ستونی از Dictionary لاگ"""
+        return [
+            data.get('date', datetime.now().strftime("%Y-%m-%d")),
+            data.get('mood', 5),
+            data.get('energy', 5),
+            data.get('top_win', ''),
+            data.get('main_obstacle', ''),
+            data.get('techniques_suggested', ''),
+            data.get('reflection', ''),
+            data.get('techniques_used', ''),
+            data.get('bad_habits', ''),
+            data.get('good_habits', ''),
+            data.get('desires', ''),
+            data.get('daily_report', '')
+        ]
+    
     # ============================================
     # Analytics
     # ============================================
     
+    def analyze(self, sheet_id: str, sheet_name: str = "Sheet1",
+                days: int = 30) -> DailyLogMetrics:
+        """
+        محاسبه همه آمارهای Daily Log روی ستون‌های کش‌شده
+        
+        نتیجه برای هر (sheet, revision, days) کش میشه؛ متدهای زیر فقط
+        بخشی از همین نتیجه رو برمی‌گردونن. خطای خواندن کش نمیشه (آمار خالی
+        فقط برای همین درخواست برمی‌گرده)
+        """
+        revision = self._cache_revision(sheet_id, sheet_name)
+        try:
+            return self._analytics_cache.get_or_load(
+                (sheet_id, sheet_name, revision, days),
+                lambda: DailyLogAnalytics.window(self._load_daily_logs(sheet_id, sheet_name), days).compute()
+            )
+        except Exception as e:
+            logger.error(f"خطا در خواندن Daily Logs: {e}")
+            return DailyLogAnalytics.window(DailyLogColumns(), days).compute()
+    
     def get_mood_trend(self, sheet_id: str, sheet_name: str = "Sheet1",
                        days: int = 14) -> Dict:
         """دریافت روند Mood و Energy برای نمودار"""
-        logs = self.read_daily_logs(sheet_id, sheet_name, days)
-        
-        return {
-            "labels": [log["date"] for log in logs],
-            "mood": [log["mood"] for log in logs],
-            "energy": [log["energy"] for log in logs]
-        }
+        return self.analyze(sheet_id, sheet_name, days).mood_trend
     
     def get_analytics_summary(self, sheet_id: str, sheet_name: str = "Sheet1",
                               days: int = 30) -> Dict:
         """دریافت خلاصه آماری"""
-        logs = self.read_daily_logs(sheet_id, sheet_name, days)
-        
-        if not logs:
-            return {
-                "avg_mood": 0,
-                "avg_energy": 0,
-                "days_tracked": 0,
-                "trend": "neutral"
-            }
-        
-        moods = [log["mood"] for log in logs]
-        energies = [log["energy"] for log in logs]
-        
-        avg_mood = sum(moods) / len(moods)
-        avg_energy = sum(energies) / len(energies)
-        
-        # تعیین روند
-        mid = len(moods) // 2
-        if mid > 0:
-            first_half = sum(moods[:mid]) / mid
-            second_half = sum(moods[mid:]) / (len(moods) - mid)
-            
-            if second_half > first_half + 0.5:
-                trend = "improving"
-            elif second_half < first_half - 0.5:
-                trend = "declining"
-            else:
-                trend = "stable"
-        else:
-            trend = "neutral"
-        
-        return {
-            "avg_mood": round(avg_mood, 1),
-            "avg_energy": round(avg_energy, 1),
-            "days_tracked": len(logs),
-            "trend": trend
-        }
+        return self.analyze(sheet_id, sheet_name, days).summary
     
     def get_bad_habits_frequency(self, sheet_id: str, sheet_name: str = "Sheet1",
                                   days: int = 30) -> List[Dict]:
         """
         دریافت فراوانی عادت‌های بد (برای نمودار Bar)
         """
-        logs = self.read_daily_logs(sheet_id, sheet_name, days)
-        
-        frequency = Counter()
-        
-        for log in logs:
-            bad_habits = log.get("bad_habits", "")
-            if bad_habits and bad_habits != '-':
-                habits = [h.strip() for h in bad_habits.split(',')]
-                frequency.update(habits)
-        
-        return [{"name": name, "count": count} 
-                for name, count in frequency.most_common(10)]
+        return self.analyze(sheet_id, sheet_name, days).bad_habits_frequency
     
     def get_good_habits_streak(self, sheet_id: str, sheet_name: str = "Sheet1",
                                 days: int = 30) -> List[Dict]:
         """
         دریافت روند عادت‌های خوب (برای نمودار Line)
         """
-        logs = self.read_daily_logs(sheet_id, sheet_name, days)
-        
-        data = []
-        for log in logs:
-            good_habits = log.get("good_habits", "")
-            count = len([h for h in good_habits.split(',') if h.strip() and h != '-']) if good_habits else 0
-            data.append({
-                "date": log["date"],
-                "count": count
-            })
-        
-        return data
+        return self.analyze(sheet_id, sheet_name, days).good_habits_streak
     
     def get_techniques_usage(self, sheet_id: str, sheet_name: str = "Sheet1",
                               days: int = 30) -> List[Dict]:
         """
         دریافت استفاده از تکنیک‌ها (برای نمودار Pie)
         """
-        logs = self.read_daily_logs(sheet_id, sheet_name, days)
-        
-        usage = Counter()
-        
-        for log in logs:
-            techniques = log.get("techniques_used", "")
-            if techniques and techniques != '-':
-                techs = [t.strip() for t in techniques.split(',')]
-                usage.update(techs)
-        
-        return [{"name": name, "value": value} 
-                for name, value in usage.most_common()]
+        return self.analyze(sheet_id, sheet_name, days).techniques_usage
     
     def get_desires_analysis(self, sheet_id: str, sheet_name: str = "Sheet1",
                               days: int = 30) -> List[Dict]:
         """
         تحلیل خواسته‌ها و آرزوها
         """
-        logs = self.read_daily_logs(sheet_id, sheet_name, days)
-        
-        desires = Counter()
-        
-        for log in logs:
-            desire = log.get("desires", "")
-            if desire and desire != '-':
-                items = [d.strip() for d in desire.split(',')]
-                desires.update(items)
-        
-        return [{"desire": name, "frequency": count} 
-                for name, count in desires.most_common(10)]
+        return self.analyze(sheet_id, sheet_name, days).desires_analysis
     
     # ============================================
     # Import from CSV (خروجی Gem)
@@ -386,18 +523,76 @@ class SheetsAPI:
         
         return data
     
-    def bulk_import(self, sheet_id: str, sheet_name: str, data: List[Dict]) -> Dict:
-        """Import چندین ردیف به Sheet"""
+    def bulk_import(self, sheet_id: str, sheet_name: str, data: List[Dict],
+                    chunk_size: int = BULK_CHUNK_SIZE) -> Dict:
+        """
+        Import چندین ردیف به Sheet
+        
+        همه ردیف‌ها اول محلی بررسی و نرمال میشن، بعد در دسته‌های chunk_size تایی
+        با یک درخواست append_rows نوشته میشن (به جای یک درخواست برای هر ردیف)
+        """
         result = {"success": 0, "failed": 0, "errors": []}
         
+        rows = []
         for item in data:
-            if self.append_daily_log(sheet_id, sheet_name, item):
-                result["success"] += 1
-            else:
+            row = self._normalize_row(item)
+            if row is None:
                 result["failed"] += 1
-                result["errors"].append(f"خطا در ذخیره: {item.get('date', 'unknown')}")
+                result["errors"].append(f"تاریخ نامعتبر: {item.get('date', 'unknown')}")
+            else:
+                rows.append(row)
+        
+        if not rows:
+            return result
+        
+        worksheet = self.get_sheet(sheet_id, sheet_name)
+        if not worksheet:
+            result["failed"] += len(rows)
+            result["errors"].extend(f"خطا در ذخیره: {row[COLUMNS['DATE']]}" for row in rows)
+            return result
+        
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                response = worksheet.append_rows(chunk)
+                written = self._updated_rows(response, len(chunk))
+            except Exception as e:
+                logger.error(f"خطا در Import دسته‌ای: {e}")
+                self._invalidate_sheet(sheet_id, sheet_name)
+                written = 0
+            
+            result["success"] += written
+            result["failed"] += len(chunk) - written
+            result["errors"].extend(
+                f"خطا در ذخیره: {row[COLUMNS['DATE']]}" for row in chunk[written:]
+            )
+        
+        if result["success"]:
+            self._bump_revision(sheet_id, sheet_name)
+        logger.info(f"Import دسته‌ای: {result['success']} موفق، {result['failed']} ناموفق")
         
         return result
+    
+    def _normalize_row(self, item: Dict) -> Optional[List]:
+        """بررسی و نرمال کردن یک لاگ برای Import (None یعنی تاریخ نامعتبر)"""
+        row = self._build_row(item)
+        
+        date_obj = self._parse_date(str(row[COLUMNS['DATE']]).strip())
+        if not date_obj:
+            return None
+        
+        row[COLUMNS['DATE']] = date_obj.strftime("%Y-%m-%d")
+        row[COLUMNS['MOOD']] = self._safe_int(row[COLUMNS['MOOD']])
+        row[COLUMNS['ENERGY']] = self._safe_int(row[COLUMNS['ENERGY']])
+        return row
+    
+    def _updated_rows(self, response, expected: int) -> int:
+        """تعداد ردیف‌های نوشته‌شده از پاسخ append_rows"""
+        try:
+            return min(int(response["updates"]["updatedRows"]), expected)
+        except (TypeError, KeyError, ValueError):
+            # پاسخ بدون جزئیات: درخواست موفق بوده
+            return expected
 
 
 # ============================================
@@ -406,10 +601,12 @@ class SheetsAPI:
 import re
 
 
-def create_sheets_api(credentials_path: str) -> Optional[SheetsAPI]:
+def create_sheets_api(credentials_path: str, cache_ttl: int = 60,
+                      cache_size: int = 16, local_store=None) -> Optional[SheetsAPI]:
     """Factory function برای ایجاد SheetsAPI"""
     try:
-        api = SheetsAPI(credentials_path)
+        api = SheetsAPI(credentials_path, cache_ttl=cache_ttl, cache_size=cache_size,
+                        local_store=local_store)
         if api.is_connected():
             return api
         return None
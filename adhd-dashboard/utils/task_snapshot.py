@@ -0,0 +1,126 @@
+"""
+ماژول Snapshot تسک‌ها
+یک‌بار کل Database تسک‌ها (شامل Done ها) دریافت میشه و همه چیزهایی که
+داشبورد لازم داره از همون استخراج میشه:
+- Task های باز، کوادرانت‌ها، Quick Win ها، یادآورها
+- آمار (همون خروجی قبلی NotionAPI.get_task_stats)
+
+Task ها TaskRecord هستن، پس شرط‌های Status/Urgency/Energy فقط Lookup دسته
+از utils/classification هستن نه جستجوی زیررشته
+"""
+
+from datetime import datetime
+from functools import cached_property
+from typing import List, Dict
+
+from .classification import Energy
+from .records import TaskRecord
+
+
+class TaskSnapshot:
+    """نمای یک‌باره از Database تسک‌ها در محدوده یک درخواست"""
+
+    def __init__(self, tasks: List[Dict]):
+        """
+        Args:
+            tasks: همه Task ها (شامل Done) با ترتیب fetch_tasks
+        """
+        self.tasks = [t if isinstance(t, TaskRecord) else TaskRecord.from_dict(t) for t in tasks]
+
+    # ============================================
+    # Task Lists
+    # ============================================
+
+    @cached_property
+    def open_tasks(self) -> List[Dict]:
+        """Task های باز (معادل fetch_tasks بدون include_done)"""
+        return [t for t in self.tasks if not t.is_closed]
+
+    def quadrants(self, limit: int = 5) -> Dict[int, List[Dict]]:
+        """گروه‌بندی Task های باز بر اساس کوادرانت"""
+        quadrants = {1: [], 2: [], 3: [], 4: []}
+        for task in self.open_tasks:
+            q = task.get("quadrant", 4)
+            if len(quadrants[q]) < limit:
+                quadrants[q].append(task)
+        return quadrants
+
+    def quick_wins(self, limit: int = 3) -> List[Dict]:
+        """Quick Win های انجام نشده"""
+        return self._first(
+            lambda t: t.quick_win and not t.is_done, limit
+        )
+
+    def low_energy(self, limit: int = 3) -> List[Dict]:
+        """Task های کم‌انرژی"""
+        return self._first(
+            lambda t: t.energy_level is Energy.LOW and not t.is_done, limit
+        )
+
+    def high_focus(self, limit: int = 3) -> List[Dict]:
+        """Task های نیازمند تمرکز بالا"""
+        return self._first(
+            lambda t: t.energy_level is Energy.HIGH and not t.is_done, limit
+        )
+
+    def reminders(self, limit: int = 5) -> List[Dict]:
+        """Task های فوری"""
+        return self._first(
+            lambda t: t.is_urgent, limit
+        )
+
+    def _first(self, predicate, limit: int) -> List[Dict]:
+        """اولین limit تا Task باز که شرط رو دارن"""
+        result = []
+        for task in self.open_tasks:
+            if predicate(task):
+                result.append(task)
+                if len(result) >= limit:
+                    break
+        return result
+
+    # ============================================
+    # Statistics
+    # ============================================
+
+    @cached_property
+    def stats(self) -> Dict:
+        """آمار Task ها"""
+        today = datetime.now().date().isoformat()
+
+        stats = {
+            "total": len(self.tasks),
+            "done": 0,
+            "pending": 0,
+            "urgent": 0,
+            "done_today": 0,
+            "by_quadrant": {1: 0, 2: 0, 3: 0, 4: 0},
+            "by_energy": {"high": 0, "medium": 0, "low": 0},
+            "by_context": {},
+            "quick_wins_pending": 0
+        }
+
+        for task in self.tasks:
+            if task.is_done:
+                stats["done"] += 1
+                if (task.last_edited_time or "").startswith(today):
+                    stats["done_today"] += 1
+            else:
+                stats["pending"] += 1
+
+            if task.is_urgent:
+                stats["urgent"] += 1
+
+            stats["by_quadrant"][task.quadrant or 4] += 1
+
+            energy = task.energy_level
+            if energy is not Energy.NONE:
+                stats["by_energy"][energy.value] += 1
+
+            for ctx in task.context:
+                stats["by_context"][ctx] = stats["by_context"].get(ctx, 0) + 1
+
+            if task.quick_win and not task.is_done:
+                stats["quick_wins_pending"] += 1
+
+        return stats
@@ -0,0 +1,87 @@
+"""
+ماژول کش حافظه‌ای با TTL
+- هر آیتم بعد از ttl ثانیه منقضی میشه
+- حداکثر maxsize آیتم نگه داشته میشه (قدیمی‌ترین استفاده حذف میشه)
+- درخواست‌های همزمان برای یک کلید فقط یک‌بار loader رو اجرا میکنن
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """کش LRU با زمان انقضا، امن برای چند Thread"""
+
+    def __init__(self, maxsize: int = 16, ttl: float = 60):
+        """
+        Args:
+            maxsize: حداکثر تعداد آیتم
+            ttl: عمر هر آیتم به ثانیه
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        دریافت مقدار از کش یا اجرای loader
+
+        اگه چند Thread همزمان یک کلید منقضی رو بخوان، فقط یکی loader رو
+        اجرا میکنه و بقیه منتظر نتیجه‌اش می‌مونن
+        """
+        found, value = self._get(key)
+        if found:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # ممکنه Thread دیگه‌ای همین الان پرش کرده باشه
+            found, value = self._get(key)
+            if found:
+                return value
+
+            value = loader()
+            self.set(key, value)
+
+        with self._lock:
+            self._key_locks.pop(key, None)
+
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """ذخیره مقدار"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] = None):
+        """حذف آیتم‌ها (بدون predicate یعنی همه)"""
+        with self._lock:
+            if predicate is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def _get(self, key: Hashable):
+        """(found, value) برای آیتم معتبر"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return False, None
+
+            self._data.move_to_end(key)
+            return True, value